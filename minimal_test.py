@@ -9,15 +9,22 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'data'))
 
 from debate_protocol import DebateProtocol, OllamaClient
+from resilience import RetryPolicy
 from alignment_scenarios import ALIGNMENT_SCENARIOS
 
+def report_failures(result) -> bool:
+    """Print the turns that failed to generate; True if there were none"""
+    for failure in result.failures:
+        print(f"Failed {failure.role.value} turn ({failure.model}): {failure.message}")
+    return not result.failures
+
 def test_single_debate():
     """Test a single debate to verify the system works"""
     
     print("Testing single debate functionality...")
     
-    # Initialize components
-    client = OllamaClient()
+    # Initialize components; a smoke test should fail fast rather than retry an absent server
+    client = OllamaClient(retry=RetryPolicy(max_attempts=1))
     protocol = DebateProtocol(client)
     
     # Use a simple scenario
@@ -46,7 +53,7 @@ def test_single_debate():
             print(f"Round: {arg.round_number}")
             print(f"Content: {arg.content[:200]}...")
         
-        return True
+        return report_failures(result)
         
     except Exception as e:
         print(f"Error in single model debate: {e}")
@@ -59,8 +66,8 @@ def test_ensemble_debate():
     print("ENSEMBLE DEBATE TEST")
     print("="*50)
     
-    # Initialize components
-    client = OllamaClient()
+    # Initialize components; a smoke test should fail fast rather than retry an absent server
+    client = OllamaClient(retry=RetryPolicy(max_attempts=1))
     protocol = DebateProtocol(client)
     
     # Simple ensemble config using fastest models
@@ -89,7 +96,7 @@ def test_ensemble_debate():
             print(f"Round: {arg.round_number}")
             print(f"Content: {arg.content[:150]}...")
         
-        return True
+        return report_failures(result)
         
     except Exception as e:
         print(f"Error in ensemble debate: {e}")
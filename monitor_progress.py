@@ -1,153 +1,103 @@
 #!/usr/bin/env python3
 """
-Monitor the progress of the running experiment
+Monitor the progress of a running experiment from its progress event stream
+
+Usage:
+    python monitor_progress.py                                   # Follow the newest results/*_events.jsonl
+    python monitor_progress.py results/experiment_results_<ts>_events.jsonl
+    python monitor_progress.py --once                            # Print one snapshot and exit
 """
 
-import time
-import sys
+import argparse
+import glob
 import os
+import sys
+import time
 from datetime import datetime, timedelta
 
-def estimate_completion_time(current_progress: str, start_time: datetime) -> str:
-    """Estimate completion time based on current progress"""
-    
-    # Extract progress information from the output
-    if "Baseline models:" in current_progress and "%" in current_progress:
-        # Parse baseline progress
-        if "20%" in current_progress:
-            progress = 0.2
-            phase = "baseline"
-        elif "40%" in current_progress:
-            progress = 0.4 
-            phase = "baseline"
-        elif "60%" in current_progress:
-            progress = 0.6
-            phase = "baseline"
-        elif "80%" in current_progress:
-            progress = 0.8
-            phase = "baseline"
-        elif "100%" in current_progress:
-            progress = 1.0
-            phase = "baseline_complete"
-        else:
-            progress = 0.1
-            phase = "baseline"
-    elif "Ensemble configs:" in current_progress and "%" in current_progress:
-        # Parse ensemble progress
-        if "20%" in current_progress:
-            progress = 0.2
-            phase = "ensemble" 
-        elif "40%" in current_progress:
-            progress = 0.4
-            phase = "ensemble"
-        elif "60%" in current_progress:
-            progress = 0.6
-            phase = "ensemble"
-        elif "80%" in current_progress:
-            progress = 0.8
-            phase = "ensemble"
-        elif "100%" in current_progress:
-            progress = 1.0
-            phase = "ensemble_complete"
-        else:
-            progress = 0.1
-            phase = "ensemble"
-    else:
-        progress = 0.05
-        phase = "starting"
-    
-    # Calculate time estimates
-    elapsed = datetime.now() - start_time
-    elapsed_minutes = elapsed.total_seconds() / 60
-    
-    if phase == "baseline":
-        # Baseline is ~33% of total experiment (1 hour of 3 hours)
-        total_baseline_time = 60  # minutes
-        baseline_progress = progress
-        remaining_baseline = (1 - baseline_progress) * total_baseline_time
-        ensemble_time = 120  # minutes for ensemble phase
-        total_remaining = remaining_baseline + ensemble_time
-        
-    elif phase == "baseline_complete":
-        # Just finished baseline, starting ensemble
-        ensemble_time = 120  # minutes
-        total_remaining = ensemble_time
-        
-    elif phase == "ensemble":
-        # In ensemble phase (~67% of total experiment)
-        ensemble_progress = progress
-        remaining_ensemble = (1 - ensemble_progress) * 120  # minutes
-        total_remaining = remaining_ensemble
-        
-    elif phase == "ensemble_complete":
-        total_remaining = 5  # Just analysis left
-        
-    else:
-        # Just starting
-        total_remaining = 210  # 3.5 hours total
-    
-    completion_time = datetime.now() + timedelta(minutes=total_remaining)
-    
-    return f"""
-Progress Analysis:
-- Phase: {phase}
-- Progress: {progress*100:.1f}%
-- Elapsed time: {elapsed_minutes:.1f} minutes
-- Estimated remaining: {total_remaining:.0f} minutes
-- Estimated completion: {completion_time.strftime('%I:%M %p')}
-"""
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from telemetry import ProgressTracker, read_events
+
+def format_eta(seconds: float) -> str:
+    if seconds is None:
+        return "unknown"
+    completion = datetime.now() + timedelta(seconds=seconds)
+    return f"{seconds / 60:.1f} min (~{completion.strftime('%I:%M %p')})"
+
+def latest_events_file(results_dir: str) -> str:
+    files = glob.glob(os.path.join(results_dir, "*_events.jsonl"))
+    return max(files, key=os.path.getmtime) if files else None
+
+def print_summary(summary: dict):
+    run = summary["run"]
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] "
+          f"{'Finished' if run.get('finished') else 'Running'}: {summary['done']}/{summary['total']} debates, "
+          f"{summary['elapsed_seconds'] / 60:.1f} min elapsed, {summary['debates_per_minute']:.2f} debates/min")
+    if not run.get("finished"):
+        print(f"Estimated remaining: {format_eta(summary['eta_seconds'])}")
+    print(f"Schedule: {run.get('schedule')}, concurrency: {run.get('max_concurrency')}, "
+          f"{run.get('num_scenarios')} scenarios x {run.get('rounds')} rounds")
+
+    print("\nPhases:")
+    for name, phase in summary["phases"].items():
+        failed = f", {phase['failed']} failed" if phase["failed"] else ""
+        print(f"  {name:<10} {phase['done']:>4}/{phase['total']:<4}{failed}  "
+              f"{phase['debates_per_minute']:6.2f} debates/min  ETA {format_eta(phase['eta_seconds'])}")
+
+    print("\nModels / configs:")
+    for name, participant in summary["participants"].items():
+        mean = participant["mean_debate_seconds"]
+        failed = f", {participant['failed']} failed" if participant["failed"] else ""
+        print(f"  {name:<32} {participant['done']:>3}/{participant['total']:<3}{failed}  "
+              f"{f'{mean:.1f}s/debate' if mean is not None else '':>14}  "
+              f"ETA {format_eta(participant['eta_seconds']) if participant['done'] < participant['total'] else 'done'}")
+
+    print("\nTurn latency per model:")
+    for name, model in summary["models"].items():
+        latency = model["latency"]
+        rate = f"{model['turns_per_minute']:.1f} turns/min" if model["turns_per_minute"] else ""
+        tokens = f"{model['tokens_per_second']:.1f} tok/s" if model["tokens_per_second"] else ""
+        errors = f"  {model['errors']} errors" if model["errors"] else ""
+        print(f"  {name:<20} {model['turns']:>4} turns  p50 {latency.get('p50', 0):6.2f}s  "
+              f"p95 {latency.get('p95', 0):6.2f}s  {rate:>16}  {tokens:>12}  "
+              f"{model['loads']} loads ({model['load_seconds']:.1f}s){errors}")
+    print("-" * 50)
 
 def main():
+    parser = argparse.ArgumentParser(description='Monitor experiment progress')
+    parser.add_argument('events_file', nargs='?', help='Progress events file (default: newest in results/)')
+    parser.add_argument('--results-dir', default=os.path.join(os.path.dirname(__file__), 'results'))
+    parser.add_argument('--interval', type=float, default=30, help='Seconds between updates (default: 30)')
+    parser.add_argument('--once', action='store_true', help='Print one snapshot and exit')
+    args = parser.parse_args()
+
+    events_file = args.events_file or latest_events_file(args.results_dir)
+    if events_file is None:
+        print(f"No *_events.jsonl found in {args.results_dir}; start an experiment first")
+        sys.exit(1)
+
     print("Experiment Progress Monitor")
     print("=" * 50)
-    print("Monitoring bash_2 experiment progress...")
+    print(f"Following {events_file}")
     print("Press Ctrl+C to exit monitoring")
     print()
-    
-    start_time = datetime.now()
-    last_output = ""
-    
+
+    tracker = ProgressTracker()
+    offset = 0
     while True:
         try:
-            # This would normally use BashOutput, but we'll simulate for now
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] Checking progress...")
-            
-            # In real implementation, you would check bash output here
-            # For now, just provide status update
-            elapsed = datetime.now() - start_time
-            elapsed_minutes = elapsed.total_seconds() / 60
-            
-            print(f"Experiment running for: {elapsed_minutes:.1f} minutes")
-            
-            if elapsed_minutes < 60:
-                print("Phase: Baseline experiments (5 models × 15 scenarios)")
-                progress = min(elapsed_minutes / 60, 1.0)
-                print(f"Estimated progress: {progress*100:.1f}%")
-                remaining = 210 - elapsed_minutes  # 3.5 hours total
-            elif elapsed_minutes < 180:
-                print("Phase: Ensemble experiments (5 configs × 15 scenarios)") 
-                progress = (elapsed_minutes - 60) / 120
-                print(f"Estimated progress: {progress*100:.1f}%")
-                remaining = 210 - elapsed_minutes
-            else:
-                print("Phase: Results processing and analysis")
-                remaining = max(210 - elapsed_minutes, 0)
-            
-            if remaining > 0:
-                completion_time = datetime.now() + timedelta(minutes=remaining)
-                print(f"Estimated completion: {completion_time.strftime('%I:%M %p')} ({remaining:.0f} minutes remaining)")
-            else:
-                print("Experiment should be complete!")
-            
-            print("-" * 50)
-            time.sleep(300)  # Check every 5 minutes
-            
+            events, offset = read_events(events_file, offset)
+            for event in events:
+                tracker.update(event)
+            summary = tracker.summary()
+            print_summary(summary)
+            if args.once or summary["run"].get("finished"):
+                break
+            time.sleep(args.interval)
         except KeyboardInterrupt:
             print("\nMonitoring stopped by user")
             break
-        except Exception as e:
-            print(f"Error: {e}")
-            time.sleep(60)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmarks for the debate pipeline, run against the bundled mock Ollama server
+
+Usage:
+    python run_benchmarks.py                                   # Default sweep
+    python run_benchmarks.py --scenarios 1 2 --rounds 1 2 --concurrency 1 4 8
+    python run_benchmarks.py --schedule fifo affinity --max-resident-models 2
+    python run_benchmarks.py --residency off on --max-resident-models 2
+    python run_benchmarks.py --compare results/benchmarks/benchmark_<ts>.json
+
+Measures debates/minute and per-turn latency percentiles for every
+(scenarios, rounds, concurrency, schedule) combination, evaluator calls/minute
+for each evaluator mode, and save/load cost versus result size. Results are
+written as JSON; --compare flags throughput regressions against an earlier file
+and exits non-zero when any case is slower than --tolerance allows.
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from context_policy import CONTEXT_POLICIES, make_context_policy
+from ensemble_orchestrator import EnsembleOrchestrator
+from evaluation_framework import DebateEvaluator
+from mock_ollama_server import MockOllamaServer
+from ollama_client import OllamaClient, summarize_intervals
+from results_log import DebateLog, atomic_write_json, load_results
+from alignment_scenarios import ALIGNMENT_SCENARIOS
+
+def git_commit() -> str:
+    """Current commit hash, so results can be lined up with the history"""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def turn_latencies(results: Dict[str, Any]) -> List[float]:
+    """Wall time of every generated turn in a results dict"""
+    latencies = []
+    for phase in ("baseline_results", "ensemble_results"):
+        for debates in results[phase].values():
+            for debate in debates:
+                for argument in debate["arguments"]:
+                    stats = argument.get("generation_stats") or {}
+                    if "wall_time" in stats:
+                        latencies.append(stats["wall_time"])
+    return latencies
+
+def count_debates(results: Dict[str, Any]) -> int:
+    return sum(len(debates) for phase in ("baseline_results", "ensemble_results")
+               for debates in results[phase].values())
+
+def prompt_tokens_evaluated(results: Dict[str, Any]) -> int:
+    """Prompt tokens the server evaluated across every turn in a results dict"""
+    return sum((argument.get("generation_stats") or {}).get("prompt_eval_count", 0)
+               for phase in ("baseline_results", "ensemble_results")
+               for debates in results[phase].values()
+               for debate in debates
+               for argument in debate["arguments"])
+
+def benchmark_pipeline(server: MockOllamaServer, num_scenarios: int, rounds: int, concurrency: int,
+                       schedule: str, resident_models: int, reuse_context: bool = False,
+                       context_policy: str = "full", manage_residency: bool = False) -> Dict[str, Any]:
+    """Run a full experiment suite and report throughput and turn latency"""
+    before = server.stats()
+    with tempfile.TemporaryDirectory() as results_dir:
+        orchestrator = EnsembleOrchestrator(server.url, max_concurrency=concurrency, schedule=schedule,
+                                            resident_models=resident_models, results_dir=results_dir,
+                                            reuse_context=reuse_context,
+                                            context_policy=make_context_policy(context_policy),
+                                            manage_residency=manage_residency)
+        start_time = time.time()
+        results = orchestrator.run_experiment_suite(ALIGNMENT_SCENARIOS[:num_scenarios], rounds=rounds)
+        elapsed = time.time() - start_time
+        orchestrator.client.close()
+    after = server.stats()
+
+    debates = count_debates(results)
+    latency = summarize_intervals(turn_latencies(results))
+    load_times = [debate.get("load_time", 0.0) for phase in ("baseline_results", "ensemble_results")
+                  for phase_debates in results[phase].values() for debate in phase_debates]
+    return {
+        "name": (f"pipeline/s{num_scenarios}-r{rounds}-c{concurrency}-{schedule}" + ("-kv" if reuse_context else "")
+                 + (f"-{context_policy}" if context_policy != "full" else "")
+                 + ("-residency" if manage_residency else "")),
+        "scenarios": num_scenarios,
+        "rounds": rounds,
+        "concurrency": concurrency,
+        "schedule": schedule,
+        "reuse_context": reuse_context,
+        "context_policy": context_policy,
+        "manage_residency": manage_residency,
+        "debates": debates,
+        "seconds": elapsed,
+        "debates_per_minute": debates / elapsed * 60 if elapsed else 0.0,
+        "turn_latency": latency,
+        "model_loads": after["model_loads"] - before["model_loads"],
+        "debate_load_seconds": sum(load_times) / len(load_times) if load_times else 0.0,
+        "residency": results["metadata"].get("residency"),
+        "prompt_tokens_evaluated": prompt_tokens_evaluated(results),
+        "context_reuse_stats": results["metadata"].get("context_reuse_stats"),
+        "results": results
+    }
+
+def benchmark_evaluator(server: MockOllamaServer, results: Dict[str, Any], mode: str,
+                        max_debates: int) -> Dict[str, Any]:
+    """Score up to max_debates debates and report evaluator calls per minute"""
+    options = {
+        "per_metric": {},
+        "parallel_metrics": {"max_parallel_metrics": 5},
+        "single_call": {"single_call": True}
+    }[mode]
+    debates = [debate for phase in ("baseline_results", "ensemble_results")
+               for model_debates in results[phase].values() for debate in model_debates][:max_debates]
+    scenarios = {scenario["topic"]: scenario for scenario in results["scenarios_tested"]}
+
+    client = OllamaClient(server.url)
+    evaluator = DebateEvaluator(evaluator_model="deepseek-r1:8b", client=client, **options)
+    before = server.stats()["requests"]
+    start_time = time.time()
+    for debate in debates:
+        evaluator.evaluate_debate_quality(evaluator._dict_to_debate_result(debate),
+                                          scenarios.get(debate["topic"], {"topic": debate["topic"]}))
+    elapsed = time.time() - start_time
+    calls = server.stats()["requests"] - before
+    evaluator.close()
+    client.close()
+    return {
+        "name": f"evaluator/{mode}",
+        "mode": mode,
+        "debates": len(debates),
+        "evaluator_calls": calls,
+        "seconds": elapsed,
+        "evaluator_calls_per_minute": calls / elapsed * 60 if elapsed else 0.0,
+        "debates_per_minute": len(debates) / elapsed * 60 if elapsed else 0.0
+    }
+
+def scaled_results(results: Dict[str, Any], num_debates: int) -> Dict[str, Any]:
+    """Copy of results whose baseline phase holds num_debates debates, cycling the originals"""
+    template = [debate for debates in results["baseline_results"].values() for debate in debates]
+    scaled = copy.deepcopy(results)
+    scaled["ensemble_results"] = {}
+    scaled["baseline_results"] = {"benchmark": [dict(template[i % len(template)], scenario_index=i)
+                                                for i in range(num_debates)]}
+    scaled["metadata"]["baseline_models"] = ["benchmark"]
+    scaled["metadata"]["ensemble_configs"] = []
+    return scaled
+
+def benchmark_storage(results: Dict[str, Any], num_debates: int) -> Dict[str, Any]:
+    """Time JSON save/load and JSONL append/compact for a results dict of num_debates debates"""
+    scaled = scaled_results(results, num_debates)
+    debates = scaled["baseline_results"]["benchmark"]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_file = os.path.join(tmp_dir, "results.json")
+        start_time = time.time()
+        atomic_write_json(scaled, json_file)
+        json_save = time.time() - start_time
+
+        start_time = time.time()
+        load_results(json_file)
+        json_load = time.time() - start_time
+
+        log = DebateLog(os.path.join(tmp_dir, "results.jsonl"))
+        start_time = time.time()
+        log.write_header(scaled["metadata"], scaled["scenarios_tested"])
+        for debate in debates:
+            log.append_debate("baseline", "benchmark", debate)
+        jsonl_append = time.time() - start_time
+
+        start_time = time.time()
+        load_results(log.filepath)
+        jsonl_load = time.time() - start_time
+
+        return {
+            "name": f"storage/{num_debates}",
+            "debates": num_debates,
+            "json_bytes": os.path.getsize(json_file),
+            "jsonl_bytes": os.path.getsize(log.filepath),
+            "json_save_seconds": json_save,
+            "json_load_seconds": json_load,
+            "jsonl_append_seconds": jsonl_append,
+            "jsonl_append_per_debate_seconds": jsonl_append / num_debates,
+            "jsonl_compact_load_seconds": jsonl_load
+        }
+
+def compare_runs(current: Dict[str, Any], baseline_file: str, tolerance: float) -> List[str]:
+    """Names of cases whose throughput dropped by more than tolerance versus baseline_file"""
+    with open(baseline_file, 'r') as f:
+        baseline = {case["name"]: case for case in json.load(f)["cases"]}
+
+    regressions = []
+    for case in current["cases"]:
+        previous = baseline.get(case["name"])
+        metric = "evaluator_calls_per_minute" if case["name"].startswith("evaluator/") else "debates_per_minute"
+        if previous is None or metric not in case or not previous.get(metric):
+            continue
+        change = case[metric] / previous[metric] - 1
+        print(f"  {case['name']:<40} {metric}: {previous[metric]:10.1f} -> {case[metric]:10.1f} ({change:+.1%})")
+        if change < -tolerance:
+            regressions.append(case["name"])
+    return regressions
+
+def print_summary(report: Dict[str, Any]):
+    print("\n" + "="*60)
+    print("BENCHMARK RESULTS")
+    print("="*60)
+    for case in report["cases"]:
+        if case["name"].startswith("pipeline/"):
+            latency = case["turn_latency"]
+            print(f"{case['name']:<40} {case['debates_per_minute']:8.1f} debates/min  "
+                  f"turn p50/p95/p99 {latency.get('p50', 0):.3f}/{latency.get('p95', 0):.3f}/{latency.get('p99', 0):.3f}s  "
+                  f"loads {case['model_loads']}  in-debate load {case['debate_load_seconds']:.3f}s  "
+                  f"prompt tokens {case['prompt_tokens_evaluated']}")
+        elif case["name"].startswith("evaluator/"):
+            print(f"{case['name']:<40} {case['evaluator_calls_per_minute']:8.1f} calls/min  "
+                  f"({case['evaluator_calls']} calls for {case['debates']} debates)")
+        else:
+            print(f"{case['name']:<40} json {case['json_bytes'] / 1024:8.1f} KiB  "
+                  f"save {case['json_save_seconds']:.4f}s load {case['json_load_seconds']:.4f}s  "
+                  f"jsonl append {case['jsonl_append_per_debate_seconds'] * 1000:.2f}ms/debate "
+                  f"compact {case['jsonl_compact_load_seconds']:.4f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the debate pipeline against a mock Ollama server')
+    parser.add_argument('--scenarios', type=int, nargs='+', default=[1, 2], help='Scenario counts to sweep')
+    parser.add_argument('--rounds', type=int, nargs='+', default=[1, 2], help='Debate rounds to sweep')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4], help='max_concurrency values to sweep')
+    parser.add_argument('--schedule', nargs='+', choices=['fifo', 'affinity'], default=['fifo'],
+                        help='Schedules to sweep')
+    parser.add_argument('--reuse-context', nargs='+', choices=['off', 'on'], default=['off'],
+                        help='Sweep KV-context reuse off and/or on')
+    parser.add_argument('--context-policy', nargs='+', choices=list(CONTEXT_POLICIES), default=['full'],
+                        help='Context policies to sweep, each with its default settings')
+    parser.add_argument('--residency', nargs='+', choices=['off', 'on'], default=['off'],
+                        help='Sweep model residency management off and/or on')
+    parser.add_argument('--evaluator-modes', nargs='*', choices=['per_metric', 'parallel_metrics', 'single_call'],
+                        default=['per_metric', 'parallel_metrics', 'single_call'])
+    parser.add_argument('--evaluator-debates', type=int, default=10, help='Debates scored per evaluator mode')
+    parser.add_argument('--storage-sizes', type=int, nargs='*', default=[10, 100, 1000],
+                        help='Result sizes (debates) for the save/load benchmark')
+    parser.add_argument('--time-scale', type=float, default=0.01,
+                        help='Mock server delay multiplier (1.0 = realistic model latencies)')
+    parser.add_argument('--max-resident-models', type=int, default=1, help='Models the mock server keeps loaded')
+    parser.add_argument('--seed', type=int, default=0, help='Mock server text seed')
+    parser.add_argument('--output', type=str, default=None, help='Output JSON file')
+    parser.add_argument('--compare', type=str, default=None, help='Earlier benchmark JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Allowed fractional throughput drop before --compare reports a regression')
+    parser.add_argument('--log-level', default='WARNING', help='Logging level')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper()),
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    report = {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time_scale": args.time_scale,
+            "max_resident_models": args.max_resident_models,
+            "seed": args.seed
+        },
+        "cases": []
+    }
+
+    with MockOllamaServer(max_resident_models=args.max_resident_models, seed=args.seed,
+                          time_scale=args.time_scale) as server:
+        sample_results = None
+        for num_scenarios, rounds, concurrency, schedule, reuse, policy, residency in itertools.product(
+                args.scenarios, args.rounds, args.concurrency, args.schedule, args.reuse_context,
+                args.context_policy, args.residency):
+            print(f"Running pipeline: {num_scenarios} scenarios, {rounds} rounds, "
+                  f"concurrency {concurrency}, {schedule} schedule, context reuse {reuse}, {policy} context, "
+                  f"residency management {residency}")
+            case = benchmark_pipeline(server, num_scenarios, rounds, concurrency, schedule,
+                                      args.max_resident_models, reuse_context=reuse == 'on',
+                                      context_policy=policy, manage_residency=residency == 'on')
+            sample_results = case.pop("results")
+            report["cases"].append(case)
+
+        for mode in args.evaluator_modes:
+            print(f"Running evaluator: {mode}")
+            report["cases"].append(benchmark_evaluator(server, sample_results, mode, args.evaluator_debates))
+
+    for size in args.storage_sizes:
+        print(f"Running storage: {size} debates")
+        report["cases"].append(benchmark_storage(sample_results, size))
+
+    print_summary(report)
+
+    output_file = args.output
+    if output_file is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = os.path.join("results", "benchmarks", f"benchmark_{timestamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    atomic_write_json(report, output_file)
+    print(f"\nBenchmark results saved to: {output_file}")
+
+    if args.compare:
+        print(f"\nComparing against {args.compare}:")
+        regressions = compare_runs(report, args.compare, args.tolerance)
+        if regressions:
+            print(f"Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("No regressions")
+
+if __name__ == "__main__":
+    main()
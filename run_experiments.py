@@ -8,23 +8,36 @@ Usage:
     python run_experiments.py --full               # Run full experiment (15 scenarios)
     python run_experiments.py --evaluate-only      # Only run evaluation on existing results
     python run_experiments.py --resume <file>      # Resume from incremental save file
+    python run_experiments.py --full --max-concurrency 4   # Run up to 4 debates in parallel
+    python run_experiments.py --full --schedule affinity   # Batch turns per model to avoid model swaps
+    python run_experiments.py --full --max-concurrency 8 --num-parallel 2   # Queue requests, finishing started debates first
+    python run_experiments.py --search-configs --memory-budget 24   # Search role assignments for the best score per second
 
-Note: All experiments now automatically save incremental results to prevent data loss on crashes.
-To resume a crashed experiment, use --resume with the *_incremental.json file path.
+Note: All experiments append every finished debate to an incremental *_incremental.jsonl log
+to prevent data loss on crashes. To resume a crashed experiment, use --resume with that file
+(legacy *_incremental.json files are still accepted).
 """
 
 import argparse
 import logging
 import os
 import sys
-import json
 from datetime import datetime
+from typing import Dict
 
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from ensemble_orchestrator import EnsembleOrchestrator
+from config_search import ConfigSearch
+from request_scheduler import RequestScheduler
 from evaluation_framework import DebateEvaluator
+from debate_protocol import OllamaClient, stop_on_forfeit
+from context_policy import CONTEXT_POLICIES, make_context_policy
+from adaptive_timeout import AdaptiveTimeouts
+from resilience import RetryPolicy
+from response_cache import ResponseCache
+from results_log import load_results
 from alignment_scenarios import get_random_scenarios
 
 def setup_logging(log_level: str = "INFO"):
@@ -38,11 +51,11 @@ def setup_logging(log_level: str = "INFO"):
         ]
     )
 
-def run_quick_test():
+def run_quick_test(orchestrator_options: Dict = None):
     """Run a quick test with minimal scenarios"""
     logging.info("Starting quick test...")
     
-    orchestrator = EnsembleOrchestrator()
+    orchestrator = EnsembleOrchestrator(**(orchestrator_options or {}))
     results = orchestrator.quick_test(num_scenarios=2)
     
     # Save results
@@ -62,11 +75,11 @@ def run_quick_test():
     print(f"\nResults saved to: {results_file}")
     return results_file
 
-def run_small_experiment():
+def run_small_experiment(orchestrator_options: Dict = None):
     """Run small experiment with 5 scenarios"""
     logging.info("Starting small experiment...")
     
-    orchestrator = EnsembleOrchestrator()
+    orchestrator = EnsembleOrchestrator(**(orchestrator_options or {}))
     scenarios = get_random_scenarios(5)
     results = orchestrator.run_experiment_suite(scenarios, num_scenarios=5, rounds=2)
     
@@ -74,7 +87,7 @@ def run_small_experiment():
     results_file = orchestrator.save_results(results, "results/small_experiment_results.json")
     
     # Run evaluation
-    evaluator = DebateEvaluator()
+    evaluator = orchestrator.create_evaluator()
     
     print("\n" + "="*50)
     print("SMALL EXPERIMENT COMPLETED")
@@ -83,11 +96,11 @@ def run_small_experiment():
     
     return results_file
 
-def run_full_experiment():
+def run_full_experiment(orchestrator_options: Dict = None):
     """Run full experiment with 15 scenarios"""
     logging.info("Starting full experiment...")
     
-    orchestrator = EnsembleOrchestrator()
+    orchestrator = EnsembleOrchestrator(**(orchestrator_options or {}))
     scenarios = get_random_scenarios(15)
     results = orchestrator.run_experiment_suite(scenarios, num_scenarios=15, rounds=2)
     
@@ -101,14 +114,43 @@ def run_full_experiment():
     
     return results_file
 
-def evaluate_results(results_file: str):
+def run_config_search(orchestrator_options: Dict = None, num_scenarios: int = 8, rounds: int = 2,
+                      evaluator_model: str = "deepseek-r1:14b", **search_options):
+    """Search ensemble role assignments for the score vs. seconds-per-debate Pareto frontier"""
+    logging.info("Starting ensemble config search...")
+    
+    orchestrator = EnsembleOrchestrator(**(orchestrator_options or {}))
+    evaluator = orchestrator.create_evaluator(evaluator_model)
+    search = ConfigSearch(orchestrator.protocol, evaluator, rounds=rounds, max_concurrency=orchestrator.max_concurrency,
+                          session_options=orchestrator.session_options, **search_options)
+    report = search.run(get_random_scenarios(num_scenarios))
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    results_file = orchestrator.save_results(report, os.path.join(orchestrator.results_dir,
+                                                                  f"config_search_{timestamp}.json"))
+    
+    print("\n" + "="*50)
+    print("CONFIG SEARCH COMPLETED")
+    print("="*50)
+    print(f"Configs: {len(report['candidates'])} searched, {len(report['pruned'])} pruned before running")
+    print(f"Debates run: {report['debates_run']} (exhaustive search: {report['exhaustive_debates']})")
+    print("Pareto frontier (score vs seconds per debate):")
+    for entry in report["frontier"]:
+        print(f"  {entry['name']}: score {entry['mean_score']:.2f}, {entry['seconds_per_debate']:.1f}s per debate")
+    print(f"\nResults saved to: {results_file}")
+    
+    return results_file
+
+def evaluate_results(results_file: str, cache_dir: str = None, seed: int = None,
+                     ollama_url="http://localhost:11434"):
     """Run evaluation on existing results"""
     logging.info(f"Evaluating results from {results_file}")
     
-    with open(results_file, 'r') as f:
-        results = json.load(f)
+    results = load_results(results_file)
     
-    evaluator = DebateEvaluator()
+    # Re-evaluating the same debates is served from the response cache when enabled
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    evaluator = DebateEvaluator(client=OllamaClient(ollama_url, seed=seed, cache=cache))
     
     # Collect all baseline and ensemble results for comparison
     all_baseline_results = []
@@ -129,7 +171,7 @@ def evaluate_results(results_file: str):
     report = evaluator.generate_evaluation_report(comparison)
     
     # Save evaluation report
-    eval_file = results_file.replace('.json', '_evaluation.txt')
+    eval_file = os.path.splitext(results_file)[0] + '_evaluation.txt'
     with open(eval_file, 'w') as f:
         f.write(report)
     
@@ -141,11 +183,11 @@ def evaluate_results(results_file: str):
     
     return eval_file
 
-def resume_experiment(incremental_file: str):
+def resume_experiment(incremental_file: str, orchestrator_options: Dict = None):
     """Resume experiment from incremental save file"""
     logging.info(f"Resuming experiment from {incremental_file}")
     
-    orchestrator = EnsembleOrchestrator()
+    orchestrator = EnsembleOrchestrator(**(orchestrator_options or {}))
     results = orchestrator.resume_from_incremental(incremental_file)
     
     # Save final results with new filename
@@ -166,30 +208,126 @@ def main():
     parser.add_argument('--full', action='store_true', help='Run full experiment')
     parser.add_argument('--evaluate-only', type=str, help='Only evaluate existing results file')
     parser.add_argument('--resume', type=str, help='Resume from incremental save file')
+    parser.add_argument('--ollama-url', nargs='+', default=['http://localhost:11434'],
+                        help='Ollama server URL; give several to balance requests across hosts')
+    parser.add_argument('--max-concurrency', type=int, default=1,
+                        help='Number of debates to run in parallel (default: 1)')
+    parser.add_argument('--schedule', choices=['fifo', 'affinity'], default='fifo',
+                        help='Debate scheduling: fifo, or affinity to batch turns per model and minimise model swaps')
+    parser.add_argument('--resident-models', type=int, default=1,
+                        help='Models Ollama can keep loaded at once, used by the affinity schedule '
+                             'and --manage-residency (default: 1)')
+    parser.add_argument('--cache-dir', type=str, default=None,
+                        help='Enable the on-disk response cache in this directory')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Fixed generation seed (makes cached runs reproducible)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream generations and record time-to-first-token per turn')
+    parser.add_argument('--reuse-context', action='store_true',
+                        help="Continue each model from Ollama's returned KV context instead of resending the transcript")
+    early_stop = parser.add_mutually_exclusive_group()
+    early_stop.add_argument('--stop-on-forfeit', action='store_true',
+                            help='Skip to the judge once a debater fails to produce an argument')
+    early_stop.add_argument('--stop-when-decided', type=float, nargs='?', const=8.0, default=None,
+                            metavar='CONFIDENCE',
+                            help="Ask the judge for an interim ruling between rounds and skip to its final "
+                                 "ruling once it names a winner with this confidence, 0-10 (default: 8)")
+    parser.add_argument('--context-policy', choices=list(CONTEXT_POLICIES), default='full',
+                        help='Context each turn sees: full transcript, a sliding window of rounds, '
+                             'a summary of older rounds, or a token budget')
+    parser.add_argument('--context-rounds', type=int, default=None,
+                        help='Rounds kept verbatim by the window and summary policies')
+    parser.add_argument('--context-tokens', type=int, default=None,
+                        help="Debaters' context budget in estimated tokens (budget policy)")
+    parser.add_argument('--judge-context-tokens', type=int, default=None,
+                        help="Judge's context budget in estimated tokens (budget policy)")
+    parser.add_argument('--max-retries', type=int, default=2,
+                        help='Retries of a failed generation, with exponential backoff (default: 2)')
+    parser.add_argument('--timeout-factor', type=float, default=3.0,
+                        help="Request timeout as a multiple of each model's p99 latency (default: 3)")
+    parser.add_argument('--load-allowance', type=float, default=120.0,
+                        help='Seconds added to the timeout of a model that may need loading, '
+                             'until its load time has been observed (default: 120)')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='Fixed request timeout in seconds instead of adaptive per-model timeouts')
+    parser.add_argument('--coalesce', choices=['auto', 'on', 'off'], default='auto',
+                        help='Share one call among identical concurrent requests; auto only does so '
+                             'when --seed makes generation deterministic')
+    parser.add_argument('--manage-residency', action='store_true',
+                        help="Warm up each debate's models before it starts, keep them loaded while in use "
+                             "and unload them when the run is done with them")
+    parser.add_argument('--num-parallel', type=int, default=None,
+                        help="Queue generations client-side, at most this many per model and host (match "
+                             "the server's OLLAMA_NUM_PARALLEL); started debates are served first")
+    parser.add_argument('--config-weight', action='append', default=[], metavar='NAME=WEIGHT',
+                        help='Relative share of a baseline model or ensemble config under --num-parallel '
+                             '(default: 1 each); may be repeated')
+    parser.add_argument('--search-configs', action='store_true',
+                        help='Search role assignments of the known models for the best evaluator score per second')
+    parser.add_argument('--search-scenarios', type=int, default=8,
+                        help='Scenarios the best configs of the search debate (default: 8)')
+    parser.add_argument('--eta', type=int, default=2,
+                        help='Successive halving keeps 1/eta of the configs per rung (default: 2)')
+    parser.add_argument('--memory-budget', type=float, default=None,
+                        help="Prune configs whose models together need more GB than this")
+    parser.add_argument('--max-debate-seconds', type=float, default=None,
+                        help='Prune configs whose probed latency predicts longer debates than this')
+    parser.add_argument('--evaluator-model', default='deepseek-r1:14b', help='Model scoring the search debates')
     parser.add_argument('--log-level', default='INFO', help='Logging level')
     
     args = parser.parse_args()
     
     setup_logging(args.log_level)
     
+    ollama_url = args.ollama_url[0] if len(args.ollama_url) == 1 else args.ollama_url
+    request_scheduler = None
+    if args.num_parallel is not None:
+        weights = {name: float(weight) for name, weight in (item.split('=', 1) for item in args.config_weight)}
+        # Each host serves num_parallel requests of a model at a time
+        request_scheduler = RequestScheduler(args.num_parallel * len(args.ollama_url), weights=weights)
+    orchestrator_options = {
+        "ollama_url": ollama_url,
+        "max_concurrency": args.max_concurrency,
+        "schedule": args.schedule,
+        "resident_models": args.resident_models,
+        "cache_dir": args.cache_dir,
+        "seed": args.seed,
+        "stream": args.stream,
+        "reuse_context": args.reuse_context,
+        "session_options": {"early_stop": stop_on_forfeit} if args.stop_on_forfeit else None,
+        "decided_confidence": args.stop_when_decided,
+        "context_policy": make_context_policy(args.context_policy, args.context_rounds,
+                                              args.context_tokens, args.judge_context_tokens),
+        "retry": RetryPolicy(max_attempts=args.max_retries + 1),
+        "timeouts": AdaptiveTimeouts(factor=args.timeout_factor, load_allowance=args.load_allowance,
+                                     fixed=args.timeout),
+        "manage_residency": args.manage_residency,
+        "coalesce": {"auto": None, "on": True, "off": False}[args.coalesce],
+        "request_scheduler": request_scheduler
+    }
+    
     if args.evaluate_only:
-        evaluate_results(args.evaluate_only)
+        evaluate_results(args.evaluate_only, args.cache_dir, args.seed, ollama_url)
     elif args.resume:
-        results_file = resume_experiment(args.resume)
-        evaluate_results(results_file)
+        results_file = resume_experiment(args.resume, orchestrator_options)
+        evaluate_results(results_file, args.cache_dir, args.seed, ollama_url)
+    elif args.search_configs:
+        run_config_search(orchestrator_options, args.search_scenarios, evaluator_model=args.evaluator_model,
+                          eta=args.eta, memory_budget_gb=args.memory_budget,
+                          max_debate_seconds=args.max_debate_seconds)
     elif args.quick_test:
-        results_file = run_quick_test()
+        results_file = run_quick_test(orchestrator_options)
         # evaluate_results(results_file)
     elif args.small:
-        results_file = run_small_experiment()
-        evaluate_results(results_file)
+        results_file = run_small_experiment(orchestrator_options)
+        evaluate_results(results_file, args.cache_dir, args.seed, ollama_url)
     elif args.full:
-        results_file = run_full_experiment()
-        evaluate_results(results_file)
+        results_file = run_full_experiment(orchestrator_options)
+        evaluate_results(results_file, args.cache_dir, args.seed, ollama_url)
     else:
         print("Please specify an experiment type. Use --help for options.")
         print("\nRecommended: Start with --quick-test to verify everything works")
-        print("\nTo resume a crashed experiment, use: --resume path/to/incremental_file.json")
+        print("\nTo resume a crashed experiment, use: --resume path/to/incremental_file.jsonl")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
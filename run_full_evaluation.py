@@ -15,8 +15,12 @@ sys.path.append('src')
 
 from evaluation_framework import DebateEvaluator, EvaluationMetrics
 from debate_protocol import OllamaClient
+from response_cache import ResponseCache
+from results_log import load_results
 
-def run_comprehensive_evaluation(results_file: str, evaluator_model: str = "deepseek-r1:8b"):
+def run_comprehensive_evaluation(results_file: str, evaluator_model: str = "deepseek-r1:8b",
+                                 cache_dir: str = None, seed: int = None, single_call: bool = False,
+                                 parallel_metrics: int = 1):
     """
     Run comprehensive LLM evaluation with progress tracking and error handling
     Using 8B model instead of 14B for faster evaluation
@@ -28,12 +32,13 @@ def run_comprehensive_evaluation(results_file: str, evaluator_model: str = "deep
     
     # Load results
     print(f"Loading results from: {results_file}")
-    with open(results_file, 'r') as f:
-        results = json.load(f)
+    results = load_results(results_file)
     
     # Initialize evaluator with smaller/faster model
     print(f"Initializing evaluator with model: {evaluator_model}")
-    evaluator = DebateEvaluator(evaluator_model=evaluator_model)
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    evaluator = DebateEvaluator(evaluator_model=evaluator_model, client=OllamaClient(seed=seed, cache=cache),
+                                single_call=single_call, max_parallel_metrics=parallel_metrics)
     
     # Collect all results for evaluation
     all_baseline_results = []
@@ -130,10 +135,16 @@ def run_comprehensive_evaluation(results_file: str, evaluator_model: str = "deep
     report = generate_full_research_report(comparison_data, results, baseline_evaluations, ensemble_evaluations)
     
     # Save evaluation results
-    eval_output_file = results_file.replace('.json', '_full_evaluation.json')
+    if cache is not None:
+        print(f"Response cache: {cache.stats()}")
+    if single_call:
+        print(f"Single-call rubric stats: {evaluator.single_call_stats}")
+    
+    eval_output_file = os.path.splitext(results_file)[0] + '_full_evaluation.json'
     evaluation_data = {
         'metadata': {
             'evaluator_model': evaluator_model,
+            'single_call': single_call,
             'evaluation_timestamp': time.time(),
             'total_debates_evaluated': total_debates
         },
@@ -163,10 +174,12 @@ def run_comprehensive_evaluation(results_file: str, evaluator_model: str = "deep
         json.dump(evaluation_data, f, indent=2, ensure_ascii=False)
     
     # Save report with UTF-8 encoding
-    report_file = results_file.replace('.json', '_comprehensive_report.md')
+    report_file = os.path.splitext(results_file)[0] + '_comprehensive_report.md'
     with open(report_file, 'w', encoding='utf-8') as f:
         f.write(report)
     
+    evaluator.close()
+    
     print(f"\n" + "="*60)
     print("EVALUATION COMPLETE")
     print("="*60)
@@ -341,6 +354,14 @@ def main():
     parser.add_argument('results_file', help='Path to experiment results JSON file')
     parser.add_argument('--evaluator-model', default='deepseek-r1:8b', 
                        help='Model to use for evaluation (default: deepseek-r1:8b)')
+    parser.add_argument('--cache-dir', default=None,
+                       help='Serve repeated evaluator prompts from an on-disk response cache')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Fixed generation seed for reproducible (cacheable) scores')
+    parser.add_argument('--single-call', action='store_true',
+                       help='Score all five rubrics in one JSON response per debate (about 5x fewer calls)')
+    parser.add_argument('--parallel-metrics', type=int, default=1,
+                       help='Number of rubric prompts to run concurrently (default: 1)')
     
     args = parser.parse_args()
     
@@ -350,11 +371,16 @@ def main():
     
     print(f"Starting comprehensive evaluation of: {args.results_file}")
     print(f"Using evaluator model: {args.evaluator_model}")
-    print(f"Estimated time: 1-2 hours depending on number of debates")
+    if args.single_call:
+        print(f"Estimated time: 15-30 minutes depending on number of debates")
+    else:
+        print(f"Estimated time: 1-2 hours depending on number of debates")
     print()
     
     try:
-        evaluation_data, report = run_comprehensive_evaluation(args.results_file, args.evaluator_model)
+        evaluation_data, report = run_comprehensive_evaluation(args.results_file, args.evaluator_model,
+                                                               args.cache_dir, args.seed, args.single_call,
+                                                               args.parallel_metrics)
         print("\nEvaluation completed successfully!")
         
     except KeyboardInterrupt:
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+# Request timeout used for a model until min_samples of its latencies are known
+INITIAL_TIMEOUT_SECONDS = 60.0
+
+# Extra time allowed for loading a model that is not resident, until a load has been observed
+DEFAULT_LOAD_ALLOWANCE_SECONDS = 120.0
+
+# Ollama unloads an idle model after its default keep_alive of five minutes
+DEFAULT_WARM_SECONDS = 300.0
+
+def _quantile(values: List[float], q: float) -> float:
+    """Nearest-rank quantile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class _ModelLatency:
+    """Rolling latency samples of one model"""
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)  # Generation seconds, load excluded
+        self.loads: Deque[float] = deque(maxlen=window)  # Cold-load seconds
+        self.last_used: Optional[float] = None
+        self.timeouts = 0
+
+class AdaptiveTimeouts:
+    """Per-model request timeouts derived from observed latency.
+
+    A warm request may take factor times the model's `quantile` latency over
+    the last `window` generations, clamped to [min_timeout, max_timeout].
+    A cold request (the model may have to be loaded first) also gets a load
+    allowance of factor times the quantile of its observed load times, or
+    load_allowance before any load has been seen. Until min_samples
+    generations are known the warm timeout is initial_timeout. Timed out
+    requests are counted but are not latency samples, so a model that keeps
+    stalling does not earn itself longer timeouts. fixed disables adaptation.
+    """
+
+    def __init__(self, factor: float = 3.0, quantile: float = 0.99, window: int = 200, min_samples: int = 10,
+                 initial_timeout: float = INITIAL_TIMEOUT_SECONDS, min_timeout: float = 10.0,
+                 max_timeout: float = 900.0, load_allowance: float = DEFAULT_LOAD_ALLOWANCE_SECONDS,
+                 warm_seconds: float = DEFAULT_WARM_SECONDS, fixed: float = None):
+        self.factor = factor
+        self.quantile = quantile
+        self.window = window
+        self.min_samples = min_samples
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.load_allowance = load_allowance
+        self.warm_seconds = warm_seconds
+        self.fixed = fixed
+        self._lock = threading.Lock()
+        self._models: Dict[str, _ModelLatency] = {}
+
+    def _model(self, model: str) -> _ModelLatency:
+        latency = self._models.get(model)
+        if latency is None:
+            latency = self._models[model] = _ModelLatency(self.window)
+        return latency
+
+    def record(self, model: str, stats: Dict):
+        """Add a completed generation's wall time and load time to the model's samples"""
+        if stats.get("cached") or stats.get("cancelled") or stats.get("wall_time") is None:
+            return
+        load = stats.get("load_duration", 0) / 1e9
+        with self._lock:
+            latency = self._model(model)
+            latency.latencies.append(max(0.0, stats["wall_time"] - load))
+            # Resident models report a few milliseconds of load_duration
+            if load >= 0.1:
+                latency.loads.append(load)
+            latency.last_used = time.time()
+
+    def record_load(self, model: str, seconds: float):
+        """Add the time of an explicit model load (see residency.py) to the model's load samples"""
+        with self._lock:
+            latency = self._model(model)
+            if seconds >= 0.1:
+                latency.loads.append(seconds)
+            latency.last_used = time.time()
+
+    def record_timeout(self, model: str, seconds: float):
+        """Count a request of model that ran into its timeout of seconds; the latency samples are left as they are"""
+        with self._lock:
+            self._model(model).timeouts += 1
+
+    def is_warm(self, model: str) -> bool:
+        """Whether model ran recently enough to still be loaded"""
+        with self._lock:
+            latency = self._models.get(model)
+            return (latency is not None and latency.last_used is not None
+                    and time.time() - latency.last_used < self.warm_seconds)
+
+    def timeout_for(self, model: str, cold: bool = None) -> float:
+        """Timeout in seconds for the next request of model.
+
+        cold says whether the model may need loading first; None guesses from
+        how recently it was used.
+        """
+        if self.fixed is not None:
+            return self.fixed
+        if cold is None:
+            cold = not self.is_warm(model)
+        with self._lock:
+            return self._timeout(self._models.get(model), cold)
+
+    def _timeout(self, latency: Optional[_ModelLatency], cold: bool) -> float:
+        if latency is None or len(latency.latencies) < self.min_samples:
+            timeout = self.initial_timeout
+        else:
+            timeout = min(self.max_timeout, max(self.min_timeout,
+                                                _quantile(list(latency.latencies), self.quantile) * self.factor))
+        if cold:
+            if latency is not None and latency.loads:
+                timeout += _quantile(list(latency.loads), self.quantile) * self.factor
+            else:
+                timeout += self.load_allowance
+        return min(self.max_timeout, timeout)
+
+    def stats(self) -> Dict:
+        """Timeout settings plus per-model latency quantiles and effective warm and cold timeouts"""
+        with self._lock:
+            models = {}
+            for model, latency in self._models.items():
+                samples = list(latency.latencies)
+                models[model] = {
+                    "samples": len(samples),
+                    "p50": _quantile(samples, 0.5) if samples else None,
+                    "p99": _quantile(samples, 0.99) if samples else None,
+                    "load_samples": len(latency.loads),
+                    "load_p99": _quantile(list(latency.loads), 0.99) if latency.loads else None,
+                    "timeouts": latency.timeouts,
+                    "timeout": self.fixed if self.fixed is not None else self._timeout(latency, False),
+                    "cold_timeout": self.fixed if self.fixed is not None else self._timeout(latency, True)
+                }
+        return {
+            "settings": {"factor": self.factor, "quantile": self.quantile, "window": self.window,
+                         "min_samples": self.min_samples, "initial_timeout": self.initial_timeout,
+                         "min_timeout": self.min_timeout, "max_timeout": self.max_timeout,
+                         "load_allowance": self.load_allowance, "fixed": self.fixed},
+            "models": models
+        }
@@ -1,4 +1,3 @@
-import json
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -7,6 +6,9 @@ from typing import Dict, List, Any
 from datetime import datetime
 import os
 
+from debate_protocol import ACCOUNTING_FIELDS, turn_accounting
+from results_log import load_results
+
 class ResultsAnalyzer:
     def __init__(self, results_file: str = None):
         self.results_file = results_file
@@ -15,9 +17,8 @@ class ResultsAnalyzer:
             self.load_results(results_file)
     
     def load_results(self, results_file: str):
-        """Load experiment results from JSON file"""
-        with open(results_file, 'r') as f:
-            self.results = json.load(f)
+        """Load experiment results from a JSON file or JSONL debate log"""
+        self.results = load_results(results_file)
         print(f"Loaded results from {results_file}")
     
     def create_performance_dataframe(self) -> pd.DataFrame:
@@ -64,6 +65,92 @@ class ResultsAnalyzer:
         
         return pd.DataFrame(rows)
     
+    def create_turn_dataframe(self) -> pd.DataFrame:
+        """One row per generated turn with its token and latency accounting (durations in seconds).
+        
+        shared marks turns Ollama did not generate for that debate: cache
+        hits and requests coalesced into an identical one (see ollama_client.py).
+        """
+        if not self.results:
+            raise ValueError("No results loaded. Call load_results() first.")
+        
+        rows = []
+        for result_type in ("baseline", "ensemble"):
+            for name, debates in self.results[f"{result_type}_results"].items():
+                for debate_index, result in enumerate(debates):
+                    for argument in result['arguments']:
+                        stats = argument.get('generation_stats') or {}
+                        # Results saved before per-turn accounting only have it in their generation stats
+                        accounting = turn_accounting(stats)
+                        accounting.update({field: argument[field] for field in ACCOUNTING_FIELDS
+                                           if argument.get(field) is not None})
+                        rows.append({
+                            'type': result_type,
+                            'model_or_config': name,
+                            'debate': debate_index,
+                            'debate_time': result['total_time'],
+                            'role': argument['role'],
+                            'model': argument['model'],
+                            'round_number': argument['round_number'],
+                            'prompt_eval_tokens': stats.get('prompt_eval_count'),
+                            'shared': bool(stats.get('cached') or stats.get('coalesced')),
+                            **accounting
+                        })
+        columns = ['type', 'model_or_config', 'debate', 'debate_time', 'role', 'model', 'round_number',
+                   'prompt_eval_tokens', 'shared'] + ACCOUNTING_FIELDS
+        return pd.DataFrame(rows, columns=columns).astype({field: float for field in ACCOUNTING_FIELDS
+                                                           + ['prompt_eval_tokens']})
+    
+    def token_throughput_table(self, turns: pd.DataFrame) -> pd.DataFrame:
+        """Per-model prompt and decode tokens/sec and mean per-turn latency split, from turns Ollama generated"""
+        generated = turns[~turns['shared']]
+        grouped = generated.groupby('model')
+        
+        def rate(tokens: str, seconds: str) -> pd.Series:
+            # Only turns that report both the tokens and their duration
+            timed = generated.dropna(subset=[tokens, seconds]).groupby('model')
+            return (timed[tokens].sum() / timed[seconds].sum()).replace([np.inf, -np.inf], np.nan)
+        
+        table = pd.DataFrame({
+            'turns': grouped.size(),
+            'prompt_tokens': grouped['prompt_tokens'].sum(),
+            'generated_tokens': grouped['generated_tokens'].sum(),
+            'prompt_tokens_per_sec': rate('prompt_eval_tokens', 'prompt_eval_duration'),
+            'decode_tokens_per_sec': rate('generated_tokens', 'eval_duration'),
+            'avg_load_seconds': grouped['load_duration'].mean(),
+            'avg_prompt_eval_seconds': grouped['prompt_eval_duration'].mean(),
+            'avg_eval_seconds': grouped['eval_duration'].mean(),
+            'avg_queue_wait': grouped['queue_wait'].mean()
+        })
+        return table.sort_values('decode_tokens_per_sec', ascending=False)
+    
+    def cost_table(self, turns: pd.DataFrame) -> pd.DataFrame:
+        """Mean seconds per debate of each model/config, split into load, prompt eval, decode, queue and overhead.
+        
+        compute_seconds is the Ollama time a debate cost (shared turns cost
+        nothing); overhead is the rest of the debate time, e.g. HTTP, waiting
+        on a coalesced request or failed attempts.
+        """
+        turns = turns.assign(**{field: turns[field].where(~turns['shared'], 0.0)
+                                for field in ['load_duration', 'prompt_eval_duration', 'eval_duration']})
+        debates = turns.groupby(['type', 'model_or_config', 'debate']).agg(
+            debate_time=('debate_time', 'first'),
+            load_seconds=('load_duration', 'sum'),
+            prompt_eval_seconds=('prompt_eval_duration', 'sum'),
+            decode_seconds=('eval_duration', 'sum'),
+            queue_seconds=('queue_wait', 'sum'),
+            prompt_tokens=('prompt_tokens', 'sum'),
+            generated_tokens=('generated_tokens', 'sum')
+        )
+        debates['compute_seconds'] = debates['load_seconds'] + debates['prompt_eval_seconds'] + debates['decode_seconds']
+        debates['overhead_seconds'] = (debates['debate_time'] - debates['compute_seconds']
+                                       - debates['queue_seconds']).clip(lower=0)
+        table = debates.groupby(['type', 'model_or_config']).mean()
+        table.insert(0, 'debates', debates.groupby(['type', 'model_or_config']).size())
+        table['compute_seconds_per_1k_tokens'] = (1000 * table['compute_seconds']
+                                                  / table['generated_tokens'].replace(0, np.nan))
+        return table.sort_values('debate_time')
+    
     def analyze_performance_by_category(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze performance breakdown by scenario category"""
         analysis = {}
@@ -238,6 +325,8 @@ class ResultsAnalyzer:
             report.append(f"**{model}**: {avg_time}±{std_time}s ({count} debates)")
         report.append("")
         
+        report.extend(self._token_report_lines())
+        
         # Conclusions
         report.append("## Key Findings & Conclusions")
         report.append("")
@@ -273,6 +362,31 @@ class ResultsAnalyzer:
         
         return report_text
 
+    def _token_report_lines(self) -> List[str]:
+        """Token throughput and cost sections of the report; empty for results without per-turn accounting"""
+        turns = self.create_turn_dataframe()
+        if turns.empty or turns['eval_duration'].isna().all():
+            return []
+        
+        lines = ["## Token Throughput", ""]
+        for model, row in self.token_throughput_table(turns).iterrows():
+            lines.append(f"**{model}**: {row['decode_tokens_per_sec']:.1f} decode tok/s, "
+                         f"{row['prompt_tokens_per_sec']:.1f} prompt tok/s "
+                         f"({row['turns']:.0f} turns, {row['generated_tokens']:.0f} tokens generated)")
+        lines.append("")
+        
+        lines.extend(["## Cost Breakdown", "",
+                      "Mean seconds per debate: model loading + prompt evaluation + decoding + "
+                      "client queueing + overhead.", ""])
+        for (result_type, name), row in self.cost_table(turns).iterrows():
+            lines.append(f"**{name}** ({result_type}): {row['debate_time']:.2f}s = "
+                         f"load {row['load_seconds']:.2f}s + prompt {row['prompt_eval_seconds']:.2f}s + "
+                         f"decode {row['decode_seconds']:.2f}s + queue {row['queue_seconds']:.2f}s + "
+                         f"overhead {row['overhead_seconds']:.2f}s; "
+                         f"{row['compute_seconds_per_1k_tokens']:.2f} compute s per 1k generated tokens")
+        lines.append("")
+        return lines
+
 if __name__ == "__main__":
     print("Analysis Tools for Ensemble Debates")
     print("Usage: analyzer = ResultsAnalyzer('path/to/results.json')")
@@ -0,0 +1,248 @@
+import itertools
+import logging
+import math
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from debate_protocol import DebateProtocol, DebateRole
+from evaluation_framework import DebateEvaluator
+from resilience import GenerationError
+
+# Resident size of Ollama's default 4-bit models: about 0.6 GB per billion parameters plus runtime overhead
+GB_PER_BILLION_PARAMETERS = 0.6
+MODEL_OVERHEAD_GB = 0.5
+
+ROLES = ("proponent", "opponent", "judge")
+
+def estimate_model_memory_gb(model: str) -> Optional[float]:
+    """Rough resident size of a model from the parameter count in its tag, e.g. "deepseek-r1:14b" """
+    match = re.search(r":(\d+(?:\.\d+)?)b\b", model)
+    if match is None:
+        return None
+    return float(match.group(1)) * GB_PER_BILLION_PARAMETERS + MODEL_OVERHEAD_GB
+
+def config_name(config: Dict[str, str]) -> str:
+    return "+".join(config[role] for role in ROLES)
+
+def enumerate_role_assignments(model_configs: Dict[str, Dict]) -> Dict[str, Dict[str, str]]:
+    """Every ensemble config the models' role preferences allow, by name; proponent and opponent differ"""
+    candidates = {role: [model for model, config in model_configs.items()
+                         if DebateRole(role) in config["role_preference"]] for role in ROLES}
+    configs = {}
+    for models in itertools.product(*(candidates[role] for role in ROLES)):
+        config = dict(zip(ROLES, models))
+        if config["proponent"] != config["opponent"]:
+            configs[config_name(config)] = config
+    return configs
+
+def pareto_frontier(points: Dict[str, Tuple[float, float]]) -> List[str]:
+    """Names whose (score, seconds) no other point beats, i.e. scores at least as high in no more time"""
+    def dominated(name: str) -> bool:
+        score, seconds = points[name]
+        return any(other_score >= score and other_seconds <= seconds
+                   and (other_score, other_seconds) != (score, seconds)
+                   for other, (other_score, other_seconds) in points.items() if other != name)
+    return sorted((name for name in points if not dominated(name)), key=lambda name: points[name][1])
+
+@dataclass
+class ModelMeasurement:
+    """Latency and memory of one model, from a probe turn"""
+    model: str
+    turn_seconds: float  # Probe turn's wall time, model load excluded
+    load_seconds: float
+    memory_gb: Optional[float]
+    memory_measured: bool  # From /api/ps rather than estimate_model_memory_gb
+
+@dataclass
+class Candidate:
+    """An ensemble config and the debates it has run so far"""
+    name: str
+    config: Dict[str, str]
+    estimated_seconds: float
+    scores: List[float] = field(default_factory=list)
+    seconds: List[float] = field(default_factory=list)
+    failed_debates: int = 0
+    rung: int = 0  # Last successive-halving rung it ran in
+
+    @property
+    def debates(self) -> int:
+        return len(self.scores) + self.failed_debates
+
+    @property
+    def mean_score(self) -> float:
+        return sum(self.scores) / len(self.scores) if self.scores else 0.0
+
+    @property
+    def seconds_per_debate(self) -> float:
+        return sum(self.seconds) / len(self.seconds) if self.seconds else math.inf
+
+    def describe(self) -> Dict:
+        return {"config": self.config, "debates": self.debates, "failed_debates": self.failed_debates,
+                "mean_score": self.mean_score, "seconds_per_debate": self.seconds_per_debate,
+                "estimated_seconds": self.estimated_seconds, "rung": self.rung}
+
+class ConfigSearch:
+    """Cost-aware search over ensemble role assignments.
+
+    Candidates are every role assignment the protocol's model_configs allow
+    (see enumerate_role_assignments). One probe turn per model measures its
+    turn latency, load time and memory (from /api/ps, else estimated from the
+    parameter count), and candidates whose models together exceed
+    memory_budget_gb or whose estimated debate exceeds max_debate_seconds
+    are pruned before any debate runs. The rest go through successive
+    halving over the scenarios: every survivor debates min_scenarios
+    scenarios and is scored by the evaluator; the best 1/eta, by Pareto rank
+    of (mean score, seconds per debate) and then by score, move on and
+    debate eta times as many. The result's frontier holds the final
+    survivors not beaten on both score and time.
+    """
+
+    def __init__(self, protocol: DebateProtocol, evaluator: DebateEvaluator, rounds: int = 2, eta: int = 2,
+                 min_scenarios: int = 1, memory_budget_gb: float = None, max_debate_seconds: float = None,
+                 max_concurrency: int = 1, session_options: Dict = None):
+        self.protocol = protocol
+        self.evaluator = evaluator
+        self.rounds = rounds
+        self.eta = max(2, eta)
+        self.min_scenarios = max(1, min_scenarios)
+        self.memory_budget_gb = memory_budget_gb
+        self.max_debate_seconds = max_debate_seconds
+        self.max_concurrency = max(1, max_concurrency)
+        self.session_options = dict(session_options or {})
+
+    def measure_models(self, models: List[str], topic: str) -> Dict[str, ModelMeasurement]:
+        """Time one debate turn per model; models whose probe fails are left out"""
+        measurements = {}
+        for model in models:
+            start_time = time.time()
+            try:
+                _, stats = self.protocol.generate_turn(model, DebateRole.PROPONENT, topic)
+            except GenerationError as e:
+                logging.warning(f"Leaving {model} out of the search, its probe failed: {e}")
+                continue
+            load = stats.get("load_duration", 0) / 1e9
+            memory = self._measured_memory_gb(model)
+            measurements[model] = ModelMeasurement(
+                model=model,
+                turn_seconds=stats.get("wall_time", time.time() - start_time) - load,
+                load_seconds=load,
+                memory_gb=memory if memory is not None else estimate_model_memory_gb(model),
+                memory_measured=memory is not None
+            )
+            logging.info(f"Probed {model}: {measurements[model]}")
+        return measurements
+
+    def _measured_memory_gb(self, model: str) -> Optional[float]:
+        loaded_models = getattr(self.protocol.client, "loaded_models", None)
+        if loaded_models is None:
+            return None
+        try:
+            size = loaded_models().get(model)
+        except (requests.exceptions.RequestException, ValueError):
+            return None
+        return size / 1e9 if size else None
+
+    def estimate_debate_seconds(self, config: Dict[str, str], measurements: Dict[str, ModelMeasurement]) -> float:
+        """Debate time from the probes: every turn, plus one load of each model"""
+        turns = self.rounds * (measurements[config["proponent"]].turn_seconds
+                               + measurements[config["opponent"]].turn_seconds)
+        turns += measurements[config["judge"]].turn_seconds
+        return turns + sum(measurements[model].load_seconds for model in set(config.values()))
+
+    def prune(self, configs: Dict[str, Dict[str, str]],
+              measurements: Dict[str, ModelMeasurement]) -> Tuple[List[Candidate], Dict[str, str]]:
+        """Candidates within the memory and latency limits, and the reason each other config was dropped"""
+        candidates, pruned = [], {}
+        for name, config in configs.items():
+            missing = [model for model in config.values() if model not in measurements]
+            if missing:
+                pruned[name] = f"unavailable: {', '.join(sorted(set(missing)))}"
+                continue
+            memory = [measurements[model].memory_gb for model in set(config.values())]
+            if self.memory_budget_gb is not None and None not in memory and sum(memory) > self.memory_budget_gb:
+                pruned[name] = f"needs {sum(memory):.1f} GB"
+                continue
+            estimate = self.estimate_debate_seconds(config, measurements)
+            if self.max_debate_seconds is not None and estimate > self.max_debate_seconds:
+                pruned[name] = f"estimated {estimate:.1f}s per debate"
+                continue
+            candidates.append(Candidate(name, config, estimate))
+        return candidates, pruned
+
+    def run(self, scenarios: List[Dict], configs: Dict[str, Dict[str, str]] = None) -> Dict:
+        """Search configs (default: every role assignment of the protocol's model_configs) on scenarios"""
+        if configs is None:
+            configs = enumerate_role_assignments(self.protocol.model_configs)
+        models = sorted({model for config in configs.values() for model in config.values()})
+        measurements = self.measure_models(models, scenarios[0]["topic"])
+        survivors, pruned = self.prune(configs, measurements)
+        logging.info(f"Config search: {len(survivors)} of {len(configs)} configs left after pruning")
+        candidates = list(survivors)
+
+        rungs = []
+        used, budget = 0, self.min_scenarios
+        while survivors:
+            target = min(budget, len(scenarios))
+            self._run_debates(survivors, scenarios[used:target], len(rungs))
+            rungs.append({"scenarios": target, "configs": [candidate.name for candidate in survivors]})
+            logging.info(f"Rung {len(rungs)}: {len(survivors)} configs on {target} scenarios")
+            if target >= len(scenarios) or len(survivors) <= 1:
+                break
+            survivors = self._select(survivors, math.ceil(len(survivors) / self.eta))
+            used, budget = target, target * self.eta
+
+        points = {candidate.name: (candidate.mean_score, candidate.seconds_per_debate)
+                  for candidate in survivors if candidate.scores}
+        frontier = pareto_frontier(points)
+        return {
+            "settings": {"rounds": self.rounds, "eta": self.eta, "min_scenarios": self.min_scenarios,
+                         "memory_budget_gb": self.memory_budget_gb, "max_debate_seconds": self.max_debate_seconds},
+            "measurements": {model: vars(measurement) for model, measurement in measurements.items()},
+            "pruned": pruned,
+            "rungs": rungs,
+            "candidates": {candidate.name: candidate.describe() for candidate in candidates},
+            "frontier": [{"name": name, **next(c for c in survivors if c.name == name).describe()}
+                         for name in frontier],
+            "debates_run": sum(candidate.debates for candidate in candidates),
+            "exhaustive_debates": len(configs) * len(scenarios)
+        }
+
+    def _run_debates(self, candidates: List[Candidate], scenarios: List[Dict], rung: int):
+        """Debate and score every (candidate, scenario) pair on a bounded worker pool"""
+        def debate(candidate: Candidate, scenario: Dict) -> Tuple[float, float]:
+            options = dict(self.session_options, flow=candidate.name)
+            result = self.protocol.run_ensemble_debate(candidate.config, scenario["topic"], self.rounds, **options)
+            return self.evaluator.evaluate_debate_quality(result, scenario).overall_score, result.total_time
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = {executor.submit(debate, candidate, scenario): candidate
+                       for candidate in candidates for scenario in scenarios}
+            for future in as_completed(futures):
+                candidate = futures[future]
+                candidate.rung = rung
+                try:
+                    score, seconds = future.result()
+                except Exception as e:
+                    logging.error(f"Debate of {candidate.name} failed: {e}")
+                    candidate.failed_debates += 1
+                    continue
+                candidate.scores.append(score)
+                candidate.seconds.append(seconds)
+
+    @staticmethod
+    def _select(candidates: List[Candidate], keep: int) -> List[Candidate]:
+        """The keep best candidates: Pareto fronts in order, the last one cut by score"""
+        remaining = {candidate.name: candidate for candidate in candidates}
+        selected = []
+        while remaining and len(selected) < keep:
+            front = pareto_frontier({name: (candidate.mean_score, candidate.seconds_per_debate)
+                                     for name, candidate in remaining.items()})
+            front.sort(key=lambda name: (-remaining[name].mean_score, remaining[name].seconds_per_debate))
+            for name in front[:keep - len(selected)]:
+                selected.append(remaining.pop(name))
+        return selected
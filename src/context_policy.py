@@ -0,0 +1,135 @@
+import re
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Optional
+
+from transcript import Transcript, estimate_tokens
+
+# A context policy renders the debaters' context for one turn from the debate's
+# Transcript: policy(transcript, role) -> str. The judge's transcript prefix is
+# added by DebateProtocol. Renders are memoized on the transcript, so turns of
+# different debates never share a view. Policies other than FullTranscript
+# rewrite earlier parts of the context, so KV-context reuse only applies while
+# the rendered context keeps extending what the model last saw.
+
+@dataclass
+class FullTranscript:
+    """Every debater turn, verbatim (the default)"""
+
+    def __call__(self, transcript: Transcript, role) -> str:
+        return transcript.debate_context()
+
+@dataclass
+class SlidingWindow:
+    """Only the last `rounds` rounds of the debate, including the round in progress"""
+    rounds: int = 2
+
+    def __call__(self, transcript: Transcript, role) -> str:
+        return transcript.memoize(("policy", repr(self)), lambda: Transcript.format_debate(
+            self._window(transcript.debaters())))
+
+    def _window(self, turns):
+        if not turns:
+            return turns
+        first_round = turns[-1].round_number - self.rounds + 1
+        return [arg for arg in turns if arg.round_number >= first_round]
+
+@dataclass
+class SummarizeOlderRounds:
+    """The last `recent_rounds` rounds verbatim, earlier rounds as the lead of each argument.
+
+    The summary is extractive (the opening sentences of each turn, up to
+    lead_chars characters), so it costs no extra generation.
+    """
+    recent_rounds: int = 1
+    lead_chars: int = 200
+
+    def __call__(self, transcript: Transcript, role) -> str:
+        return transcript.memoize(("policy", repr(self)), lambda: self._render(transcript.debaters()))
+
+    def _render(self, turns) -> str:
+        if not turns:
+            return ""
+        first_recent = turns[-1].round_number - self.recent_rounds + 1
+        older = [arg for arg in turns if arg.round_number < first_recent]
+        recent = [arg for arg in turns if arg.round_number >= first_recent]
+        if not older:
+            return Transcript.format_debate(recent)
+        summary = "\n".join(f"{arg.role.value.title()} (Round {arg.round_number}): {self._lead(arg.content)}"
+                            for arg in older)
+        return f"\nSummary of earlier rounds:\n{summary}\n{Transcript.format_debate(recent)}"
+
+    def _lead(self, content: str) -> str:
+        text = " ".join(content.split())
+        if len(text) <= self.lead_chars:
+            return text
+        clipped = text[:self.lead_chars]
+        # Cut at the last sentence end inside the limit, else at a word boundary
+        sentence_end = max(clipped.rfind(". "), clipped.rfind("! "), clipped.rfind("? "))
+        if sentence_end > 0:
+            return clipped[:sentence_end + 1]
+        return re.sub(r"\s+\S*$", "", clipped) + "..."
+
+@dataclass
+class RoleTokenBudget:
+    """Most recent debater turns that fit a per-role token budget.
+
+    budgets maps a role value ("proponent", "opponent", "judge") to its budget
+    in estimated tokens; roles without an entry use default_budget, or see the
+    full transcript when that is None as well.
+    """
+    budgets: Dict[str, int] = field(default_factory=dict)
+    default_budget: Optional[int] = None
+
+    def __call__(self, transcript: Transcript, role) -> str:
+        budget = self.budgets.get(role.value, self.default_budget)
+        if budget is None:
+            return transcript.debate_context()
+        return transcript.memoize(("policy", repr(self), budget), lambda: self._render(transcript.debaters(), budget))
+
+    @staticmethod
+    def _render(turns, budget: int) -> str:
+        kept = 0
+        for arg in reversed(turns):
+            budget -= estimate_tokens(arg.content) + 8  # role/round label and separators
+            if budget < 0:
+                break
+            kept += 1
+        return Transcript.format_debate(turns[len(turns) - kept:])
+
+# Budget of the budget policy when none is given; leaves room for the system prompt and
+# the response inside Ollama's default 2048-token context window
+DEFAULT_CONTEXT_TOKENS = 1024
+
+CONTEXT_POLICIES = {
+    "full": FullTranscript,
+    "window": SlidingWindow,
+    "summary": SummarizeOlderRounds,
+    "budget": RoleTokenBudget
+}
+
+def make_context_policy(name: str, rounds: int = None, tokens: int = None, judge_tokens: int = None):
+    """Context policy from command-line style options.
+
+    rounds sets the window (window) or verbatim rounds (summary); tokens is the
+    debaters' budget (DEFAULT_CONTEXT_TOKENS if not given) and judge_tokens
+    the judge's (budget).
+    """
+    if name not in CONTEXT_POLICIES:
+        raise ValueError(f"Unknown context policy: {name}")
+    if name == "window":
+        return SlidingWindow(rounds) if rounds else SlidingWindow()
+    if name == "summary":
+        return SummarizeOlderRounds(rounds) if rounds else SummarizeOlderRounds()
+    if name == "budget":
+        budgets = {} if judge_tokens is None else {"judge": judge_tokens}
+        return RoleTokenBudget(budgets, default_budget=tokens or DEFAULT_CONTEXT_TOKENS)
+    return FullTranscript()
+
+def describe_context_policy(policy) -> Dict[str, Any]:
+    """JSON-safe description of a context policy for run metadata"""
+    if policy is None:
+        policy = FullTranscript()
+    try:
+        return {"name": type(policy).__name__, **asdict(policy)}
+    except TypeError:
+        return {"name": getattr(policy, "__name__", repr(policy))}
@@ -1,11 +1,24 @@
-import requests
+import asyncio
 import json
+import threading
 import time
 import logging
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+import re
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
 from enum import Enum
 
+# Clients live in ollama_client.py; re-exported here for existing imports
+from ollama_client import OllamaClient, AsyncOllamaClient
+from request_scheduler import RequestClass, RequestTag
+from resilience import GenerationError
+from transcript import Transcript, estimate_tokens
+from context_policy import FullTranscript
+
+# Prefix of the judge's context; the transcript after it is shared with the debaters' context
+JUDGE_CONTEXT_PREFIX = "Full debate transcript:\n"
+
 class DebateRole(Enum):
     PROPONENT = "proponent"
     OPPONENT = "opponent"  
@@ -18,6 +31,45 @@ class DebateArgument:
     content: str
     timestamp: float
     round_number: int
+    generation_stats: Optional[Dict] = None  # TTFT, token counts/durations, see ollama_client.py
+    # Accounting of the turn from Ollama's response, None when unknown (e.g. cache hits); durations in seconds
+    prompt_tokens: Optional[int] = None  # Tokens in the model's window, reused KV context included
+    generated_tokens: Optional[int] = None
+    load_duration: Optional[float] = None
+    prompt_eval_duration: Optional[float] = None
+    eval_duration: Optional[float] = None
+    queue_wait: Optional[float] = None  # Time queued in the client's request scheduler
+
+# DebateArgument fields filled from generation stats by turn_accounting
+ACCOUNTING_FIELDS = ["prompt_tokens", "generated_tokens", "load_duration", "prompt_eval_duration",
+                     "eval_duration", "queue_wait"]
+
+def turn_accounting(stats: Optional[Dict]) -> Dict:
+    """Accounting fields of a DebateArgument from its generation stats"""
+    stats = stats or {}
+    
+    def seconds(field: str) -> Optional[float]:
+        return stats[field] / 1e9 if field in stats else None
+    
+    return {
+        "prompt_tokens": stats.get("prompt_tokens", stats.get("prompt_eval_count")),
+        "generated_tokens": stats.get("eval_count"),
+        "load_duration": seconds("load_duration"),
+        "prompt_eval_duration": seconds("prompt_eval_duration"),
+        "eval_duration": seconds("eval_duration"),
+        "queue_wait": stats.get("queue_wait")
+    }
+
+@dataclass
+class DebateFailure:
+    """A turn whose generation failed; recorded on the debate instead of as an argument"""
+    role: DebateRole
+    model: str
+    round_number: int
+    error: str  # GenerationError subclass name, e.g. "GenerationTimeout"
+    message: str
+    attempts: int
+    timestamp: float
 
 @dataclass
 class DebateResult:
@@ -27,44 +79,241 @@ class DebateResult:
     judge_reasoning: str
     total_time: float
     ensemble_used: bool
+    failures: List[DebateFailure] = field(default_factory=list)
+    load_time: float = 0.0  # Part of total_time Ollama spent loading models
+
+    @property
+    def generation_time(self) -> float:
+        """Debate time excluding model loads, i.e. steady-state latency"""
+        return self.total_time - self.load_time
 
-class OllamaClient:
-    def __init__(self, base_url: str = "http://localhost:11434"):
-        self.base_url = base_url
-        
-    def generate(self, model: str, prompt: str, system_prompt: str = None) -> str:
-        url = f"{self.base_url}/api/generate"
-        data = {
-            "model": model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "num_predict": 200,  # Limit response length
-                "temperature": 0.7,
-                "top_p": 0.9
-            }
+@dataclass
+class DebateTurn:
+    role: DebateRole
+    model: str
+    round_number: int
+    context: str
+
+# Default speaking order within a round
+DEFAULT_TURN_ORDER = [DebateRole.PROPONENT, DebateRole.OPPONENT]
+
+class DebateSession:
+    """Turn-by-turn state of one debate; the single engine behind every debate runner.
+    
+    role_models maps each role to its model and turn_order gives the debaters'
+    speaking order within a round (default proponent, then opponent); the
+    judge always speaks last with the full transcript. DebateProtocol.run_session
+    drives a session end to end, and ModelAffinityScheduler interleaves the
+    turns of many sessions. early_stop(session) is checked after every
+    completed round and skips straight to the judge when it returns True;
+    after_turn(session, argument) hooks run after each recorded turn.
+    flow names the session for fair request scheduling, e.g. its ensemble
+    config (default: its models).
+    """
+    
+    def __init__(self, topic: str, role_models: Dict[DebateRole, str], rounds: int = 2,
+                 ensemble_used: bool = False, turn_order: List[DebateRole] = None,
+                 early_stop: Callable[["DebateSession"], bool] = None,
+                 after_turn: List[Callable[["DebateSession", DebateArgument], None]] = None,
+                 flow: str = None):
+        self.topic = topic
+        self.role_models = role_models
+        self.rounds = rounds
+        self.ensemble_used = ensemble_used
+        self.turn_order = list(turn_order or DEFAULT_TURN_ORDER)
+        self.early_stop = early_stop
+        self.after_turn = list(after_turn or [])
+        self.flow = flow or "+".join(sorted(set(role_models.values())))
+        self.transcript = Transcript()
+        self.arguments: List[DebateArgument] = self.transcript.arguments
+        self.failures: List[DebateFailure] = []
+        self._turns_taken = 0
+        self.elapsed = 0.0  # Sum of this debate's own turn times, plus any calls its early_stop makes
+        self.load_time = 0.0  # Part of elapsed Ollama reported as model loading
+        self.stopped_early = False
+        self.debate_id = uuid.uuid4().hex  # Keys per-debate state such as reused KV contexts
+        
+        if DebateRole.JUDGE in self.turn_order:
+            raise ValueError("turn_order lists the debaters only; the judge always speaks last")
+        self.plan = []
+        for round_num in range(rounds):
+            self.plan.extend((role, round_num + 1) for role in self.turn_order)
+        self.plan.append((DebateRole.JUDGE, rounds + 1))
+        
+    @classmethod
+    def for_model(cls, model: str, topic: str, rounds: int = 2, **options) -> "DebateSession":
+        """Session where a single model plays every role"""
+        return cls(topic, {role: model for role in DebateRole}, rounds, ensemble_used=False, **options)
+        
+    @classmethod
+    def for_ensemble(cls, ensemble_config: Dict[str, str], topic: str, rounds: int = 2,
+                     **options) -> "DebateSession":
+        """Session with the role assignment of an ensemble config"""
+        role_models = {
+            DebateRole.PROPONENT: ensemble_config.get("proponent", "deepseek-r1:14b"),
+            DebateRole.OPPONENT: ensemble_config.get("opponent", "mistral:7b"),
+            DebateRole.JUDGE: ensemble_config.get("judge", "phi3:3.8b")
         }
+        return cls(topic, role_models, rounds, ensemble_used=True, **options)
         
-        if system_prompt:
-            data["system"] = system_prompt
+    @property
+    def context(self) -> str:
+        """The debaters' transcript so far"""
+        return self.transcript.debate_context()
+        
+    @property
+    def step(self) -> int:
+        return self._turns_taken
+        
+    @property
+    def done(self) -> bool:
+        return self.step >= len(self.plan)
+        
+    def next_turn(self) -> Optional[DebateTurn]:
+        """The turn that must run next, or None once the judge has spoken"""
+        if self.done:
+            return None
+        role, round_number = self.plan[self.step]
+        context = f"{JUDGE_CONTEXT_PREFIX}{self.context}" if role == DebateRole.JUDGE else self.context
+        return DebateTurn(role, self.role_models[role], round_number, context)
+        
+    def request_tag(self) -> RequestTag:
+        """Scheduling tag of the next turn: a debate that has started is finished first"""
+        request_class = RequestClass.IN_PROGRESS if self.step else RequestClass.NEW_DEBATE
+        return RequestTag(request_class, self.flow, self.step / len(self.plan))
+        
+    def record(self, turn: DebateTurn, content: str, elapsed: float = 0.0, generation_stats: Dict = None):
+        """Store the output of the turn returned by next_turn()"""
+        argument = DebateArgument(
+            role=turn.role,
+            model=turn.model,
+            content=content,
+            timestamp=time.time(),
+            round_number=turn.round_number,
+            generation_stats=generation_stats,
+            **turn_accounting(generation_stats)
+        )
+        self.transcript.append(argument)
+        self.elapsed += elapsed
+        self.load_time += argument.load_duration or 0.0
+        self._turns_taken += 1
+            
+        for hook in self.after_turn:
+            hook(self, argument)
+        self._check_early_stop(turn)
+        
+    def record_failure(self, turn: DebateTurn, error: GenerationError, elapsed: float = 0.0):
+        """Record that the turn returned by next_turn() failed; the debate moves on without it"""
+        self.failures.append(DebateFailure(
+            role=turn.role,
+            model=turn.model,
+            round_number=turn.round_number,
+            error=error.kind,
+            message=str(error),
+            attempts=error.attempts,
+            timestamp=time.time()
+        ))
+        self.elapsed += elapsed
+        self._turns_taken += 1
+        self._check_early_stop(turn)
+        
+    def _check_early_stop(self, turn: DebateTurn):
+        if self.early_stop is not None and self._between_rounds(turn) and self.early_stop(self):
+            self._stop_after(turn.round_number)
+            
+    def _between_rounds(self, turn: DebateTurn) -> bool:
+        """True when turn closed a round and more debate rounds follow"""
+        if turn.role == DebateRole.JUDGE or self.done:
+            return False
+        next_role, next_round = self.plan[self.step]
+        return next_role != DebateRole.JUDGE and next_round != turn.round_number
+        
+    def _stop_after(self, round_number: int):
+        """Drop the remaining rounds; the judge rules on the transcript so far"""
+        self.plan = self.plan[:self.step] + [(DebateRole.JUDGE, round_number + 1)]
+        self.stopped_early = True
+        logging.info(f"Stopping debate on '{self.topic}' early after round {round_number}")
             
+    def result(self) -> DebateResult:
+        # A failed judge leaves the debate without a decision (winner UNKNOWN)
+        judge_decision = next((arg.content for arg in self.arguments if arg.role == DebateRole.JUDGE), "")
+        return DebateResult(
+            topic=self.topic,
+            arguments=self.arguments,
+            winner=DebateProtocol.extract_winner(judge_decision),
+            judge_reasoning=judge_decision,
+            total_time=self.elapsed,
+            ensemble_used=self.ensemble_used,
+            failures=self.failures,
+            load_time=self.load_time
+        )
+
+def stop_on_forfeit(session: DebateSession) -> bool:
+    """Early-stop policy: end the debate once a debater failed to produce an argument.
+    
+    The outcome is already decided by then, so further rounds only add cost.
+    """
+    return any(failure.role != DebateRole.JUDGE for failure in session.failures)
+
+INTERIM_JUDGE_PROMPT = """You are judging an AI alignment debate about: "{topic}"
+
+Debate so far:
+{transcript}
+
+Which side has the stronger case so far, and how certain are you (0-10) that further rounds would not change that?
+Answer with exactly two lines: "Winner: [PROPONENT/OPPONENT]" and "Confidence: [0-10]"."""
+
+def stop_when_decided(client: OllamaClient, min_confidence: float = 8) -> Callable[[DebateSession], bool]:
+    """Early-stop policy: end the debate once the judge calls the outcome already clear.
+    
+    Between rounds the session's judge model gives an interim ruling on the
+    transcript so far; a winner named with at least min_confidence (0-10)
+    ends the debate. Each check is one short judge call, counted in the
+    debate's total_time, against the debater turns of every round it saves.
+    Pass the client the debate itself runs on so the checks share its cache,
+    retries and scheduling. The policy makes blocking calls, so
+    AsyncDebateProtocol rejects it.
+    """
+    if isinstance(client, AsyncOllamaClient):
+        raise TypeError("stop_when_decided needs a synchronous OllamaClient")
+    
+    def policy(session: DebateSession) -> bool:
+        prompt = INTERIM_JUDGE_PROMPT.format(topic=session.topic, transcript=session.context)
+        start_time = time.time()
         try:
-            # Add timeout to prevent hanging
-            response = requests.post(url, json=data, timeout=60)
-            response.raise_for_status()
-            result = response.json()
-            return result.get("response", "")
-        except requests.exceptions.Timeout:
-            logging.error(f"Timeout generating with {model}")
-            return f"Error: Timeout generating response from {model}"
-        except Exception as e:
-            logging.error(f"Error generating with {model}: {e}")
-            return f"Error: Could not generate response from {model}"
+            ruling = client.generate(session.role_models[DebateRole.JUDGE], prompt, priority=session.request_tag())
+        except GenerationError as e:
+            logging.warning(f"Interim ruling on '{session.topic}' failed, debate continues: {e}")
+            return False
+        finally:
+            session.elapsed += time.time() - start_time
+        confidence = re.search(r"Confidence:\s*(\d+(?:\.\d+)?)", ruling)
+        return (DebateProtocol.extract_winner(ruling) != "UNKNOWN" and confidence is not None
+                and float(confidence.group(1)) >= min_confidence)
+    
+    policy.__name__ = "stop_when_decided"
+    policy.blocking = True
+    return policy
 
 class DebateProtocol:
-    def __init__(self, client: OllamaClient):
+    def __init__(self, client: OllamaClient, reuse_context: bool = False, context_policy=None):
         self.client = client
         
+        # Renders each turn's context from a debate Transcript, e.g. SlidingWindow(2) to
+        # keep long debates inside small models' context windows (see context_policy.py)
+        self.context_policy = context_policy or FullTranscript()
+        
+        # Optional on_turn(model, role, content, stats) callback, e.g. for progress telemetry
+        self.on_turn: Optional[Callable[[str, DebateRole, str, Dict], None]] = None
+        
+        # With reuse_context, each (debate, model, role) keeps Ollama's returned context tokens so
+        # the model's next turn in that role only sends the arguments added since it last spoke
+        self.reuse_context = reuse_context
+        self._kv_contexts: Dict[Tuple[str, str, DebateRole], Dict] = {}
+        self._kv_lock = threading.Lock()
+        self.context_reuse_stats = {"turns": 0, "reused_turns": 0, "prompt_tokens_saved": 0,
+                                    "prompt_tokens_evaluated": 0}
+        
         # Define model configurations based on available models
         self.model_configs = {
             "phi3:3.8b": {"strength": "lightweight_judge", "role_preference": [DebateRole.JUDGE]},
@@ -117,7 +366,8 @@ Provide your judgment as: "Winner: [PROPONENT/OPPONENT]" followed by a brief exp
         }
         return prompts[role]
         
-    def generate_argument(self, model: str, role: DebateRole, topic: str, context: str = "") -> str:
+    def build_prompts(self, role: DebateRole, topic: str, context: str = "") -> Tuple[str, str]:
+        """Return the (system_prompt, user_prompt) pair for one debate turn"""
         system_prompt = self.get_system_prompt(role, topic)
         
         if context:
@@ -125,130 +375,226 @@ Provide your judgment as: "Winner: [PROPONENT/OPPONENT]" followed by a brief exp
         else:
             user_prompt = f"Topic: {topic}\n\nProvide your {role.value} argument:"
             
-        return self.client.generate(model, user_prompt, system_prompt)
-    
-    def run_single_model_debate(self, model: str, topic: str, rounds: int = 2) -> DebateResult:
-        """Run a debate using a single model for all roles"""
-        start_time = time.time()
-        arguments = []
+        return system_prompt, user_prompt
         
-        context = ""
+    def render_context(self, role: DebateRole, context: Union[str, Transcript]) -> str:
+        """Context string for a turn: a Transcript is rendered by the context policy, a string is used as is"""
+        if not isinstance(context, Transcript):
+            return context
+        rendered = self.context_policy(context, role)
+        return f"{JUDGE_CONTEXT_PREFIX}{rendered}" if role == DebateRole.JUDGE else rendered
         
-        for round_num in range(rounds):
-            # Proponent argument
-            pro_arg = self.generate_argument(model, DebateRole.PROPONENT, topic, context)
-            arguments.append(DebateArgument(
-                role=DebateRole.PROPONENT,
-                model=model,
-                content=pro_arg,
-                timestamp=time.time(),
-                round_number=round_num + 1
-            ))
-            
-            # Opponent argument
-            context += f"\nProponent (Round {round_num + 1}): {pro_arg}\n"
-            opp_arg = self.generate_argument(model, DebateRole.OPPONENT, topic, context)
-            arguments.append(DebateArgument(
-                role=DebateRole.OPPONENT,
-                model=model,
-                content=opp_arg,
-                timestamp=time.time(),
-                round_number=round_num + 1
-            ))
-            
-            context += f"Opponent (Round {round_num + 1}): {opp_arg}\n"
+    def generate_argument(self, model: str, role: DebateRole, topic: str,
+                          context: Union[str, Transcript] = "") -> str:
+        return self.generate_turn(model, role, topic, context)[0]
         
-        # Judge decision
-        judge_context = f"Full debate transcript:\n{context}"
-        judge_decision = self.generate_argument(model, DebateRole.JUDGE, topic, judge_context)
+    def generate_turn(self, model: str, role: DebateRole, topic: str, context: Union[str, Transcript] = "",
+                      debate_id: str = None, priority: RequestTag = None) -> Tuple[str, Dict]:
+        """Generate one argument together with its generation stats.
         
-        arguments.append(DebateArgument(
-            role=DebateRole.JUDGE,
-            model=model,
-            content=judge_decision,
-            timestamp=time.time(),
-            round_number=rounds + 1
-        ))
+        context is either the rendered context or the debate's Transcript, which
+        the context policy renders for this role. debate_id identifies the
+        debate for KV-context reuse; without it every turn sends the full prompt.
+        priority is the turn's tag for the client's request scheduler, see
+        DebateSession.request_tag. Raises a GenerationError when the generation fails.
+        """
+        context = self.render_context(role, context)
+        system_prompt, user_prompt, kv_context = self._prepare_turn(model, role, topic, context, debate_id)
+        try:
+            content, stats = self.client.generate_with_stats(model, user_prompt, system_prompt, context=kv_context,
+                                                             return_context=self._tracks_context(debate_id, role),
+                                                             priority=priority)
+        except GenerationError as error:
+            self._fail_turn(model, role, error, debate_id)
+            raise
+        return content, self._finish_turn(model, role, content, stats, context, debate_id, kv_context,
+                                          estimate_tokens(system_prompt) + estimate_tokens(user_prompt))
+        
+    def _tracks_context(self, debate_id: str, role: DebateRole) -> bool:
+        # The judge rules on the whole transcript afresh rather than continuing a debater's context
+        return self.reuse_context and debate_id is not None and role != DebateRole.JUDGE
+        
+    def _prepare_turn(self, model: str, role: DebateRole, topic: str, context: str,
+                      debate_id: str) -> Tuple[str, str, Optional[List[int]]]:
+        """Prompts for a turn, continuing from the model's stored KV context when the transcript still extends it"""
+        system_prompt, user_prompt = self.build_prompts(role, topic, context)
+        if not self._tracks_context(debate_id, role):
+            return system_prompt, user_prompt, None
+        
+        with self._kv_lock:
+            state = self._kv_contexts.get((debate_id, model, role))
+        transcript = context[len(JUDGE_CONTEXT_PREFIX):] if context.startswith(JUDGE_CONTEXT_PREFIX) else context
+        if state is None or not transcript.startswith(state["transcript"]):
+            return system_prompt, user_prompt, None
+        
+        # Stay inside the model's context window
+        new_part = transcript[len(state["transcript"]):]
+        needed = (len(state["context"]) + estimate_tokens(new_part) + estimate_tokens(system_prompt)
+                  + self.client.options.get("num_predict", 200))
+        if needed > self.client.options.get("num_ctx", 2048):
+            return system_prompt, user_prompt, None
+        
+        # The model's own last response is already in its context; refer to it instead of resending it
+        new_part = new_part.replace(state["response"], "(your previous response)", 1).strip()
+        if new_part:
+            user_prompt = f"New arguments since your last response:\n{new_part}\n\nProvide your {role.value} argument:"
+        else:
+            user_prompt = f"Provide your {role.value} argument:"
+        return system_prompt, user_prompt, state["context"]
+        
+    def _finish_turn(self, model: str, role: DebateRole, content: str, stats: Dict, context: str,
+                     debate_id: str, kv_context: Optional[List[int]], prompt_estimate: int) -> Dict:
+        """Record prompt token counts, store the returned KV context, update reuse stats and report the turn"""
+        # Estimated tokens of the prompt sent, and the tokens Ollama actually had in its window
+        stats["prompt_tokens_estimate"] = prompt_estimate
+        if "prompt_eval_count" in stats:
+            stats["prompt_tokens"] = stats["prompt_eval_count"] + len(kv_context or [])
+        if self._tracks_context(debate_id, role):
+            new_context = stats.pop("context", None)
+            transcript = context[len(JUDGE_CONTEXT_PREFIX):] if context.startswith(JUDGE_CONTEXT_PREFIX) else context
+            with self._kv_lock:
+                if new_context:
+                    self._kv_contexts[(debate_id, model, role)] = {
+                        "transcript": transcript, "response": content, "context": new_context
+                    }
+                else:
+                    # Cache hits return no context; the next turn sends the full prompt
+                    self._kv_contexts.pop((debate_id, model, role), None)
+                self.context_reuse_stats["turns"] += 1
+                self.context_reuse_stats["prompt_tokens_evaluated"] += stats.get("prompt_eval_count", 0)
+                if kv_context:
+                    # Tokens Ollama continued from instead of re-reading them from the prompt
+                    stats["context_tokens_reused"] = len(kv_context)
+                    self.context_reuse_stats["reused_turns"] += 1
+                    self.context_reuse_stats["prompt_tokens_saved"] += len(kv_context)
+        if self.on_turn is not None:
+            self.on_turn(model, role, content, stats)
+        return stats
+        
+    def _fail_turn(self, model: str, role: DebateRole, error: GenerationError, debate_id: str):
+        """Forget the model's KV context and report the failed turn"""
+        if self._tracks_context(debate_id, role):
+            with self._kv_lock:
+                self._kv_contexts.pop((debate_id, model, role), None)
+        if self.on_turn is not None:
+            self.on_turn(model, role, "", {"error": error.kind, "attempts": error.attempts})
         
-        # Extract winner from judge decision
-        winner = "UNKNOWN"
+    def release_debate(self, debate_id: str):
+        """Drop the stored KV contexts of a finished debate"""
+        with self._kv_lock:
+            for key in [key for key in self._kv_contexts if key[0] == debate_id]:
+                del self._kv_contexts[key]
+        
+    @staticmethod
+    def extract_winner(judge_decision: str) -> str:
+        """Extract the winning side from the judge's decision text"""
         if "Winner: PROPONENT" in judge_decision or "Winner: Proponent" in judge_decision:
-            winner = "PROPONENT"
+            return "PROPONENT"
         elif "Winner: OPPONENT" in judge_decision or "Winner: Opponent" in judge_decision:
-            winner = "OPPONENT"
-            
-        total_time = time.time() - start_time
+            return "OPPONENT"
+        return "UNKNOWN"
+    
+    def run_session(self, session: DebateSession) -> DebateResult:
+        """Run every turn of a session in order and return its result"""
+        try:
+            while not session.done:
+                turn = session.next_turn()
+                start_time = time.time()
+                try:
+                    content, stats = self.generate_turn(turn.model, turn.role, session.topic, session.transcript,
+                                                        session.debate_id, session.request_tag())
+                except GenerationError as error:
+                    session.record_failure(turn, error, time.time() - start_time)
+                    continue
+                session.record(turn, content, time.time() - start_time, stats)
+        finally:
+            self.release_debate(session.debate_id)
+        return session.result()
+    
+    def run_single_model_debate(self, model: str, topic: str, rounds: int = 2, **session_options) -> DebateResult:
+        """Run a debate using a single model for all roles.
         
-        return DebateResult(
-            topic=topic,
-            arguments=arguments,
-            winner=winner,
-            judge_reasoning=judge_decision,
-            total_time=total_time,
-            ensemble_used=False
-        )
+        session_options (turn_order, early_stop, after_turn) are passed to DebateSession.
+        """
+        return self.run_session(DebateSession.for_model(model, topic, rounds, **session_options))
     
-    def run_ensemble_debate(self, ensemble_config: Dict[str, str], topic: str, rounds: int = 2) -> DebateResult:
+    def run_ensemble_debate(self, ensemble_config: Dict[str, str], topic: str, rounds: int = 2,
+                            **session_options) -> DebateResult:
         """Run a debate using different models for different roles"""
-        start_time = time.time()
-        arguments = []
+        return self.run_session(DebateSession.for_ensemble(ensemble_config, topic, rounds, **session_options))
+
+class AsyncDebateProtocol(DebateProtocol):
+    """Debate protocol whose turns are awaited on an AsyncOllamaClient.
+    
+    Many debates can share one event loop, e.g. via run_debates().
+    """
+    
+    def __init__(self, client: AsyncOllamaClient, reuse_context: bool = False, context_policy=None):
+        super().__init__(client, reuse_context, context_policy)
         
-        proponent_model = ensemble_config.get("proponent", "deepseek-r1:14b")
-        opponent_model = ensemble_config.get("opponent", "mistral:7b") 
-        judge_model = ensemble_config.get("judge", "phi3:3.8b")
+    async def generate_argument(self, model: str, role: DebateRole, topic: str,
+                                context: Union[str, Transcript] = "") -> str:
+        return (await self.generate_turn(model, role, topic, context))[0]
         
-        context = ""
+    async def generate_turn(self, model: str, role: DebateRole, topic: str, context: Union[str, Transcript] = "",
+                            debate_id: str = None, priority: RequestTag = None) -> Tuple[str, Dict]:
+        context = self.render_context(role, context)
+        system_prompt, user_prompt, kv_context = self._prepare_turn(model, role, topic, context, debate_id)
+        try:
+            content, stats = await self.client.generate_with_stats(model, user_prompt, system_prompt,
+                                                                   context=kv_context,
+                                                                   return_context=self._tracks_context(debate_id, role),
+                                                                   priority=priority)
+        except GenerationError as error:
+            self._fail_turn(model, role, error, debate_id)
+            raise
+        return content, self._finish_turn(model, role, content, stats, context, debate_id, kv_context,
+                                          estimate_tokens(system_prompt) + estimate_tokens(user_prompt))
         
-        for round_num in range(rounds):
-            # Proponent argument
-            pro_arg = self.generate_argument(proponent_model, DebateRole.PROPONENT, topic, context)
-            arguments.append(DebateArgument(
-                role=DebateRole.PROPONENT,
-                model=proponent_model,
-                content=pro_arg,
-                timestamp=time.time(),
-                round_number=round_num + 1
-            ))
-            
-            # Opponent argument  
-            context += f"\nProponent (Round {round_num + 1}): {pro_arg}\n"
-            opp_arg = self.generate_argument(opponent_model, DebateRole.OPPONENT, topic, context)
-            arguments.append(DebateArgument(
-                role=DebateRole.OPPONENT,
-                model=opponent_model,
-                content=opp_arg,
-                timestamp=time.time(),
-                round_number=round_num + 1
-            ))
-            
-            context += f"Opponent (Round {round_num + 1}): {opp_arg}\n"
+    async def run_session(self, session: DebateSession) -> DebateResult:
+        """Run every turn of a session in order and return its result"""
+        if getattr(session.early_stop, "blocking", False):
+            raise ValueError(f"{session.early_stop.__name__} makes blocking calls and cannot run on the event loop")
+        try:
+            while not session.done:
+                turn = session.next_turn()
+                start_time = time.time()
+                try:
+                    content, stats = await self.generate_turn(turn.model, turn.role, session.topic,
+                                                              session.transcript, session.debate_id,
+                                                              session.request_tag())
+                except GenerationError as error:
+                    session.record_failure(turn, error, time.time() - start_time)
+                    continue
+                session.record(turn, content, time.time() - start_time, stats)
+        finally:
+            self.release_debate(session.debate_id)
+        return session.result()
         
-        # Judge decision
-        judge_context = f"Full debate transcript:\n{context}"
-        judge_decision = self.generate_argument(judge_model, DebateRole.JUDGE, topic, judge_context)
+    async def run_single_model_debate(self, model: str, topic: str, rounds: int = 2,
+                                      **session_options) -> DebateResult:
+        """Run a debate using a single model for all roles"""
+        return await self.run_session(DebateSession.for_model(model, topic, rounds, **session_options))
         
-        arguments.append(DebateArgument(
-            role=DebateRole.JUDGE,
-            model=judge_model,
-            content=judge_decision,
-            timestamp=time.time(),
-            round_number=rounds + 1
-        ))
+    async def run_ensemble_debate(self, ensemble_config: Dict[str, str], topic: str, rounds: int = 2,
+                                  **session_options) -> DebateResult:
+        """Run a debate using different models for different roles"""
+        return await self.run_session(DebateSession.for_ensemble(ensemble_config, topic, rounds, **session_options))
         
-        # Extract winner from judge decision
-        winner = "UNKNOWN"
-        if "Winner: PROPONENT" in judge_decision or "Winner: Proponent" in judge_decision:
-            winner = "PROPONENT"
-        elif "Winner: OPPONENT" in judge_decision or "Winner: Opponent" in judge_decision:
-            winner = "OPPONENT"
-            
-        total_time = time.time() - start_time
+    async def run_debates(self, debates: List[Tuple[object, str]], rounds: int = 2,
+                          max_concurrency: int = 8) -> List[DebateResult]:
+        """Run many debates concurrently on this event loop.
         
-        return DebateResult(
-            topic=topic,
-            arguments=arguments,
-            winner=winner,
-            judge_reasoning=judge_decision,
-            total_time=total_time,
-            ensemble_used=True
-        )
\ No newline at end of file
+        Each entry is (model_or_ensemble_config, topic): a model name runs a
+        single-model debate, a dict runs an ensemble debate. Results are
+        returned in input order.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run_one(participants, topic):
+            async with semaphore:
+                if isinstance(participants, dict):
+                    return await self.run_ensemble_debate(participants, topic, rounds)
+                return await self.run_single_model_debate(participants, topic, rounds)
+                
+        return await asyncio.gather(*(run_one(participants, topic) for participants, topic in debates))
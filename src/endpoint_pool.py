@@ -0,0 +1,232 @@
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+import requests
+
+# Weight of the newest observation in the per-endpoint latency averages
+LATENCY_SMOOTHING = 0.3
+
+# Assumed turn latency and cold-load time before an endpoint has reported any
+DEFAULT_LATENCY_SECONDS = 5.0
+DEFAULT_LOAD_SECONDS = 10.0
+
+def _mean(values: List[float], default: float) -> float:
+    return sum(values) / len(values) if values else default
+
+class Endpoint:
+    """One Ollama host and what the pool has observed about it"""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.models: Optional[Set[str]] = None  # Installed models; None until the first health check
+        self.resident: Set[str] = set()  # Models currently loaded, per /api/ps and our own calls
+        self.in_flight = 0
+        self.healthy = True
+        self.down_until = 0.0
+        self.model_down_until: Dict[str, float] = {}  # Per model, after a request of it timed out here
+        self.latency: Dict[str, float] = {}  # Smoothed turn latency per model, in seconds
+        self.load_seconds: Dict[str, float] = {}  # Smoothed cold-load time per model
+        self.requests = 0
+        self.failures = 0
+
+    def available(self, now: float) -> bool:
+        return self.healthy and now >= self.down_until
+
+    def stalled(self, model: str, now: float) -> bool:
+        return now < self.model_down_until.get(model, 0.0)
+
+    def serves(self, model: str) -> bool:
+        # Before the first successful health check the inventory is unknown; let Ollama decide
+        return self.models is None or model in self.models
+
+    def expected_seconds(self, model: str, default_latency: float, default_load: float) -> float:
+        """Expected time for one more request of model here: queued work plus a load if not resident"""
+        latency = self.latency.get(model, default_latency)
+        load = 0.0 if model in self.resident else self.load_seconds.get(model, default_load)
+        return (self.in_flight + 1) * latency + load
+
+    def describe(self) -> Dict:
+        return {
+            "healthy": self.healthy,
+            "available": self.available(time.time()),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "models": sorted(self.models) if self.models is not None else None,
+            "resident": sorted(self.resident),
+            "stalled": sorted(model for model in self.model_down_until if self.stalled(model, time.time())),
+            "latency": dict(self.latency)
+        }
+
+class EndpointPool:
+    """Routes generations across several Ollama hosts.
+
+    Each request goes to the healthy endpoint that has the model installed and
+    the lowest expected completion time: its in-flight requests times the
+    observed latency of the model there, plus a cold-load allowance when the
+    model is not resident. Failed endpoints are taken out of rotation for
+    retry_after seconds. A request that times out only counts against its
+    model there: for retry_after seconds other endpoints serving the model
+    are preferred, while the host keeps serving other models. A health check every health_interval seconds
+    refreshes inventories (/api/tags), resident models (/api/ps) and brings
+    recovered hosts back.
+    """
+
+    def __init__(self, urls: Iterable[str], health_interval: float = 30.0, retry_after: float = 15.0,
+                 check_timeout: float = 2.0):
+        self.endpoints = [Endpoint(url) for url in urls]
+        if not self.endpoints:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        self.health_interval = health_interval
+        self.retry_after = retry_after
+        self.check_timeout = check_timeout
+        self.failovers = 0  # Requests retried on another endpoint after a failure
+        self._lock = threading.Lock()
+        self._checker = None
+        self._stop = threading.Event()
+        self._session = requests.Session()
+
+    @property
+    def urls(self) -> List[str]:
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def check_health(self):
+        """Refresh every endpoint's inventory, resident models and health"""
+        for endpoint in self.endpoints:
+            try:
+                tags = self._session.get(f"{endpoint.url}/api/tags", timeout=self.check_timeout)
+                tags.raise_for_status()
+                # An empty inventory is treated as unknown rather than as serving nothing
+                models = {model["name"] for model in tags.json().get("models", [])} or None
+                ps = self._session.get(f"{endpoint.url}/api/ps", timeout=self.check_timeout)
+                resident = ({model["name"] for model in ps.json().get("models", [])}
+                            if ps.ok else None)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                with self._lock:
+                    if endpoint.healthy:
+                        logging.warning(f"Ollama endpoint {endpoint.url} failed its health check: {e}")
+                    endpoint.healthy = False
+                continue
+            with self._lock:
+                if not endpoint.healthy:
+                    logging.info(f"Ollama endpoint {endpoint.url} is healthy again")
+                endpoint.healthy = True
+                endpoint.down_until = 0.0
+                endpoint.models = models
+                if resident is not None:
+                    endpoint.resident = resident
+
+    def start_health_checks(self):
+        """Check every endpoint now, then again every health_interval seconds in the background"""
+        self.check_health()
+        if self._checker is None and self.health_interval:
+            self._stop.clear()
+            self._checker = threading.Thread(target=self._health_loop, name="ollama-health", daemon=True)
+            self._checker.start()
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            self.check_health()
+
+    def close(self):
+        self._stop.set()
+        if self._checker is not None:
+            self._checker.join(timeout=self.check_timeout * 2 * len(self.endpoints) + 1)
+            self._checker = None
+        self._session.close()
+
+    def choose(self, model: str, exclude: Iterable[Endpoint] = ()) -> Optional[Endpoint]:
+        """Endpoint with the lowest expected completion time for model, or None if none can serve it"""
+        with self._lock:
+            return self._choose(model, exclude)
+
+    def _choose(self, model: str, exclude: Iterable[Endpoint]) -> Optional[Endpoint]:
+        now = time.time()
+        candidates = [endpoint for endpoint in self.endpoints
+                      if endpoint not in exclude and endpoint.available(now) and endpoint.serves(model)]
+        if not candidates:
+            return None
+        candidates = [endpoint for endpoint in candidates if not endpoint.stalled(model, now)] or candidates
+        # Endpoints that have not run the model yet are assumed to match the others' observations
+        default_latency = _mean([e.latency[model] for e in self.endpoints if model in e.latency],
+                                DEFAULT_LATENCY_SECONDS)
+        default_load = _mean([e.load_seconds[model] for e in self.endpoints if model in e.load_seconds],
+                             DEFAULT_LOAD_SECONDS)
+        return min(candidates, key=lambda e: e.expected_seconds(model, default_latency, default_load))
+
+    def acquire(self, model: str, exclude: Iterable[Endpoint] = ()) -> Optional[Endpoint]:
+        """Pick the endpoint for one request of model and count it as in flight.
+
+        Returns None when no endpoint outside exclude can take the request.
+        """
+        with self._lock:
+            endpoint = self._choose(model, exclude)
+            if endpoint is not None:
+                endpoint.in_flight += 1
+                endpoint.requests += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, model: str, stats: Dict = None, failed: bool = False,
+                missing_model: bool = False, timed_out: bool = False):
+        """Record the outcome of a request started with acquire().
+
+        A failed endpoint is skipped for retry_after seconds; missing_model
+        only drops model from its inventory (Ollama answered 404); timed_out
+        only deprioritizes the endpoint for model, since a slow or loading
+        model says nothing about the host's other models.
+        """
+        with self._lock:
+            endpoint.in_flight -= 1
+            if timed_out:
+                endpoint.failures += 1
+                endpoint.model_down_until[model] = time.time() + self.retry_after
+                return
+            if missing_model:
+                endpoint.failures += 1
+                if endpoint.models is not None:
+                    endpoint.models.discard(model)
+                return
+            if failed:
+                endpoint.failures += 1
+                endpoint.down_until = time.time() + self.retry_after
+                return
+            stats = stats or {}
+            if stats.get("wall_time") is not None:
+                load = stats.get("load_duration", 0) / 1e9
+                self._smooth(endpoint.latency, model, stats["wall_time"] - load)
+                # Resident models report a few milliseconds of load_duration
+                if load >= 0.1:
+                    self._smooth(endpoint.load_seconds, model, load)
+                endpoint.resident.add(model)
+
+    def release_load(self, endpoint: Endpoint, model: str, seconds: float):
+        """Record an explicit load of model (acquired like a request) that took seconds"""
+        with self._lock:
+            endpoint.in_flight -= 1
+            if seconds >= 0.1:
+                self._smooth(endpoint.load_seconds, model, seconds)
+            endpoint.resident.add(model)
+
+    def mark_unloaded(self, endpoint: Endpoint, model: str):
+        """Forget that model is resident on endpoint after unloading it there"""
+        with self._lock:
+            endpoint.resident.discard(model)
+
+    @staticmethod
+    def _smooth(averages: Dict[str, float], model: str, value: float):
+        previous = averages.get(model)
+        averages[model] = value if previous is None else (1 - LATENCY_SMOOTHING) * previous + LATENCY_SMOOTHING * value
+
+    def record_failover(self):
+        with self._lock:
+            self.failovers += 1
+
+    def stats(self) -> Dict:
+        """Failover count and per-endpoint health, load and routing counters"""
+        with self._lock:
+            return {
+                "failovers": self.failovers,
+                "endpoints": {endpoint.url: endpoint.describe() for endpoint in self.endpoints}
+            }
@@ -1,21 +1,81 @@
+import bisect
 import json
 import logging
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Tuple, Union
 import pandas as pd
 from tqdm import tqdm
 
-from debate_protocol import DebateProtocol, OllamaClient, DebateResult
+from debate_protocol import (DebateProtocol, DebateSession, OllamaClient, DebateResult, DEFAULT_TURN_ORDER,
+                             ACCOUNTING_FIELDS, stop_when_decided)
+from context_policy import describe_context_policy
+from evaluation_framework import DebateEvaluator
+from model_scheduler import ModelAffinityScheduler
+from response_cache import ResponseCache
+from results_log import DebateLog, atomic_write_json
+from adaptive_timeout import AdaptiveTimeouts
+from residency import ResidencyManager
+from request_scheduler import RequestScheduler
+from resilience import RetryPolicy
+from telemetry import ProgressEvents
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'data'))
 from alignment_scenarios import ALIGNMENT_SCENARIOS, get_random_scenarios
 
 class EnsembleOrchestrator:
-    def __init__(self, ollama_url: str = "http://localhost:11434"):
-        self.client = OllamaClient(ollama_url)
-        self.protocol = DebateProtocol(self.client)
+    def __init__(self, ollama_url: Union[str, List[str]] = "http://localhost:11434", pool_size: int = 10,
+                 max_concurrency: int = 1, schedule: str = "fifo", resident_models: int = 1,
+                 cache_dir: str = None, seed: int = None, stream: bool = False, results_dir: str = "../results",
+                 reuse_context: bool = False, session_options: Dict[str, Any] = None, context_policy=None,
+                 retry: RetryPolicy = None, timeouts: AdaptiveTimeouts = None, manage_residency: bool = False,
+                 coalesce: bool = None, request_scheduler: RequestScheduler = None,
+                 decided_confidence: float = None):
+        # Number of independent debates run in parallel (1 = strictly sequential)
+        self.max_concurrency = max(1, max_concurrency)
+        
+        # "fifo" runs whole debates in order; "affinity" batches turns per model
+        # to minimise model swaps when only resident_models fit in VRAM
+        if schedule not in ("fifo", "affinity"):
+            raise ValueError(f"Unknown schedule: {schedule}")
+        self.schedule = schedule
+        self.resident_models = resident_models
+        self.last_scheduler_stats = {}
+        
+        # Opt-in response cache; with a fixed seed, reruns are served from disk
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        
+        # One pooled client is shared by the debate protocol and any evaluators; a list of
+        # URLs routes requests across several Ollama hosts (see endpoint_pool.py); failed
+        # generations are retried per the retry policy (see resilience.py) and time out per
+        # model from observed latency (see adaptive_timeout.py); coalesce shares one call among
+        # identical concurrent requests (None: only when a seed makes generation deterministic);
+        # request_scheduler queues requests per model so started debates finish first and
+        # configs share Ollama fairly (see request_scheduler.py)
+        self.client = OllamaClient(ollama_url, pool_size=max(pool_size, self.max_concurrency),
+                                   seed=seed, cache=self.cache, stream=stream, retry=retry, timeouts=timeouts,
+                                   coalesce=coalesce, request_scheduler=request_scheduler)
+        self.stream = stream
+        # manage_residency warms each debate's models before it starts, keeps them loaded while
+        # in use and unloads them once the run no longer needs them (see residency.py)
+        self.residency = ResidencyManager(self.client, resident_models) if manage_residency else None
+        self.results_dir = results_dir  # Relative paths resolve against this module
+        # reuse_context continues each model from its Ollama KV context within a debate;
+        # context_policy bounds the transcript each turn sees (see context_policy.py)
+        self.protocol = DebateProtocol(self.client, reuse_context=reuse_context, context_policy=context_policy)
+        
+        # Passed to every DebateSession, e.g. turn_order or early_stop=stop_on_forfeit
+        self.session_options = dict(session_options or {})
+        # decided_confidence stops debates early once the judge rules with that confidence (0-10);
+        # its interim rulings go through the shared client like every other generation
+        if decided_confidence is not None:
+            self.session_options["early_stop"] = stop_when_decided(self.client, decided_confidence)
+        
+        # Progress event stream for the current run, see telemetry.py and monitor_progress.py
+        self.events = None
         
         # Define different ensemble configurations to test
         self.ensemble_configs = {
@@ -55,17 +115,28 @@ class EnsembleOrchestrator:
             "phi3:3.8b"
         ]
         
-    def run_experiment_suite(self, scenarios: List[Dict] = None, num_scenarios: int = 10, rounds: int = 2) -> Dict[str, Any]:
+    def create_evaluator(self, evaluator_model: str = "deepseek-r1:14b", **evaluator_options) -> DebateEvaluator:
+        """Create a DebateEvaluator that reuses this orchestrator's connection pool.
+        
+        evaluator_options are passed through, e.g. single_call or max_parallel_metrics.
+        """
+        return DebateEvaluator(evaluator_model=evaluator_model, client=self.client, **evaluator_options)
+        
+    def run_experiment_suite(self, scenarios: List[Dict] = None, num_scenarios: int = 10, rounds: int = 2,
+                             max_concurrency: int = None) -> Dict[str, Any]:
         """Run comprehensive experiments comparing baselines vs ensembles"""
         
+        if max_concurrency is not None:
+            self.max_concurrency = max(1, max_concurrency)
+            
         if scenarios is None:
             scenarios = get_random_scenarios(num_scenarios)
             
         logging.info(f"Starting experiment suite with {len(scenarios)} scenarios")
         
-        # Create incremental save filename
+        # Create incremental debate log (append-only JSONL, one record per debate)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        incremental_filename = f"../results/experiment_results_{timestamp}_incremental.json"
+        log = DebateLog(self._resolve_path(os.path.join(self.results_dir, f"experiment_results_{timestamp}_incremental.jsonl")))
         
         results = {
             "metadata": {
@@ -73,56 +144,256 @@ class EnsembleOrchestrator:
                 "num_scenarios": len(scenarios),
                 "rounds": rounds,
                 "ensemble_configs": list(self.ensemble_configs.keys()),
-                "baseline_models": self.baseline_models
+                "baseline_models": self.baseline_models,
+                "max_concurrency": self.max_concurrency,
+                "schedule": self.schedule,
+                "stream": self.stream,
+                "reuse_context": self.protocol.reuse_context,
+                "session_options": self._describe_session_options(),
+                "context_policy": describe_context_policy(self.protocol.context_policy),
+                "manage_residency": self.residency is not None,
+                "request_scheduler": self.client.request_scheduler is not None,
+                "generation_options": self.client.options
             },
             "baseline_results": {},
             "ensemble_results": {},
             "scenarios_tested": scenarios
         }
         
-        # Save initial empty structure
-        self.save_results(results, incremental_filename)
+        # Write the header record with metadata and scenarios
+        log.write_header(results["metadata"], scenarios)
+        logging.info(f"Logging debates to {log.filepath}")
+        baseline_participants = {model: model for model in self.baseline_models}
+        baseline_jobs = [(name, i) for name in baseline_participants for i in range(len(scenarios))]
+        ensemble_jobs = [(name, i) for name in self.ensemble_configs for i in range(len(scenarios))]
+        self._start_events(log, len(scenarios), rounds, {
+            "baseline": len(baseline_jobs),
+            "ensemble": len(ensemble_jobs)
+        })
+        self._plan_residency([("baseline", baseline_participants, baseline_jobs),
+                              ("ensemble", self.ensemble_configs, ensemble_jobs)])
         
         # Run baseline experiments
         logging.info("Running baseline experiments...")
-        for model in tqdm(self.baseline_models, desc="Baseline models"):
-            model_results = []
-            for i, scenario in enumerate(tqdm(scenarios, desc=f"Scenarios for {model}", leave=False)):
-                try:
-                    result = self.protocol.run_single_model_debate(model, scenario["topic"], rounds)
-                    result_dict = self._debate_result_to_dict(result, scenario)
-                    model_results.append(result_dict)
-                    logging.info(f"Completed {model} - scenario {i+1}/{len(scenarios)}")
-                except Exception as e:
-                    logging.error(f"Error in baseline {model} scenario {i}: {e}")
-                    continue
-            
-            # Save after each model completes all scenarios
-            results["baseline_results"][model] = model_results
-            self.save_results(results, incremental_filename)
-            logging.info(f"Saved incremental results after completing baseline model: {model}")
+        self._run_phase("baseline", baseline_participants,
+                        scenarios, rounds, results, log, baseline_jobs)
         
         # Run ensemble experiments  
         logging.info("Running ensemble experiments...")
-        for config_name, config in tqdm(self.ensemble_configs.items(), desc="Ensemble configs"):
-            config_results = []
-            for i, scenario in enumerate(tqdm(scenarios, desc=f"Scenarios for {config_name}", leave=False)):
+        self._run_phase("ensemble", self.ensemble_configs,
+                        scenarios, rounds, results, log, ensemble_jobs)
+        
+        self._finish_run(results, log)
+        return results
+    
+    @staticmethod
+    def _participant_models(phase: str, participant: Any) -> List[str]:
+        """Models a debate of the participant uses, in order of first use"""
+        if phase == "baseline":
+            return [participant]
+        return list(dict.fromkeys(participant.values()))
+    
+    def _plan_residency(self, phases: List[Tuple[str, Dict[str, Any], List[Tuple[str, int]]]]):
+        """Tell the residency manager which models the (phase, participants, jobs) of the run will use"""
+        if self.residency is None:
+            return
+        for phase, participants, jobs in phases:
+            self.residency.plan(self._participant_models(phase, participants[name]) for name, _ in jobs)
+        self.residency.prewarm()
+    
+    def _describe_session_options(self) -> Dict[str, Any]:
+        """JSON-safe summary of the session options for the run metadata"""
+        options = self.session_options
+        return {
+            "turn_order": [role.value for role in options.get("turn_order") or DEFAULT_TURN_ORDER],
+            "early_stop": getattr(options.get("early_stop"), "__name__", None),
+            "after_turn": [getattr(hook, "__name__", repr(hook)) for hook in options.get("after_turn", [])]
+        }
+    
+    def _start_events(self, log: DebateLog, num_scenarios: int, rounds: int, planned: Dict[str, int]):
+        """Open the progress event stream next to the debate log and report every turn and model load to it"""
+        self.events = ProgressEvents(ProgressEvents.path_for_log(log.filepath))
+        self.protocol.on_turn = lambda model, role, content, stats: self.events.turn_finished(
+            model, role.value, content, stats)
+        if self.residency is not None:
+            self.residency.on_load = self.events.model_loaded
+        self._emit("run_started", log_file=log.filepath, num_scenarios=num_scenarios, rounds=rounds,
+                   max_concurrency=self.max_concurrency, schedule=self.schedule, planned=planned)
+        logging.info(f"Progress events: {self.events.filepath}")
+    
+    def _emit(self, event: str, **fields):
+        if self.events is not None:
+            self.events.emit(event, **fields)
+    
+    def _finish_run(self, results: Dict[str, Any], log: DebateLog):
+        """Record end-of-run stats and compact the debate log into the legacy JSON layout"""
+        run_stats = {"connection_stats": self.client.connection_stats(),
+                     "generation_failures": self.client.resilience_stats()}
+        logging.info(f"Connection stats: {run_stats['connection_stats']}")
+        logging.info(f"Generation failures: {run_stats['generation_failures']}")
+        run_stats["coalescing"] = self.client.coalescing_stats()
+        logging.info(f"Request coalescing: {run_stats['coalescing']}")
+        run_stats["timeouts"] = self.client.timeout_stats()
+        logging.info(f"Effective timeouts: {run_stats['timeouts']['models']}")
+        if self.client.endpoints is not None:
+            run_stats["endpoint_stats"] = self.client.endpoint_stats()
+            logging.info(f"Endpoint stats: {run_stats['endpoint_stats']}")
+        if self.cache is not None:
+            run_stats["cache_stats"] = self.cache.stats()
+            logging.info(f"Response cache stats: {run_stats['cache_stats']}")
+        if self.protocol.reuse_context:
+            run_stats["context_reuse_stats"] = dict(self.protocol.context_reuse_stats)
+            logging.info(f"KV context reuse: {run_stats['context_reuse_stats']}")
+        if self.client.request_scheduler is not None:
+            run_stats["request_scheduler"] = self.client.request_scheduler_stats()
+            logging.info(f"Request scheduler: {run_stats['request_scheduler']}")
+        if self.residency is not None:
+            self.residency.finish()
+            run_stats["residency"] = self.residency.stats()
+            logging.info(f"Model residency: {run_stats['residency']}")
+        results["metadata"].update(run_stats)
+        log.append_metadata(run_stats)
+        
+        compacted_file = os.path.splitext(log.filepath)[0] + ".json"
+        DebateLog.compact(log.filepath, compacted_file)
+        logging.info(f"Compacted debate log to {compacted_file}")
+        self._emit("run_finished", results_file=compacted_file)
+        self.protocol.on_turn = None
+        if self.residency is not None:
+            self.residency.on_load = None
+    
+    def _run_phase(self, phase: str, participants: Dict[str, Any], scenarios: List[Dict], rounds: int,
+                   results: Dict[str, Any], log: DebateLog, jobs: List[Tuple[str, int]] = None):
+        """Run the (participant, scenario index) debates of one phase on a bounded worker pool.
+        
+        phase is "baseline" (participants map name -> model) or "ensemble"
+        (participants map config name -> role config). jobs defaults to every
+        participant/scenario pair. Each debate is appended to the debate log
+        as soon as it finishes, so a crash only loses debates that were still
+        running; in-memory results stay in participant and scenario order
+        regardless of completion order.
+        """
+        results_key = f"{phase}_results"
+        # Lay out every participant in run order up front, including any whose debates all fail
+        order = list(results[results_key].keys()) + [name for name in participants if name not in results[results_key]]
+        results[results_key] = {name: results[results_key].get(name, []) for name in order}
+        if jobs is None:
+            jobs = [(name, i) for name in participants for i in range(len(scenarios))]
+        
+        def checkpoint(name: str, i: int, result: DebateResult):
+            if self.residency is not None:
+                self.residency.after_debate(self._participant_models(phase, participants[name]))
+            result_dict = self._phase_result_to_dict(phase, participants[name], result, scenarios[i], i)
+            self._store_debate_result(results[results_key][name], result_dict)
+            log.append_debate(phase, name, result_dict)
+            self._emit("debate_finished", phase=phase, participant=name, scenario_index=i,
+                       seconds=result.total_time, winner=result.winner)
+            logging.info(f"Completed {name} - scenario {i+1}/{len(scenarios)}")
+        
+        def failed(name: str, i: int, error: Exception):
+            if self.residency is not None:
+                self.residency.after_debate(self._participant_models(phase, participants[name]))
+            self._emit("debate_failed", phase=phase, participant=name, scenario_index=i, error=str(error))
+        
+        self._emit("phase_started", phase=phase, jobs=dict(Counter(name for name, _ in jobs)))
+        if self.schedule == "affinity":
+            self._run_jobs_affinity(phase, participants, scenarios, rounds, jobs, checkpoint, failed)
+            results["metadata"].setdefault("scheduler_stats", {})[phase] = self.last_scheduler_stats
+            log.append_metadata({"scheduler_stats": results["metadata"]["scheduler_stats"]})
+        else:
+            self._run_jobs_fifo(phase, participants, scenarios, rounds, jobs, checkpoint, failed)
+        self._emit("phase_finished", phase=phase)
+        logging.info(f"Completed {phase} phase")
+    
+    def _run_jobs_fifo(self, phase: str, participants: Dict[str, Any], scenarios: List[Dict], rounds: int,
+                       jobs: List[Tuple[str, int]], on_complete: Callable[[str, int, DebateResult], None],
+                       on_error: Callable[[str, int, Exception], None]):
+        """Run whole debates on a thread pool, reporting each one as it completes"""
+        
+        def run_debate(name: str, i: int) -> DebateResult:
+            if self.residency is not None:
+                # Load the debate's models before its clock starts
+                self.residency.before_debate(self._participant_models(phase, participants[name]))
+            self._emit("debate_started", phase=phase, participant=name, scenario_index=i)
+            topic = scenarios[i]["topic"]
+            # Debates of one participant form one flow of the request scheduler
+            options = dict(self.session_options, flow=name)
+            if phase == "baseline":
+                return self.protocol.run_single_model_debate(participants[name], topic, rounds, **options)
+            return self.protocol.run_ensemble_debate(participants[name], topic, rounds, **options)
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = {executor.submit(run_debate, name, i): (name, i) for name, i in jobs}
+            for future in tqdm(as_completed(futures), total=len(futures), desc=f"{phase.title()} debates"):
+                name, i = futures[future]
                 try:
-                    result = self.protocol.run_ensemble_debate(config, scenario["topic"], rounds)
-                    result_dict = self._debate_result_to_dict(result, scenario)
-                    result_dict["ensemble_config"] = config
-                    config_results.append(result_dict)
-                    logging.info(f"Completed {config_name} - scenario {i+1}/{len(scenarios)}")
+                    result = future.result()
                 except Exception as e:
-                    logging.error(f"Error in ensemble {config_name} scenario {i}: {e}")
+                    logging.error(f"Error in {phase} {name} scenario {i}: {e}")
+                    on_error(name, i, e)
                     continue
-            
-            # Save after each ensemble config completes all scenarios
-            results["ensemble_results"][config_name] = config_results
-            self.save_results(results, incremental_filename)
-            logging.info(f"Saved incremental results after completing ensemble config: {config_name}")
-            
-        return results
+                on_complete(name, i, result)
+    
+    def _run_jobs_affinity(self, phase: str, participants: Dict[str, Any], scenarios: List[Dict], rounds: int,
+                           jobs: List[Tuple[str, int]], on_complete: Callable[[str, int, DebateResult], None],
+                           on_error: Callable[[str, int, Exception], None]):
+        """Run debates through the ModelAffinityScheduler, interleaving turns across debates"""
+        sessions = [
+            DebateSession.for_model(participants[name], scenarios[i]["topic"], rounds, flow=name, **self.session_options)
+            if phase == "baseline"
+            else DebateSession.for_ensemble(participants[name], scenarios[i]["topic"], rounds, flow=name,
+                                            **self.session_options)
+            for name, i in jobs
+        ]
+        
+        # Every session is in flight from the start; the scheduler interleaves their turns
+        for name, i in jobs:
+            if self.residency is not None:
+                # The scheduler decides when each model loads; only pin them while in use
+                self.residency.before_debate(self._participant_models(phase, participants[name]), warm=False)
+            self._emit("debate_started", phase=phase, participant=name, scenario_index=i)
+        
+        scheduler = ModelAffinityScheduler(self.protocol, self.resident_models, self.max_concurrency)
+        scheduler.run(sessions, on_complete=lambda index, result: on_complete(*jobs[index], result),
+                      on_error=lambda index, error: on_error(*jobs[index], error))
+        self.last_scheduler_stats = scheduler.stats
+    
+    def _phase_result_to_dict(self, phase: str, participant: Any, result: DebateResult, scenario: Dict,
+                              scenario_index: int) -> Dict:
+        result_dict = self._debate_result_to_dict(result, scenario)
+        result_dict["scenario_index"] = scenario_index
+        if phase == "ensemble":
+            result_dict["ensemble_config"] = participant
+        return result_dict
+    
+    @staticmethod
+    def _store_debate_result(participant_results: List[Dict], result_dict: Dict):
+        """Insert one finished debate into its participant's results, in place and in scenario order"""
+        index = result_dict["scenario_index"]
+        # Debates mostly finish in scenario order, so this is usually an append
+        if not participant_results or participant_results[-1]["scenario_index"] <= index:
+            participant_results.append(result_dict)
+        else:
+            position = bisect.bisect([r["scenario_index"] for r in participant_results], index)
+            participant_results.insert(position, result_dict)
+    
+    def _pending_jobs(self, phase_results: Dict[str, List[Dict]], participants: Dict[str, Any],
+                      scenarios: List[Dict]) -> List[Tuple[str, int]]:
+        """(participant, scenario index) pairs with no checkpointed debate yet"""
+        jobs = []
+        for name in participants:
+            done = {result["scenario_index"] for result in phase_results.get(name, [])}
+            jobs.extend((name, i) for i in range(len(scenarios)) if i not in done)
+        return jobs
+    
+    def _backfill_scenario_indices(self, results: Dict[str, Any]):
+        """Add scenario_index to debates saved before per-debate checkpointing, matching by topic"""
+        topic_index = {scenario["topic"]: i for i, scenario in enumerate(results["scenarios_tested"])}
+        for results_key in ("baseline_results", "ensemble_results"):
+            for participant_results in results[results_key].values():
+                for result in participant_results:
+                    result.setdefault("scenario_index", topic_index.get(result["topic"], -1))
+                participant_results.sort(key=lambda r: r["scenario_index"])
     
     def _debate_result_to_dict(self, result: DebateResult, scenario: Dict) -> Dict:
         """Convert DebateResult to dictionary for JSON serialization"""
@@ -133,6 +404,7 @@ class EnsembleOrchestrator:
             "winner": result.winner,
             "judge_reasoning": result.judge_reasoning,
             "total_time": result.total_time,
+            "load_time": result.load_time,
             "ensemble_used": result.ensemble_used,
             "arguments": [
                 {
@@ -140,9 +412,23 @@ class EnsembleOrchestrator:
                     "model": arg.model,
                     "content": arg.content,
                     "round_number": arg.round_number,
-                    "timestamp": arg.timestamp
+                    "timestamp": arg.timestamp,
+                    "generation_stats": arg.generation_stats,
+                    **{field: getattr(arg, field) for field in ACCOUNTING_FIELDS}
                 }
                 for arg in result.arguments
+            ],
+            "failures": [
+                {
+                    "role": failure.role.value,
+                    "model": failure.model,
+                    "round_number": failure.round_number,
+                    "error": failure.error,
+                    "message": failure.message,
+                    "attempts": failure.attempts,
+                    "timestamp": failure.timestamp
+                }
+                for failure in result.failures
             ]
         }
     
@@ -150,17 +436,20 @@ class EnsembleOrchestrator:
         """Save experiment results to JSON file"""
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"../results/experiment_results_{timestamp}.json"
+            filename = os.path.join(self.results_dir, f"experiment_results_{timestamp}.json")
             
-        filepath = os.path.join(os.path.dirname(__file__), filename)
+        filepath = self._resolve_path(filename)
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
-        with open(filepath, 'w') as f:
-            json.dump(results, f, indent=2)
+        atomic_write_json(results, filepath)
             
         logging.info(f"Results saved to {filepath}")
         return filepath
     
+    def _resolve_path(self, filename: str) -> str:
+        """Resolve result paths relative to this module, as the results layout expects"""
+        return os.path.join(os.path.dirname(__file__), filename)
+    
     def analyze_results(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze experiment results and compute key metrics"""
         analysis = {
@@ -172,18 +461,30 @@ class EnsembleOrchestrator:
         # Compute summary statistics
         baseline_times = []
         ensemble_times = []
+        baseline_load_times = []
+        ensemble_load_times = []
         
         for model, model_results in results["baseline_results"].items():
-            times = [r["total_time"] for r in model_results if r["total_time"] > 0]
-            baseline_times.extend(times)
+            timed = [r for r in model_results if r["total_time"] > 0]
+            baseline_times.extend(r["total_time"] for r in timed)
+            baseline_load_times.extend(r.get("load_time", 0.0) for r in timed)
             
         for config, config_results in results["ensemble_results"].items():
-            times = [r["total_time"] for r in config_results if r["total_time"] > 0]
-            ensemble_times.extend(times)
+            timed = [r for r in config_results if r["total_time"] > 0]
+            ensemble_times.extend(r["total_time"] for r in timed)
+            ensemble_load_times.extend(r.get("load_time", 0.0) for r in timed)
+        
+        def average(values: List[float]) -> float:
+            return sum(values) / len(values) if values else 0
         
+        # Load times are model loads paid inside debates; the generation times exclude them
         analysis["summary_stats"] = {
-            "baseline_avg_time": sum(baseline_times) / len(baseline_times) if baseline_times else 0,
-            "ensemble_avg_time": sum(ensemble_times) / len(ensemble_times) if ensemble_times else 0,
+            "baseline_avg_time": average(baseline_times),
+            "ensemble_avg_time": average(ensemble_times),
+            "baseline_avg_load_time": average(baseline_load_times),
+            "ensemble_avg_load_time": average(ensemble_load_times),
+            "baseline_avg_generation_time": average(baseline_times) - average(baseline_load_times),
+            "ensemble_avg_generation_time": average(ensemble_times) - average(ensemble_load_times),
             "total_baseline_debates": len(baseline_times),
             "total_ensemble_debates": len(ensemble_times)
         }
@@ -195,6 +496,7 @@ class EnsembleOrchestrator:
                 analysis["performance_comparison"][f"baseline_{model}"] = {
                     "total_debates": len(valid_results),
                     "avg_time": sum(r["total_time"] for r in valid_results) / len(valid_results),
+                    "avg_load_time": sum(r.get("load_time", 0.0) for r in valid_results) / len(valid_results),
                     "proponent_wins": len([r for r in valid_results if r["winner"] == "PROPONENT"]),
                     "opponent_wins": len([r for r in valid_results if r["winner"] == "OPPONENT"])
                 }
@@ -205,6 +507,7 @@ class EnsembleOrchestrator:
                 analysis["performance_comparison"][f"ensemble_{config}"] = {
                     "total_debates": len(valid_results),
                     "avg_time": sum(r["total_time"] for r in valid_results) / len(valid_results),
+                    "avg_load_time": sum(r.get("load_time", 0.0) for r in valid_results) / len(valid_results),
                     "proponent_wins": len([r for r in valid_results if r["winner"] == "PROPONENT"]),
                     "opponent_wins": len([r for r in valid_results if r["winner"] == "OPPONENT"])
                 }
@@ -212,61 +515,51 @@ class EnsembleOrchestrator:
         return analysis
     
     def resume_from_incremental(self, incremental_file: str) -> Dict[str, Any]:
-        """Resume experiment suite from an incremental save file"""
+        """Resume experiment suite from an incremental debate log (.jsonl) or legacy JSON save file"""
         logging.info(f"Resuming experiment from {incremental_file}")
         
-        with open(incremental_file, 'r') as f:
-            results = json.load(f)
+        if incremental_file.endswith(".jsonl"):
+            results = DebateLog.compact(incremental_file)
+            log = DebateLog(incremental_file)
+        else:
+            with open(incremental_file, 'r') as f:
+                results = json.load(f)
+            self._backfill_scenario_indices(results)
+            
+            # Seed a debate log from the legacy file and append to it from here on
+            log = DebateLog(os.path.splitext(incremental_file)[0] + ".jsonl")
+            if os.path.exists(log.filepath):
+                raise FileExistsError(f"{log.filepath} already exists; resume from it instead")
+            log.write_header(results["metadata"], results["scenarios_tested"])
+            for phase in ("baseline", "ensemble"):
+                for name, participant_results in results[f"{phase}_results"].items():
+                    for result in participant_results:
+                        log.append_debate(phase, name, result)
         
         scenarios = results["scenarios_tested"]
         rounds = results["metadata"]["rounds"]
         
-        # Determine which models and configs still need to run
-        completed_baseline_models = set(results["baseline_results"].keys())
-        remaining_baseline_models = [m for m in self.baseline_models if m not in completed_baseline_models]
-        
-        completed_ensemble_configs = set(results["ensemble_results"].keys()) 
-        remaining_ensemble_configs = {k: v for k, v in self.ensemble_configs.items() if k not in completed_ensemble_configs}
-        
-        # Continue with remaining baseline models
-        if remaining_baseline_models:
-            logging.info(f"Continuing with remaining baseline models: {remaining_baseline_models}")
-            for model in tqdm(remaining_baseline_models, desc="Remaining baseline models"):
-                model_results = []
-                for i, scenario in enumerate(tqdm(scenarios, desc=f"Scenarios for {model}", leave=False)):
-                    try:
-                        result = self.protocol.run_single_model_debate(model, scenario["topic"], rounds)
-                        result_dict = self._debate_result_to_dict(result, scenario)
-                        model_results.append(result_dict)
-                        logging.info(f"Completed {model} - scenario {i+1}/{len(scenarios)}")
-                    except Exception as e:
-                        logging.error(f"Error in baseline {model} scenario {i}: {e}")
-                        continue
-                
-                results["baseline_results"][model] = model_results
-                self.save_results(results, incremental_file)
-                logging.info(f"Saved incremental results after completing baseline model: {model}")
-        
-        # Continue with remaining ensemble configs
-        if remaining_ensemble_configs:
-            logging.info(f"Continuing with remaining ensemble configs: {list(remaining_ensemble_configs.keys())}")
-            for config_name, config in tqdm(remaining_ensemble_configs.items(), desc="Remaining ensemble configs"):
-                config_results = []
-                for i, scenario in enumerate(tqdm(scenarios, desc=f"Scenarios for {config_name}", leave=False)):
-                    try:
-                        result = self.protocol.run_ensemble_debate(config, scenario["topic"], rounds)
-                        result_dict = self._debate_result_to_dict(result, scenario)
-                        result_dict["ensemble_config"] = config
-                        config_results.append(result_dict)
-                        logging.info(f"Completed {config_name} - scenario {i+1}/{len(scenarios)}")
-                    except Exception as e:
-                        logging.error(f"Error in ensemble {config_name} scenario {i}: {e}")
-                        continue
-                
-                results["ensemble_results"][config_name] = config_results
-                self.save_results(results, incremental_file)
-                logging.info(f"Saved incremental results after completing ensemble config: {config_name}")
+        # Determine which (model/config, scenario) debates still need to run
+        baseline_participants = {model: model for model in self.baseline_models}
+        baseline_jobs = self._pending_jobs(results["baseline_results"], baseline_participants, scenarios)
+        ensemble_jobs = self._pending_jobs(results["ensemble_results"], self.ensemble_configs, scenarios)
+        self._start_events(log, len(scenarios), rounds, {"baseline": len(baseline_jobs), "ensemble": len(ensemble_jobs)})
+        self._plan_residency([("baseline", baseline_participants, baseline_jobs),
+                              ("ensemble", self.ensemble_configs, ensemble_jobs)])
+        
+        # Continue with remaining baseline debates
+        if baseline_jobs:
+            logging.info(f"Continuing with {len(baseline_jobs)} remaining baseline debates")
+            self._run_phase("baseline", baseline_participants, scenarios, rounds, results,
+                            log, baseline_jobs)
+        
+        # Continue with remaining ensemble debates
+        if ensemble_jobs:
+            logging.info(f"Continuing with {len(ensemble_jobs)} remaining ensemble debates")
+            self._run_phase("ensemble", self.ensemble_configs, scenarios, rounds, results,
+                            log, ensemble_jobs)
         
+        self._finish_run(results, log)
         logging.info("Resume completed successfully")
         return results
     
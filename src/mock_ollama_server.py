@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the Ollama /api/generate endpoint, for benchmarking without real models.
+
+Each model gets a latency profile (load time, time to first token, tokens/sec)
+and at most max_resident_models stay loaded, with LRU eviction, so scheduling,
+concurrency and caching changes show realistic trade-offs on a CPU-only box.
+Responses are deterministic for a given seed and prompt, and include
+parseable "Winner:" / "Rating:" lines or rubric JSON when the prompt asks.
+
+    python src/mock_ollama_server.py --port 11434 --time-scale 0.01
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Tuple
+
+@dataclass
+class ModelProfile:
+    load_seconds: float        # Cold load into memory
+    ttft_seconds: float        # Fixed latency before the first token
+    tokens_per_second: float   # Generation rate once started
+    prompt_tokens_per_second: float = None  # Prompt evaluation rate; None = no per-token prompt cost
+
+def default_profile(model: str) -> ModelProfile:
+    """Latency profile scaled by the parameter count in the tag, e.g. deepseek-r1:14b"""
+    match = re.search(r"(\d+(?:\.\d+)?)b\b", model.lower())
+    params_b = float(match.group(1)) if match else 7.0
+    return ModelProfile(
+        load_seconds=0.5 * params_b,
+        ttft_seconds=0.05 + 0.02 * params_b,
+        tokens_per_second=280.0 / params_b,
+        prompt_tokens_per_second=2800.0 / params_b
+    )
+
+def tokenize(text: str) -> List[int]:
+    """Stand-in token ids, one per whitespace-separated word"""
+    return [zlib.crc32(word.encode("utf-8")) % 32000 for word in text.split()]
+
+RUBRIC_METRICS = ["argument_quality", "alignment_focus", "reasoning_depth", "safety_consideration", "coherence"]
+
+VOCABULARY = [
+    "alignment", "oversight", "values", "safety", "risk", "incentives", "humans", "systems",
+    "evidence", "corrigibility", "deployment", "trust", "harm", "benefit", "control", "goals",
+    "transparency", "robustness", "society", "policy", "therefore", "however", "because", "the",
+    "a", "we", "must", "should", "consider", "long-term", "outcomes", "argument", "position"
+]
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients closing idle keep-alive connections are routine, not errors
+        logging.debug(f"mock ollama: connection from {client_address} closed", exc_info=True)
+
+def keep_alive_seconds(keep_alive) -> float:
+    """Seconds of an Ollama keep_alive: a number, or a duration such as "5m" or "-1m" (negative pins)"""
+    if isinstance(keep_alive, (int, float)):
+        return float(keep_alive)
+    match = re.match(r"^(-?\d+(?:\.\d+)?)([smh]?)$", str(keep_alive).strip())
+    if match is None:
+        raise ValueError(f"Invalid keep_alive: {keep_alive!r}")
+    return float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+class MockOllamaServer:
+    """Threaded HTTP server speaking the subset of the Ollama API used by OllamaClient"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, profiles: Dict[str, ModelProfile] = None,
+                 max_resident_models: int = 1, num_parallel: int = 4, seed: int = 0, time_scale: float = 1.0,
+                 models: List[str] = None):
+        self.profiles = dict(profiles or {})
+        # Installed models; others get a 404 like Ollama. None serves any model name.
+        self.models = list(models) if models is not None else None
+        self.max_resident_models = max(1, max_resident_models)
+        self.num_parallel = max(1, num_parallel)
+        self.seed = seed
+        self.time_scale = time_scale
+
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()  # Ollama loads one model at a time
+        self._resident = OrderedDict()
+        self._pinned = set()  # Loaded with a negative keep_alive; evicted only when nothing else can be
+        self._slots: Dict[str, threading.Semaphore] = {}
+        self._stats = {"requests": 0, "streamed_requests": 0, "model_loads": 0, "evictions": 0,
+                       "unloads": 0, "generated_tokens": 0, "per_model": {}}
+
+        self.httpd = _QuietHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockOllamaServer":
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def profile(self, model: str) -> ModelProfile:
+        if model not in self.profiles:
+            self.profiles[model] = default_profile(model)
+        return self.profiles[model]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = json.loads(json.dumps(self._stats))
+            stats["resident_models"] = list(self._resident)
+        return stats
+
+    def _sleep(self, seconds: float) -> float:
+        seconds *= self.time_scale
+        if seconds > 0:
+            time.sleep(seconds)
+        return seconds
+
+    def _model_stats(self, model: str) -> Dict:
+        return self._stats["per_model"].setdefault(model, {"requests": 0, "loads": 0, "generated_tokens": 0})
+
+    def _ensure_loaded(self, model: str) -> float:
+        """Load model if not resident, evicting the least recently used; returns load seconds"""
+        with self._lock:
+            if model in self._resident:
+                self._resident.move_to_end(model)
+                return 0.0
+        with self._load_lock:
+            with self._lock:
+                # Another request may have loaded it while we waited
+                if model in self._resident:
+                    self._resident.move_to_end(model)
+                    return 0.0
+            load_time = self._sleep(self.profile(model).load_seconds)
+            with self._lock:
+                self._resident[model] = True
+                self._stats["model_loads"] += 1
+                self._model_stats(model)["loads"] += 1
+                while len(self._resident) > self.max_resident_models:
+                    unpinned = [name for name in self._resident if name not in self._pinned and name != model]
+                    victim = unpinned[0] if unpinned else next(iter(self._resident))
+                    del self._resident[victim]
+                    self._pinned.discard(victim)
+                    self._stats["evictions"] += 1
+            return load_time
+
+    def set_keep_alive(self, model: str, keep_alive):
+        """Apply a request's keep_alive: negative pins the model, zero unloads it"""
+        if keep_alive is None:
+            return
+        seconds = keep_alive_seconds(keep_alive)
+        with self._lock:
+            if seconds == 0:
+                if self._resident.pop(model, None) is not None:
+                    self._stats["unloads"] += 1
+                self._pinned.discard(model)
+            elif seconds < 0:
+                self._pinned.add(model)
+            else:
+                self._pinned.discard(model)
+
+    def load(self, request: Dict) -> Dict:
+        """Handle a request without a prompt: load the model, or unload it for keep_alive 0"""
+        model = request.get("model", "")
+        start = time.time()
+        if request.get("keep_alive") is not None and keep_alive_seconds(request["keep_alive"]) == 0:
+            self.set_keep_alive(model, 0)
+            reason = "unload"
+        else:
+            self._ensure_loaded(model)
+            self.set_keep_alive(model, request.get("keep_alive"))
+            reason = "load"
+        return {"model": model, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "response": "", "done": True, "done_reason": reason,
+                "total_duration": int((time.time() - start) * 1e9)}
+
+    def _slot(self, model: str) -> threading.Semaphore:
+        with self._lock:
+            if model not in self._slots:
+                self._slots[model] = threading.Semaphore(self.num_parallel)
+            return self._slots[model]
+
+    def compose_response(self, request: Dict) -> List[str]:
+        """Deterministic response tokens for a request (each token includes its leading space)"""
+        options = request.get("options") or {}
+        material = json.dumps([self.seed, request.get("model"), request.get("system", ""),
+                               request.get("prompt", ""), options.get("seed")])
+        rng = random.Random(hashlib.sha256(material.encode("utf-8")).hexdigest())
+        prompt = request.get("prompt", "") + (request.get("system") or "")
+
+        if "argument_quality" in prompt and "JSON" in prompt:
+            scores = {metric: rng.randint(4, 9) for metric in RUBRIC_METRICS}
+            return [json.dumps(scores)]
+
+        num_predict = int(options.get("num_predict", 200))
+        length = rng.randint(max(1, num_predict // 2), max(1, num_predict))
+        tokens = [rng.choice(VOCABULARY) for _ in range(length)]
+        tokens = [tokens[0].capitalize()] + [" " + token for token in tokens[1:]]
+        if "Winner:" in prompt:
+            tokens = [f"Winner: {rng.choice(['PROPONENT', 'OPPONENT'])}\n"] + tokens
+        if "Rating:" in prompt:
+            tokens.append(f"\nRating: {rng.randint(40, 95) / 10}")
+        return tokens
+
+    def generate(self, request: Dict) -> Tuple[List[str], Dict, float]:
+        """Load the model and wait out prompt evaluation; returns (tokens, timings, scaled seconds per token)"""
+        model = request.get("model", "")
+        start = time.time()
+        load_time = self._ensure_loaded(model)
+        profile = self.profile(model)
+        # Only the new prompt is evaluated; a passed context is continued from, as in Ollama
+        prompt_tokens = tokenize(request.get("system") or "") + tokenize(request.get("prompt", ""))
+        prompt_eval_seconds = profile.ttft_seconds
+        if profile.prompt_tokens_per_second:
+            prompt_eval_seconds += len(prompt_tokens) / profile.prompt_tokens_per_second
+        prompt_eval_time = self._sleep(prompt_eval_seconds)
+        tokens = self.compose_response(request)
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["streamed_requests"] += 1 if request.get("stream", True) else 0
+            self._stats["generated_tokens"] += len(tokens)
+            model_stats = self._model_stats(model)
+            model_stats["requests"] += 1
+            model_stats["generated_tokens"] += len(tokens)
+        timings = {
+            "start": start,
+            "load_duration": int(load_time * 1e9),
+            "prompt_eval_count": len(prompt_tokens),
+            "prompt_eval_duration": int(prompt_eval_time * 1e9),
+            "eval_count": len(tokens),
+            "context": list(request.get("context") or []) + prompt_tokens + tokenize("".join(tokens))
+        }
+        return tokens, timings, self.time_scale / profile.tokens_per_second
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without TCP_NODELAY each response waits out a delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    # Serving any model name has no finite inventory to report
+                    self._send_json({"models": [{"name": name} for name in server.models or []]})
+                elif self.path == "/api/ps":
+                    self._send_json({"models": [{"name": name} for name in server.stats()["resident_models"]]})
+                elif self.path == "/mock/stats":
+                    self._send_json(server.stats())
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    self._send_json({"error": "not found"}, status=404)
+                    return
+                try:
+                    request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                except ValueError:
+                    self._send_json({"error": "invalid JSON body"}, status=400)
+                    return
+
+                model = request.get("model", "")
+                if server.models is not None and model not in server.models:
+                    self._send_json({"error": f"model '{model}' not found"}, status=404)
+                    return
+                if not request.get("prompt") and not request.get("system"):
+                    # Like Ollama, an empty prompt only loads (or with keep_alive 0, unloads) the model
+                    self._send_json(server.load(request))
+                    return
+                with server._slot(model):
+                    tokens, timings, token_delay = server.generate(request)
+                    server.set_keep_alive(model, request.get("keep_alive"))
+                    if request.get("stream", True):
+                        self._stream(model, tokens, timings, token_delay)
+                    else:
+                        eval_time = len(tokens) * token_delay
+                        time.sleep(eval_time)
+                        self._send_json(self._final(model, "".join(tokens), timings, eval_time))
+
+            def _final(self, model: str, text: str, timings: Dict, eval_time: float) -> Dict:
+                return {
+                    "model": model,
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    "response": text,
+                    "done": True,
+                    "done_reason": "stop",
+                    "total_duration": int((time.time() - timings["start"]) * 1e9),
+                    "load_duration": timings["load_duration"],
+                    "prompt_eval_count": timings["prompt_eval_count"],
+                    "prompt_eval_duration": timings["prompt_eval_duration"],
+                    "eval_count": timings["eval_count"],
+                    "eval_duration": int(eval_time * 1e9),
+                    "context": timings["context"]
+                }
+
+            def _stream(self, model: str, tokens: List[str], timings: Dict, token_delay: float):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                eval_start = time.time()
+                try:
+                    for token in tokens:
+                        self._write_chunk({"model": model, "response": token, "done": False})
+                        if token_delay > 0:
+                            time.sleep(token_delay)
+                    self._write_chunk(self._final(model, "", timings, time.time() - eval_start))
+                    self.wfile.write(b"0\r\n\r\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client cancelled the stream
+                    self.close_connection = True
+
+            def _write_chunk(self, data: Dict):
+                line = (json.dumps(data) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+                self.wfile.flush()
+
+            def _send_json(self, data: Dict, status: int = 200):
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logging.debug(f"mock ollama: {format % args}")
+
+        return Handler
+
+def load_profiles(filepath: str) -> Dict[str, ModelProfile]:
+    """Read {"model": {"load_seconds": .., "ttft_seconds": .., "tokens_per_second": ..}} from JSON"""
+    with open(filepath, 'r') as f:
+        return {model: ModelProfile(**profile) for model, profile in json.load(f).items()}
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock Ollama server for benchmarking')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--profiles', type=str, help='JSON file of per-model latency profiles')
+    parser.add_argument('--max-resident-models', type=int, default=1,
+                        help='Models kept loaded at once; others are evicted LRU (default: 1)')
+    parser.add_argument('--num-parallel', type=int, default=4,
+                        help='Concurrent requests served per model, like OLLAMA_NUM_PARALLEL (default: 4)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for generated text')
+    parser.add_argument('--models', nargs='+', default=None,
+                        help='Installed models; requests for others get a 404 (default: serve any model)')
+    parser.add_argument('--time-scale', type=float, default=1.0,
+                        help='Multiply every simulated delay, e.g. 0.01 for fast CI runs')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = MockOllamaServer(args.host, args.port,
+                              profiles=load_profiles(args.profiles) if args.profiles else None,
+                              max_resident_models=args.max_resident_models,
+                              num_parallel=args.num_parallel, seed=args.seed, time_scale=args.time_scale,
+                              models=args.models)
+    logging.info(f"Mock Ollama server listening on {server.url}")
+    for model in server.profiles:
+        logging.info(f"  {model}: {asdict(server.profiles[model])}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
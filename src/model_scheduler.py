@@ -0,0 +1,128 @@
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from debate_protocol import DebateProtocol, DebateSession, DebateResult
+from resilience import GenerationError
+
+def count_model_loads(models: List[str], resident_models: int = 1) -> int:
+    """Count model loads for a sequence of calls, assuming LRU eviction of resident models"""
+    resident = OrderedDict()
+    loads = 0
+    for model in models:
+        if model in resident:
+            resident.move_to_end(model)
+            continue
+        loads += 1
+        resident[model] = True
+        if len(resident) > resident_models:
+            resident.popitem(last=False)
+    return loads
+
+class ModelAffinityScheduler:
+    """Runs many debates turn by turn, batching turns per model to avoid Ollama model swaps.
+
+    Each debate's own turn order is preserved. At every step the scheduler
+    prefers a model that is already resident and runs all of its ready turns
+    as one batch; otherwise it loads the model whose ready turns are earliest
+    in the debate (e.g. all round-1 proponent turns before any opponent
+    turns), breaking ties by batch size.
+    """
+
+    def __init__(self, protocol: DebateProtocol, resident_models: int = 1, max_concurrency: int = 1):
+        self.protocol = protocol
+        self.resident_models = max(1, resident_models)
+        self.max_concurrency = max(1, max_concurrency)
+        self.stats = {}
+
+    def run(self, sessions: List[DebateSession],
+            on_complete: Callable[[int, DebateResult], None] = None,
+            on_error: Callable[[int, Exception], None] = None) -> List[DebateResult]:
+        """Run all sessions to completion and return their results in input order.
+
+        on_complete(index, result) is called as soon as a session's judge turn
+        finishes. Sessions whose turn raised an exception are dropped, reported
+        to on_error(index, exception) and returned as None.
+        """
+        failed = set()
+        resident = OrderedDict()
+        executed_models = []
+        batches = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            while True:
+                ready = [i for i, session in enumerate(sessions) if not session.done and i not in failed]
+                if not ready:
+                    break
+
+                by_model: Dict[str, List[int]] = {}
+                for i in ready:
+                    by_model.setdefault(sessions[i].next_turn().model, []).append(i)
+
+                model = self._pick_model(by_model, sessions, resident)
+                batch = by_model[model]
+                resident[model] = True
+                resident.move_to_end(model)
+                if len(resident) > self.resident_models:
+                    resident.popitem(last=False)
+
+                futures = {executor.submit(self._run_turn, sessions[i]): i for i in batch}
+                for future, i in futures.items():
+                    try:
+                        future.result()
+                        executed_models.append(model)
+                    except Exception as e:
+                        logging.error(f"Error in scheduled turn for {model} on '{sessions[i].topic}': {e}")
+                        failed.add(i)
+                        if on_error is not None:
+                            on_error(i, e)
+                        continue
+                    if sessions[i].done and on_complete is not None:
+                        on_complete(i, sessions[i].result())
+                batches += 1
+
+        baseline_models = [turn_model for session in sessions for turn_model in self._planned_models(session)]
+        baseline_loads = count_model_loads(baseline_models, self.resident_models)
+        scheduled_loads = count_model_loads(executed_models, self.resident_models)
+        self.stats = {
+            "debates": len(sessions),
+            "turns": len(executed_models),
+            "batches": batches,
+            "resident_models": self.resident_models,
+            "model_loads": scheduled_loads,
+            "sequential_model_loads": baseline_loads,
+            "model_loads_saved": baseline_loads - scheduled_loads
+        }
+        logging.info(f"Affinity scheduler: {scheduled_loads} model loads "
+                     f"({baseline_loads - scheduled_loads} saved vs sequential)")
+
+        return [None if i in failed else session.result() for i, session in enumerate(sessions)]
+
+    def _pick_model(self, by_model: Dict[str, List[int]], sessions: List[DebateSession],
+                    resident: OrderedDict) -> str:
+        # Stay on a resident model while it has work, most recently used first
+        for model in reversed(resident):
+            if model in by_model:
+                return model
+        # Otherwise load the model whose turns come earliest, then the largest batch
+        return min(by_model, key=lambda m: (min(sessions[i].step for i in by_model[m]), -len(by_model[m])))
+
+    def _run_turn(self, session: DebateSession):
+        turn = session.next_turn()
+        start_time = time.time()
+        try:
+            content, stats = self.protocol.generate_turn(turn.model, turn.role, session.topic, session.transcript,
+                                                         session.debate_id, session.request_tag())
+        except GenerationError as error:
+            # A failed generation is part of the debate's record, not a failed debate
+            session.record_failure(turn, error, time.time() - start_time)
+        else:
+            session.record(turn, content, time.time() - start_time, stats)
+        if session.done:
+            self.protocol.release_debate(session.debate_id)
+
+    @staticmethod
+    def _planned_models(session: DebateSession) -> List[str]:
+        return [session.role_models[role] for role, _ in session.plan]
@@ -0,0 +1,924 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from adaptive_timeout import AdaptiveTimeouts
+from endpoint_pool import Endpoint, EndpointPool
+from request_scheduler import RequestScheduler, RequestTag
+from resilience import (CircuitBreaker, CircuitOpen, EndpointUnavailable, GenerationError, GenerationTimeout,
+                        RetryPolicy, ServerError, retry_delay_for)
+from response_cache import ResponseCache
+
+try:
+    import aiohttp
+except ImportError:  # Only needed for AsyncOllamaClient
+    aiohttp = None
+
+DEFAULT_OPTIONS = {
+    "num_predict": 200,  # Limit response length
+    "temperature": 0.7,
+    "top_p": 0.9
+}
+
+# Timing/token fields Ollama reports on the final (done) response; durations are in ns
+OLLAMA_STAT_FIELDS = ["total_duration", "load_duration", "prompt_eval_count",
+                      "prompt_eval_duration", "eval_count", "eval_duration"]
+
+def build_generate_payload(model: str, prompt: str, system_prompt: str = None, options: Dict = None,
+                           stream: bool = False, context: List[int] = None,
+                           keep_alive: Union[int, str] = None) -> Dict:
+    """Build the /api/generate request body shared by the sync and async clients"""
+    data = {
+        "model": model,
+        "prompt": prompt,
+        "stream": stream,
+        "options": dict(options if options is not None else DEFAULT_OPTIONS)
+    }
+    
+    if system_prompt:
+        data["system"] = system_prompt
+    if context:
+        # Token state returned by an earlier call; Ollama continues from it instead of re-reading it
+        data["context"] = context
+    if keep_alive is not None:
+        # How long Ollama keeps the model loaded after this call; -1 until unloaded, 0 unloads now
+        data["keep_alive"] = keep_alive
+    return data
+
+def generation_cache_key(model: str, prompt: str, system_prompt: str, options: Dict,
+                         context: List[int] = None) -> str:
+    """Response cache key; a continuation is keyed on the context it continues from as well"""
+    if context:
+        options = dict(options, context=hashlib.sha256(json.dumps(context).encode("utf-8")).hexdigest())
+    return ResponseCache.make_key(model, prompt, system_prompt, options)
+
+def ollama_response_stats(final: Dict, wall_time: float) -> Dict:
+    """Generation stats from Ollama's final response object"""
+    stats = {"wall_time": wall_time}
+    for field in OLLAMA_STAT_FIELDS:
+        if field in final:
+            stats[field] = final[field]
+    if final.get("eval_count") and final.get("eval_duration"):
+        stats["tokens_per_second"] = final["eval_count"] / (final["eval_duration"] / 1e9)
+    if "context" in final:
+        stats["context"] = final["context"]
+    return stats
+
+def generation_error(model: str, error: Exception) -> GenerationError:
+    """The GenerationError for a requests transport error or a malformed response from model"""
+    if isinstance(error, requests.exceptions.Timeout):
+        return GenerationTimeout(model, f"Timeout generating response from {model}")
+    if isinstance(error, requests.exceptions.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        return ServerError(model, f"Ollama returned HTTP {status} for {model}", status)
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return EndpointUnavailable(model, f"Could not reach Ollama for {model}: {error}")
+    return ServerError(model, f"Bad response generating with {model}: {error}")
+
+def make_endpoint_pool(base_url: Union[str, Sequence[str], EndpointPool]) -> Optional[EndpointPool]:
+    """EndpointPool for a list of URLs (or the pool itself); None for a single URL"""
+    if isinstance(base_url, EndpointPool):
+        return base_url
+    if isinstance(base_url, str):
+        return None
+    pool = EndpointPool(base_url)
+    pool.start_health_checks()
+    return pool
+
+def summarize_intervals(intervals: List[float]) -> Dict:
+    """Distribution summary of inter-chunk intervals, in seconds"""
+    if not intervals:
+        return {"count": 0}
+    ordered = sorted(intervals)
+    
+    def percentile(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": percentile(0.5),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": ordered[-1]
+    }
+
+class GenerationStream:
+    """Iterator over the text chunks of a streaming /api/generate call.
+    
+    Records time-to-first-token, inter-token intervals and Ollama's final
+    eval stats in .stats once iteration ends. Iteration stops early (and the
+    connection is released) when cancel() is called or max_seconds elapses.
+    on_close(stats, error) runs once iteration ends, error being the transport
+    error that ended it, if any; map_error turns such errors into the ones raised.
+    """
+    
+    def __init__(self, response: requests.Response, max_seconds: float = None, start_time: float = None):
+        self.response = response
+        self.max_seconds = max_seconds
+        # Measure from when the request was sent; headers only arrive with the first chunk
+        self.start_time = start_time if start_time is not None else time.time()
+        self.chunks: List[str] = []
+        self.stats: Dict = {}
+        self.cancelled = False
+        self.on_close: Optional[Callable[[Dict, Optional[Exception]], None]] = None
+        self.map_error: Optional[Callable[[Exception], Exception]] = None
+        
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+        
+    def cancel(self):
+        self.cancelled = True
+        
+    def __iter__(self):
+        first_token_time = None
+        last_token_time = None
+        intervals = []
+        final = {}
+        error = None
+        try:
+            for line in self.response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                now = time.time()
+                if chunk.get("response"):
+                    if first_token_time is None:
+                        first_token_time = now
+                    else:
+                        intervals.append(now - last_token_time)
+                    last_token_time = now
+                    self.chunks.append(chunk["response"])
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    final = chunk
+                    break
+                if self.max_seconds is not None and now - self.start_time > self.max_seconds:
+                    logging.warning(f"Cancelling generation after {self.max_seconds}s")
+                    self.cancelled = True
+                if self.cancelled:
+                    break
+        except (requests.exceptions.RequestException, ValueError) as e:
+            error = e
+            if self.map_error is not None:
+                raise self.map_error(e) from e
+            raise
+        finally:
+            self.response.close()
+            self.stats = ollama_response_stats(final, time.time() - self.start_time)
+            self.stats["streamed"] = True
+            self.stats["cancelled"] = self.cancelled
+            self.stats["ttft"] = first_token_time - self.start_time if first_token_time else None
+            self.stats["inter_token_intervals"] = summarize_intervals(intervals)
+            if self.on_close is not None:
+                self.on_close(self.stats, error)
+
+class _Resilience:
+    """Retry, circuit-breaker, timeout and admission bookkeeping shared by the sync and async clients"""
+    
+    def _init_resilience(self, retry: RetryPolicy, breaker: CircuitBreaker, timeout: Optional[float],
+                         timeouts: Optional[AdaptiveTimeouts], request_scheduler: Optional[RequestScheduler]):
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        # A fixed timeout disables per-model adaptation (see adaptive_timeout.py)
+        self.timeouts = timeouts if timeouts is not None else AdaptiveTimeouts(fixed=timeout)
+        # Set by a ResidencyManager to choose each request's keep_alive and track loaded models (see residency.py)
+        self.residency = None
+        # Optional priority queue in front of each upstream attempt (see request_scheduler.py)
+        self.request_scheduler = request_scheduler
+        self._failure_lock = threading.Lock()
+        self.failure_stats = {"retries": 0, "failed_generations": 0, "circuit_rejections": 0, "errors": {}}
+        
+    def _admit(self, model: str, attempt: int):
+        """Raise CircuitOpen instead of calling a model whose circuit is open"""
+        if not self.breaker.allow(model):
+            with self._failure_lock:
+                self.failure_stats["circuit_rejections"] += 1
+            raise CircuitOpen(model, f"Circuit open for {model} after repeated failures", attempt)
+            
+    def _retry_delay(self, model: str, error: GenerationError, attempt: int) -> Optional[float]:
+        """Record a failed attempt; seconds to wait before the next one, or None to give up"""
+        if self.breaker.record_failure(model):
+            logging.warning(f"Opening circuit for {model} after repeated failures")
+        delay = retry_delay_for(error, self.retry, attempt)
+        with self._failure_lock:
+            errors = self.failure_stats["errors"]
+            errors[error.kind] = errors.get(error.kind, 0) + 1
+            if delay is None:
+                self.failure_stats["failed_generations"] += 1
+            else:
+                self.failure_stats["retries"] += 1
+        if delay is None:
+            error.attempts = attempt + 1
+            logging.error(f"Generation with {model} failed after {attempt + 1} attempt(s): {error}")
+        else:
+            logging.warning(f"{error}; retrying in {delay:.1f}s")
+        return delay
+        
+    def resilience_stats(self) -> Dict:
+        """Retries, final failures by error type and per-model circuit breaker state"""
+        with self._failure_lock:
+            stats = json.loads(json.dumps(self.failure_stats))
+        stats["circuits"] = self.breaker.stats()
+        return stats
+        
+    def timeout_stats(self) -> Dict:
+        """Timeout settings and each model's latency quantiles and effective timeouts"""
+        return self.timeouts.stats()
+        
+    def _keep_alive(self, model: str) -> Optional[Union[int, str]]:
+        """keep_alive to send with a generation of model; None leaves Ollama's default"""
+        return self.residency.keep_alive_for(model) if self.residency is not None else None
+        
+    def _request_timeout(self, model: str, endpoint: Optional[Endpoint], cold: Optional[bool]) -> float:
+        """Timeout of one request; a model not resident on the endpoint may need loading first"""
+        if endpoint is not None and not cold:
+            cold = model not in endpoint.resident
+        return self.timeouts.timeout_for(model, cold)
+        
+    @contextmanager
+    def _slot(self, model: str, priority: Optional[RequestTag]):
+        """Wait for the request scheduler to admit one attempt; yields the seconds queued"""
+        if self.request_scheduler is None:
+            yield 0.0
+            return
+        with self.request_scheduler.slot(model, priority) as wait:
+            yield wait
+            
+    @asynccontextmanager
+    async def _async_slot(self, model: str, priority: Optional[RequestTag]):
+        if self.request_scheduler is None:
+            yield 0.0
+            return
+        async with self.request_scheduler.async_slot(model, priority) as wait:
+            yield wait
+            
+    def request_scheduler_stats(self) -> Optional[Dict]:
+        """Queueing stats of the request scheduler, None without one"""
+        return self.request_scheduler.stats() if self.request_scheduler is not None else None
+
+class _SingleFlight:
+    """Bookkeeping for collapsing identical in-flight generations, shared by both clients"""
+    
+    def _init_single_flight(self, coalesce: Optional[bool]):
+        self.coalesce = coalesce
+        self._in_flight: Dict[str, object] = {}
+        self._flight_lock = threading.Lock()
+        self.coalesced_requests = 0  # Requests answered by another caller's identical in-flight call
+        
+    def _coalescing(self) -> bool:
+        """Whether identical requests may share one call: by default only if generation is deterministic"""
+        if self.coalesce is not None:
+            return self.coalesce
+        return self.options.get("seed") is not None or self.options.get("temperature") == 0
+        
+    def coalescing_stats(self) -> Dict:
+        with self._flight_lock:
+            return {"enabled": self._coalescing(), "coalesced_requests": self.coalesced_requests}
+            
+    @staticmethod
+    def _follower_stats(stats: Dict, start_time: float) -> Dict:
+        # The upstream call's stats, with the time this caller actually waited
+        return dict(stats, coalesced=True, wall_time=time.time() - start_time)
+
+class _Flight:
+    """One in-flight generation that identical requests wait on"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Tuple[str, Dict]] = None
+        self.error: Optional[BaseException] = None
+
+class OllamaClient(_Resilience, _SingleFlight):
+    """Pooled HTTP client for Ollama's /api/generate.
+    
+    base_url is one Ollama URL, or a list of URLs (or an EndpointPool) to
+    route each request to the best of several hosts, failing over to the
+    next one when a host errors (see endpoint_pool.py). Failed generations
+    are retried per retry and raise a GenerationError once retries run out;
+    breaker fails calls fast while a model keeps failing (see resilience.py).
+    Request timeouts adapt to each model's observed latency unless a fixed
+    timeout is given (see adaptive_timeout.py). Identical concurrent
+    requests share one upstream call when coalesce is True, or by default
+    when generation is deterministic (temperature 0 or a fixed seed).
+    With a request_scheduler, each upstream attempt first waits for a slot
+    of its model, served by the priority passed to generate_with_stats
+    (see request_scheduler.py); stats["queue_wait"] is the time spent queued.
+    """
+    
+    def __init__(self, base_url: Union[str, Sequence[str], EndpointPool] = "http://localhost:11434",
+                 pool_size: int = 10, reuse_connections: bool = True, options: Dict = None, seed: int = None,
+                 cache: ResponseCache = None, stream: bool = False, max_stream_seconds: float = None,
+                 retry: RetryPolicy = None, breaker: CircuitBreaker = None, timeout: float = None,
+                 timeouts: AdaptiveTimeouts = None, coalesce: bool = None,
+                 request_scheduler: RequestScheduler = None):
+        self._init_resilience(retry, breaker, timeout, timeouts, request_scheduler)
+        self._init_single_flight(coalesce)
+        self.endpoints = make_endpoint_pool(base_url)
+        self.base_url = self.endpoints.urls[0] if self.endpoints is not None else base_url
+        self.pool_size = pool_size
+        # HTTP connection reuse; unrelated to Ollama's keep_alive, how long a model stays loaded
+        self.reuse_connections = reuse_connections
+        self.stream = stream  # Stream tokens to measure TTFT and inter-token latency
+        self.max_stream_seconds = max_stream_seconds  # Cancel runaway streamed generations
+        self.options = dict(options if options is not None else DEFAULT_OPTIONS)
+        if seed is not None:
+            self.options["seed"] = seed
+        self.cache = cache  # Opt-in response cache, see response_cache.py
+        self.session = self._create_session()
+        
+    def _create_session(self) -> requests.Session:
+        """Create a pooled HTTP session so repeated calls reuse TCP connections"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            pool_block=True  # Wait for a free connection instead of opening extras
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.reuse_connections:
+            session.headers["Connection"] = "close"
+        return session
+        
+    def connection_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-host request and connection counts for the pooled session"""
+        stats = {}
+        # http:// and https:// share one adapter, so walk each adapter once
+        adapters = {id(adapter): adapter for adapter in self.session.adapters.values()}
+        for adapter in adapters.values():
+            for key in adapter.poolmanager.pools.keys():
+                pool = adapter.poolmanager.pools[key]
+                host = f"{pool.scheme}://{pool.host}:{pool.port}"
+                host_stats = stats.setdefault(host, {"requests": 0, "connections_opened": 0, "connections_reused": 0})
+                host_stats["requests"] += pool.num_requests
+                host_stats["connections_opened"] += pool.num_connections
+                host_stats["connections_reused"] += max(0, pool.num_requests - pool.num_connections)
+        return stats
+        
+    def endpoint_stats(self) -> Optional[Dict]:
+        """Routing and health stats of the endpoint pool, None for a single endpoint"""
+        return self.endpoints.stats() if self.endpoints is not None else None
+        
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+        if self.endpoints is not None:
+            self.endpoints.close()
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        
+    def generate(self, model: str, prompt: str, system_prompt: str = None, priority: RequestTag = None) -> str:
+        return self.generate_with_stats(model, prompt, system_prompt, priority=priority)[0]
+        
+    def load_model(self, model: str, keep_alive: Union[int, str] = None) -> float:
+        """Load model without generating (an empty-prompt request); returns the seconds it took.
+        
+        With several endpoints the model is loaded on the one that would serve it next.
+        """
+        endpoint = self.endpoints.acquire(model) if self.endpoints is not None else None
+        data = {"model": model}
+        keep_alive = keep_alive if keep_alive is not None else self._keep_alive(model)
+        if keep_alive is not None:
+            data["keep_alive"] = keep_alive
+        start_time = time.time()
+        try:
+            response = self.session.post(f"{endpoint.url if endpoint else self.base_url}/api/generate", json=data,
+                                         timeout=self._request_timeout(model, endpoint, True))
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            if endpoint is not None:
+                self.endpoints.release(endpoint, model, failed=not isinstance(e, requests.exceptions.Timeout),
+                                       timed_out=isinstance(e, requests.exceptions.Timeout))
+            raise
+        seconds = time.time() - start_time
+        if endpoint is not None:
+            self.endpoints.release_load(endpoint, model, seconds)
+        self.timeouts.record_load(model, seconds)
+        return seconds
+        
+    def unload_model(self, model: str):
+        """Ask every endpoint to unload model now (keep_alive 0); unreachable endpoints are skipped"""
+        endpoints = self.endpoints.endpoints if self.endpoints is not None else [None]
+        for endpoint in endpoints:
+            try:
+                response = self.session.post(f"{endpoint.url if endpoint else self.base_url}/api/generate",
+                                             json={"model": model, "keep_alive": 0},
+                                             timeout=self.timeouts.min_timeout)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                logging.warning(f"Could not unload {model}: {e}")
+                continue
+            if endpoint is not None:
+                self.endpoints.mark_unloaded(endpoint, model)
+        
+    def loaded_models(self) -> Dict[str, Optional[int]]:
+        """Models loaded on the primary endpoint (/api/ps) with the memory each uses in bytes, if reported"""
+        response = self.session.get(f"{self.base_url}/api/ps", timeout=self.timeouts.min_timeout)
+        response.raise_for_status()
+        return {model["name"]: model.get("size_vram") or model.get("size")
+                for model in response.json().get("models", [])}
+
+    def generate_stream(self, model: str, prompt: str, system_prompt: str = None,
+                        context: List[int] = None) -> GenerationStream:
+        """Start a streaming generation; iterate the result to the end (or cancel it) for text chunks.
+        
+        With several endpoints the stream is routed like any generation: it is
+        in flight on its endpoint until iteration ends, fails over to the next
+        endpoint if it cannot be opened, and its outcome updates the endpoint's
+        health. Transport errors are raised as GenerationErrors, whether they
+        occur on opening or while iterating.
+        """
+        try:
+            if self.endpoints is None:
+                generation = self._open_stream(self.base_url, model, prompt, system_prompt, context,
+                                               self._request_timeout(model, None, None))
+            else:
+                generation = self._open_routed_stream(model, prompt, system_prompt, context)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise generation_error(model, e) from e
+        generation.map_error = lambda error: generation_error(model, error)
+        return generation
+        
+    def _open_routed_stream(self, model: str, prompt: str, system_prompt: str,
+                            context: Optional[List[int]]) -> GenerationStream:
+        """Open a stream on the best endpoint of the pool, failing over to the next one on errors"""
+        tried = []
+        last_error = None
+        while True:
+            endpoint = self._next_endpoint(model, tried, last_error)
+            try:
+                generation = self._open_stream(endpoint.url, model, prompt, system_prompt, context,
+                                               self._request_timeout(model, endpoint, None))
+            except requests.exceptions.Timeout:
+                self.endpoints.release(endpoint, model, timed_out=True)
+                raise
+            except (requests.exceptions.RequestException, ValueError) as e:
+                self._release_failed(endpoint, model, e)
+                last_error = e
+                continue
+            generation.on_close = lambda stats, error, endpoint=endpoint: self._release_stream(
+                endpoint, model, stats, error)
+            return generation
+            
+    def _release_stream(self, endpoint: Endpoint, model: str, stats: Dict, error: Optional[Exception]):
+        if isinstance(error, requests.exceptions.Timeout):
+            self.endpoints.release(endpoint, model, timed_out=True)
+        elif error is not None:
+            self._release_failed(endpoint, model, error)
+        else:
+            # A cancelled stream's wall time says nothing about the model's latency there
+            self.endpoints.release(endpoint, model, None if stats.get("cancelled") else stats)
+            stats["endpoint"] = endpoint.url
+        
+    def _open_stream(self, base_url: str, model: str, prompt: str, system_prompt: str,
+                     context: Optional[List[int]], timeout: float) -> GenerationStream:
+        url = f"{base_url}/api/generate"
+        data = build_generate_payload(model, prompt, system_prompt, self.options, stream=True, context=context,
+                                      keep_alive=self._keep_alive(model))
+        start_time = time.time()
+        # With stream=True the read timeout bounds the wait for each chunk, the first one included
+        response = self.session.post(url, json=data, timeout=timeout, stream=True)
+        response.raise_for_status()
+        return GenerationStream(response, self.max_stream_seconds, start_time)
+        
+    def generate_with_stats(self, model: str, prompt: str, system_prompt: str = None,
+                            stream: bool = None, context: List[int] = None,
+                            return_context: bool = False, priority: RequestTag = None) -> Tuple[str, Dict]:
+        """Generate a response and return it with timing/token stats.
+        
+        context continues from the token state of an earlier call. With
+        return_context, stats["context"] holds the new token state (absent
+        on cache hits). priority tags the request for the request scheduler. Raises a GenerationError once retries are exhausted
+        or while the model's circuit is open.
+        """
+        stream = self.stream if stream is None else stream
+        coalescing = self._coalescing()
+        cache_key = (generation_cache_key(model, prompt, system_prompt, self.options, context)
+                     if self.cache is not None or coalescing else None)
+        
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached, {"cached": True}
+        
+        if coalescing:
+            text, stats = self._generate_single_flight(cache_key, model, prompt, system_prompt, stream, context,
+                                                       priority)
+        else:
+            text, stats = self._generate_with_retries(model, prompt, system_prompt, stream, context, priority)
+        if not return_context:
+            stats.pop("context", None)
+        if self.cache is not None and not stats.get("cancelled") and not stats.get("coalesced"):
+            self.cache.put(cache_key, text, model)
+        return text, stats
+        
+    def _generate_single_flight(self, key: str, model: str, prompt: str, system_prompt: str, stream: bool,
+                                context: Optional[List[int]], priority: Optional[RequestTag]) -> Tuple[str, Dict]:
+        """Generate, or wait for an identical generation already in flight and share its result"""
+        start_time = time.time()
+        with self._flight_lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+            else:
+                self.coalesced_requests += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            text, stats = flight.result
+            return text, self._follower_stats(stats, start_time)
+        try:
+            flight.result = self._generate_with_retries(model, prompt, system_prompt, stream, context, priority)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flight_lock:
+                del self._in_flight[key]
+            flight.done.set()
+        text, stats = flight.result
+        return text, dict(stats)
+        
+    def _generate_with_retries(self, model: str, prompt: str, system_prompt: str, stream: bool,
+                               context: Optional[List[int]], priority: Optional[RequestTag]) -> Tuple[str, Dict]:
+        """Generate with retries and the circuit breaker; stats include the returned context"""
+        attempt = 0
+        cold = None
+        queue_wait = 0.0
+        while True:
+            self._admit(model, attempt)
+            try:
+                # Backoff between attempts happens outside the slot, leaving it to other requests
+                with self._slot(model, priority) as wait:
+                    queue_wait += wait
+                    text, stats = self._generate_once(model, prompt, system_prompt, stream, context, cold)
+                break
+            except GenerationError as error:
+                delay = self._retry_delay(model, error, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                # A timeout may have been a model load; allow for one on the retry
+                cold = True if isinstance(error, GenerationTimeout) else cold
+        self.breaker.record_success(model)
+        self.timeouts.record(model, stats)
+        if self.residency is not None:
+            self.residency.observe(model)
+        if attempt:
+            stats["attempts"] = attempt + 1
+        if self.request_scheduler is not None:
+            stats["queue_wait"] = queue_wait
+        return text, stats
+        
+    def _generate_once(self, model: str, prompt: str, system_prompt: str, stream: bool,
+                       context: Optional[List[int]], cold: Optional[bool]) -> Tuple[str, Dict]:
+        """One attempt (with endpoint failover), transport errors raised as GenerationErrors"""
+        try:
+            if self.endpoints is None:
+                return self._post_generate(self.base_url, model, prompt, system_prompt, stream, context,
+                                           self._request_timeout(model, None, cold))
+            return self._generate_routed(model, prompt, system_prompt, stream, context, cold)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise generation_error(model, e) from e
+            
+    def _post_generate(self, base_url: str, model: str, prompt: str, system_prompt: str, stream: bool,
+                       context: Optional[List[int]], timeout: float) -> Tuple[str, Dict]:
+        """One /api/generate call against base_url; raises on connection, HTTP and timeout errors"""
+        try:
+            if stream:
+                generation = self._open_stream(base_url, model, prompt, system_prompt, context, timeout)
+                for _ in generation:
+                    pass
+                text, stats = generation.text, generation.stats
+            else:
+                data = build_generate_payload(model, prompt, system_prompt, self.options, context=context,
+                                              keep_alive=self._keep_alive(model))
+                start_time = time.time()
+                response = self.session.post(f"{base_url}/api/generate", json=data, timeout=timeout)
+                response.raise_for_status()
+                result = response.json()
+                text, stats = result.get("response", ""), ollama_response_stats(result, time.time() - start_time)
+        except requests.exceptions.Timeout:
+            self.timeouts.record_timeout(model, timeout)
+            raise
+        stats["timeout"] = timeout
+        return text, stats
+        
+    def _generate_routed(self, model: str, prompt: str, system_prompt: str, stream: bool,
+                         context: Optional[List[int]], cold: Optional[bool]) -> Tuple[str, Dict]:
+        """Generate on the best endpoint of the pool, failing over to the next one on errors.
+        
+        A timeout is raised without failing over: the model may be slow or
+        loading rather than the host down, and the retry policy decides
+        whether to try again.
+        """
+        tried = []
+        last_error = None
+        while True:
+            endpoint = self._next_endpoint(model, tried, last_error)
+            try:
+                text, stats = self._post_generate(endpoint.url, model, prompt, system_prompt, stream, context,
+                                                  self._request_timeout(model, endpoint, cold))
+            except requests.exceptions.Timeout:
+                self.endpoints.release(endpoint, model, timed_out=True)
+                raise
+            except (requests.exceptions.RequestException, ValueError) as e:
+                self._release_failed(endpoint, model, e)
+                last_error = e
+                continue
+            self.endpoints.release(endpoint, model, stats)
+            stats["endpoint"] = endpoint.url
+            return text, stats
+            
+    def _next_endpoint(self, model: str, tried: List[Endpoint], last_error: Optional[Exception]) -> Endpoint:
+        """Acquire the best endpoint not tried yet; raises last_error when none is left"""
+        endpoint = self.endpoints.acquire(model, exclude=tried)
+        if endpoint is None:
+            raise last_error or requests.exceptions.ConnectionError(f"No available Ollama endpoint serves {model}")
+        if tried:
+            self.endpoints.record_failover()
+        tried.append(endpoint)
+        return endpoint
+        
+    def _release_failed(self, endpoint: Endpoint, model: str, error: Exception):
+        """Take an endpoint that failed with a connection, HTTP or response error out of rotation"""
+        missing = isinstance(error, requests.exceptions.HTTPError) and error.response is not None \
+            and error.response.status_code == 404
+        self.endpoints.release(endpoint, model, failed=True, missing_model=missing)
+        logging.warning(f"Generation with {model} failed on {endpoint.url}: {error}")
+
+class AsyncOllamaClient(_Resilience, _SingleFlight):
+    """asyncio counterpart of OllamaClient, backed by a pooled aiohttp session"""
+    
+    def __init__(self, base_url: Union[str, Sequence[str], EndpointPool] = "http://localhost:11434",
+                 pool_size: int = 10, timeout: float = None, options: Dict = None, seed: int = None,
+                 cache: ResponseCache = None, stream: bool = False, max_stream_seconds: float = None,
+                 retry: RetryPolicy = None, breaker: CircuitBreaker = None, timeouts: AdaptiveTimeouts = None,
+                 coalesce: bool = None, request_scheduler: RequestScheduler = None):
+        if aiohttp is None:
+            raise ImportError("AsyncOllamaClient requires aiohttp (pip install aiohttp)")
+        self._init_resilience(retry, breaker, timeout, timeouts, request_scheduler)
+        self._init_single_flight(coalesce)
+        self.endpoints = make_endpoint_pool(base_url)
+        self.base_url = self.endpoints.urls[0] if self.endpoints is not None else base_url
+        self.pool_size = pool_size
+        self.options = dict(options if options is not None else DEFAULT_OPTIONS)
+        if seed is not None:
+            self.options["seed"] = seed
+        self.cache = cache
+        self.stream = stream
+        self.max_stream_seconds = max_stream_seconds
+        self._session = None
+        
+    def _get_session(self) -> "aiohttp.ClientSession":
+        # The session must be created inside the running event loop
+        if self._session is None or self._session.closed:
+            # Each request sets its own timeout, see _post_generate
+            connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+        
+    def endpoint_stats(self) -> Optional[Dict]:
+        """Routing and health stats of the endpoint pool, None for a single endpoint"""
+        return self.endpoints.stats() if self.endpoints is not None else None
+            
+    async def close(self):
+        """Close the underlying aiohttp session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self.endpoints is not None:
+            self.endpoints.close()
+            
+    async def __aenter__(self):
+        return self
+        
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+        
+    async def generate(self, model: str, prompt: str, system_prompt: str = None, priority: RequestTag = None) -> str:
+        return (await self.generate_with_stats(model, prompt, system_prompt, priority=priority))[0]
+        
+    async def generate_with_stats(self, model: str, prompt: str, system_prompt: str = None,
+                                  stream: bool = None, context: List[int] = None,
+                                  return_context: bool = False, priority: RequestTag = None) -> Tuple[str, Dict]:
+        """Generate a response and return it with timing/token stats (see OllamaClient.generate_with_stats).
+        
+        Raises a GenerationError once retries are exhausted or while the model's circuit is open.
+        """
+        stream = self.stream if stream is None else stream
+        coalescing = self._coalescing()
+        cache_key = (generation_cache_key(model, prompt, system_prompt, self.options, context)
+                     if self.cache is not None or coalescing else None)
+        
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached, {"cached": True}
+        
+        if coalescing:
+            text, stats = await self._generate_single_flight(cache_key, model, prompt, system_prompt, stream, context,
+                                                             priority)
+        else:
+            text, stats = await self._generate_with_retries(model, prompt, system_prompt, stream, context, priority)
+        if not return_context:
+            stats.pop("context", None)
+        if self.cache is not None and not stats.get("cancelled") and not stats.get("coalesced"):
+            self.cache.put(cache_key, text, model)
+        return text, stats
+        
+    async def _generate_single_flight(self, key: str, model: str, prompt: str, system_prompt: str, stream: bool,
+                                      context: Optional[List[int]],
+                                      priority: Optional[RequestTag]) -> Tuple[str, Dict]:
+        """Generate, or await an identical generation already in flight and share its result"""
+        start_time = time.time()
+        while True:
+            flight = self._in_flight.get(key)
+            if flight is None:
+                break
+            try:
+                text, stats = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise  # This caller was cancelled, not the shared call
+                # The caller that started the shared call was cancelled; try again
+                continue
+            except Exception:
+                self.coalesced_requests += 1
+                raise
+            self.coalesced_requests += 1
+            return text, self._follower_stats(stats, start_time)
+        
+        flight = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = flight
+        try:
+            result = await self._generate_with_retries(model, prompt, system_prompt, stream, context, priority)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # Followers re-raise it; don't report it as never retrieved when there are none
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+        finally:
+            del self._in_flight[key]
+        text, stats = result
+        return text, dict(stats)
+        
+    async def _generate_with_retries(self, model: str, prompt: str, system_prompt: str, stream: bool,
+                                     context: Optional[List[int]],
+                                     priority: Optional[RequestTag]) -> Tuple[str, Dict]:
+        """Generate with retries and the circuit breaker; stats include the returned context"""
+        attempt = 0
+        cold = None
+        queue_wait = 0.0
+        while True:
+            self._admit(model, attempt)
+            try:
+                async with self._async_slot(model, priority) as wait:
+                    queue_wait += wait
+                    text, stats = await self._generate_once(model, prompt, system_prompt, stream, context, cold)
+                break
+            except GenerationError as error:
+                delay = self._retry_delay(model, error, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                cold = True if isinstance(error, GenerationTimeout) else cold
+        self.breaker.record_success(model)
+        self.timeouts.record(model, stats)
+        if self.residency is not None:
+            self.residency.observe(model)
+        if attempt:
+            stats["attempts"] = attempt + 1
+        if self.request_scheduler is not None:
+            stats["queue_wait"] = queue_wait
+        return text, stats
+        
+    async def _generate_once(self, model: str, prompt: str, system_prompt: str, stream: bool,
+                             context: Optional[List[int]], cold: Optional[bool]) -> Tuple[str, Dict]:
+        """One attempt (with endpoint failover), transport errors raised as GenerationErrors"""
+        try:
+            if self.endpoints is None:
+                return await self._post_generate(self.base_url, model, prompt, system_prompt, stream, context,
+                                                 self._request_timeout(model, None, cold))
+            return await self._generate_routed(model, prompt, system_prompt, stream, context, cold)
+        except asyncio.TimeoutError as e:
+            raise GenerationTimeout(model, f"Timeout generating response from {model}") from e
+        except aiohttp.ContentTypeError as e:
+            raise ServerError(model, f"Bad response generating with {model}: {e!r}") from e
+        except aiohttp.ClientResponseError as e:
+            raise ServerError(model, f"Ollama returned HTTP {e.status} for {model}", e.status) from e
+        except aiohttp.ClientConnectionError as e:
+            raise EndpointUnavailable(model, f"Could not reach Ollama for {model}: {e!r}") from e
+        except (aiohttp.ClientError, ValueError) as e:
+            raise ServerError(model, f"Bad response generating with {model}: {e!r}") from e
+            
+    async def _post_generate(self, base_url: str, model: str, prompt: str, system_prompt: str, stream: bool,
+                             context: Optional[List[int]], timeout: float) -> Tuple[str, Dict]:
+        """One /api/generate call against base_url; raises on connection, HTTP and timeout errors"""
+        data = build_generate_payload(model, prompt, system_prompt, self.options, stream=stream, context=context,
+                                      keep_alive=self._keep_alive(model))
+        start_time = time.time()
+        try:
+            async with self._get_session().post(f"{base_url}/api/generate", json=data,
+                                                timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                response.raise_for_status()
+                if stream:
+                    text, stats = await self._read_stream(response, start_time)
+                else:
+                    result = await response.json()
+                    text, stats = result.get("response", ""), ollama_response_stats(result, time.time() - start_time)
+        except asyncio.TimeoutError:
+            self.timeouts.record_timeout(model, timeout)
+            raise
+        stats["timeout"] = timeout
+        return text, stats
+            
+    async def _generate_routed(self, model: str, prompt: str, system_prompt: str, stream: bool,
+                               context: Optional[List[int]], cold: Optional[bool]) -> Tuple[str, Dict]:
+        """Generate on the best endpoint of the pool, failing over to the next one on errors"""
+        tried = []
+        last_error = None
+        while True:
+            endpoint = self.endpoints.acquire(model, exclude=tried)
+            if endpoint is None:
+                raise last_error or aiohttp.ClientConnectionError(f"No available Ollama endpoint serves {model}")
+            if tried:
+                self.endpoints.record_failover()
+            tried.append(endpoint)
+            try:
+                text, stats = await self._post_generate(endpoint.url, model, prompt, system_prompt, stream, context,
+                                                        self._request_timeout(model, endpoint, cold))
+            except asyncio.TimeoutError:
+                # A slow or loading model rather than a down host; the retry policy decides what's next
+                self.endpoints.release(endpoint, model, timed_out=True)
+                raise
+            except (aiohttp.ClientError, ValueError) as e:
+                missing = isinstance(e, aiohttp.ClientResponseError) and e.status == 404
+                self.endpoints.release(endpoint, model, failed=True, missing_model=missing)
+                logging.warning(f"Generation with {model} failed on {endpoint.url}: {e!r}")
+                last_error = e
+                continue
+            except asyncio.CancelledError:
+                self.endpoints.release(endpoint, model, failed=False)
+                raise
+            self.endpoints.release(endpoint, model, stats)
+            stats["endpoint"] = endpoint.url
+            return text, stats
+            
+    async def _read_stream(self, response: "aiohttp.ClientResponse", start_time: float) -> Tuple[str, Dict]:
+        """Consume an NDJSON generate stream, recording TTFT and inter-token intervals"""
+        chunks = []
+        intervals = []
+        first_token_time = None
+        last_token_time = None
+        final = {}
+        cancelled = False
+        async for line in response.content:
+            if not line.strip():
+                continue
+            chunk = json.loads(line)
+            now = time.time()
+            if chunk.get("response"):
+                if first_token_time is None:
+                    first_token_time = now
+                else:
+                    intervals.append(now - last_token_time)
+                last_token_time = now
+                chunks.append(chunk["response"])
+            if chunk.get("done"):
+                final = chunk
+                break
+            if self.max_stream_seconds is not None and now - start_time > self.max_stream_seconds:
+                logging.warning(f"Cancelling generation after {self.max_stream_seconds}s")
+                cancelled = True
+                break
+        
+        stats = ollama_response_stats(final, time.time() - start_time)
+        stats["streamed"] = True
+        stats["cancelled"] = cancelled
+        stats["ttft"] = first_token_time - start_time if first_token_time else None
+        stats["inter_token_intervals"] = summarize_intervals(intervals)
+        return "".join(chunks), stats
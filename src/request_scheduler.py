@@ -0,0 +1,181 @@
+import asyncio
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional
+
+class RequestClass(IntEnum):
+    """Priority class of a generation request; lower values are served first"""
+    IN_PROGRESS = 0  # Later turns and the judge of a debate that has started
+    NEW_DEBATE = 1  # Opening turn of a debate, and requests that are not tagged
+    EVALUATION = 2  # Evaluator calls, which only ever follow finished debates
+
+@dataclass(frozen=True)
+class RequestTag:
+    """What a generation request belongs to, for RequestScheduler.
+
+    flow is the unit of fairness, e.g. the ensemble config whose debate
+    the turn is part of. progress is how far (0 to 1) that debate is; within
+    a class and flow, requests of debates closer to done go first.
+    """
+    request_class: RequestClass = RequestClass.NEW_DEBATE
+    flow: str = "default"
+    progress: float = 0.0
+
+# Tag of requests that do not carry one
+UNTAGGED = RequestTag()
+
+class _Waiter:
+    """One request waiting for a slot of its model"""
+
+    def __init__(self, model: str, tag: RequestTag, start_tag: float, cost: float, seq: int,
+                 wake: Callable[[], None]):
+        self.model = model
+        self.tag = tag
+        self.start_tag = start_tag  # Virtual time at which the flow's request may start
+        self.cost = cost
+        self.seq = seq
+        self.wake = wake
+        self.granted = False
+        self.enqueued_at = time.time()
+
+    def order(self):
+        return self.tag.request_class, self.start_tag, -self.tag.progress, self.seq
+
+class RequestScheduler:
+    """Client-side admission queue for generations: priority classes, per-model limits, fair flows.
+
+    Ollama serves at most OLLAMA_NUM_PARALLEL requests of a model at once and
+    queues the rest first come, first served, so with many concurrent
+    debates the turns of debates that are almost done wait behind fresh
+    round-1 turns. Here a request first takes one of its model's
+    num_parallel slots (model_parallel overrides it per model) and waits
+    in this queue while they are busy. A free slot goes to the waiting
+    request of the lowest RequestClass; within a class, flows share slots
+    by start-time fair queuing weighted by weights (default 1 per flow),
+    each request costing its model's mean service time, and ties go to the
+    debate furthest along. A request whose model has a free slot never
+    waits behind requests for busy models.
+    """
+
+    def __init__(self, num_parallel: int = 1, model_parallel: Dict[str, int] = None,
+                 weights: Dict[str, float] = None):
+        self.num_parallel = max(1, num_parallel)
+        self.model_parallel = dict(model_parallel or {})
+        self.weights = dict(weights or {})
+        self._lock = threading.Lock()
+        self._waiting: List[_Waiter] = []
+        self._running: Dict[str, int] = {}
+        self._virtual_time = 0.0
+        self._flow_finish: Dict[str, float] = {}  # Virtual finish time of each flow's last request
+        self._service_seconds: Dict[str, float] = {}  # Smoothed service time per model
+        self._seq = itertools.count()
+        self._stats = {"requests": 0, "queued": 0, "max_queue": 0, "classes": {}, "flows": {}}
+
+    def limit(self, model: str) -> int:
+        return max(1, self.model_parallel.get(model, self.num_parallel))
+
+    @contextmanager
+    def slot(self, model: str, tag: Optional[RequestTag] = None):
+        """Hold one of model's slots for the duration of the block; yields the seconds spent queued"""
+        event = threading.Event()
+        waiter = self._enqueue(model, tag or UNTAGGED, event.set)
+        event.wait()
+        start_time = time.time()
+        try:
+            yield start_time - waiter.enqueued_at
+        finally:
+            self._release(waiter, time.time() - start_time)
+
+    @asynccontextmanager
+    async def async_slot(self, model: str, tag: Optional[RequestTag] = None):
+        """slot() for coroutines: waits without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        waiter = self._enqueue(model, tag or UNTAGGED, wake)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            self._cancel(waiter)
+            raise
+        start_time = time.time()
+        try:
+            yield start_time - waiter.enqueued_at
+        finally:
+            self._release(waiter, time.time() - start_time)
+
+    def _enqueue(self, model: str, tag: RequestTag, wake: Callable[[], None]) -> _Waiter:
+        with self._lock:
+            cost = self._service_seconds.get(model, 1.0)
+            start_tag = max(self._virtual_time, self._flow_finish.get(tag.flow, 0.0))
+            self._flow_finish[tag.flow] = start_tag + cost / self.weights.get(tag.flow, 1.0)
+            waiter = _Waiter(model, tag, start_tag, cost, next(self._seq), wake)
+            self._waiting.append(waiter)
+            self._stats["requests"] += 1
+            self._dispatch()
+            if not waiter.granted:
+                self._stats["queued"] += 1
+                self._stats["max_queue"] = max(self._stats["max_queue"], len(self._waiting))
+        return waiter
+
+    def _dispatch(self):
+        """Grant free slots to the best waiting requests; called with the lock held"""
+        while True:
+            ready = [waiter for waiter in self._waiting if self._running.get(waiter.model, 0) < self.limit(waiter.model)]
+            if not ready:
+                return
+            waiter = min(ready, key=_Waiter.order)
+            self._waiting.remove(waiter)
+            self._running[waiter.model] = self._running.get(waiter.model, 0) + 1
+            self._virtual_time = max(self._virtual_time, waiter.start_tag)
+            waiter.granted = True
+            wait = time.time() - waiter.enqueued_at
+            class_stats = self._stats["classes"].setdefault(waiter.tag.request_class.name.lower(),
+                                                            {"requests": 0, "wait_seconds": 0.0, "max_wait": 0.0})
+            class_stats["requests"] += 1
+            class_stats["wait_seconds"] += wait
+            class_stats["max_wait"] = max(class_stats["max_wait"], wait)
+            waiter.wake()
+
+    def _release(self, waiter: _Waiter, seconds: float):
+        with self._lock:
+            self._running[waiter.model] -= 1
+            previous = self._service_seconds.get(waiter.model)
+            self._service_seconds[waiter.model] = seconds if previous is None else 0.8 * previous + 0.2 * seconds
+            flow_stats = self._stats["flows"].setdefault(waiter.tag.flow, {"requests": 0, "service_seconds": 0.0})
+            flow_stats["requests"] += 1
+            flow_stats["service_seconds"] += seconds
+            self._dispatch()
+
+    def _cancel(self, waiter: _Waiter):
+        """Withdraw a cancelled request, giving its slot back if it was granted meanwhile"""
+        with self._lock:
+            if waiter.granted:
+                self._running[waiter.model] -= 1
+                self._dispatch()
+            else:
+                self._waiting.remove(waiter)
+
+    def stats(self) -> Dict:
+        """Requests, how many had to queue, waits per class and service seconds per flow"""
+        with self._lock:
+            classes = {name: dict(values, mean_wait=values["wait_seconds"] / values["requests"])
+                       for name, values in self._stats["classes"].items()}
+            return {
+                "num_parallel": self.num_parallel,
+                "model_parallel": dict(self.model_parallel),
+                "weights": dict(self.weights),
+                "requests": self._stats["requests"],
+                "queued": self._stats["queued"],
+                "max_queue": self._stats["max_queue"],
+                "waiting": len(self._waiting),
+                "classes": classes,
+                "flows": {flow: dict(values) for flow, values in self._stats["flows"].items()}
+            }
@@ -0,0 +1,152 @@
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Union
+
+import requests
+
+# keep_alive of a model in use: Ollama keeps it loaded until it is unloaded explicitly
+PINNED = -1
+
+class ResidencyManager:
+    """Loads the models a run is about to use and unloads the ones it is done with.
+
+    The orchestrator plans the debates of a run up front, each as the list
+    of models it uses, in run order. Before a debate starts its models are
+    loaded (warmed), so the cold load is not part of the debate's time, and
+    pinned: their generations are sent with keep_alive -1, so Ollama's idle
+    timer cannot unload them between turns or debates. Once no planned
+    debate needs a model any more it is unloaded, and while fewer than
+    max_resident models are loaded the models of the next planned debates,
+    possibly of the next phase, are pre-warmed. Models not in use get
+    idle_keep_alive (None keeps Ollama's default). Warm-up times are
+    recorded per model in stats(), apart from debate times, and reported
+    to on_load(model, seconds, reason) if set, reason being "warmup" or
+    "prewarm". The client
+    reports every generation to observe(), so a model evicted by the other
+    models of a debate is known to be cold and is warmed again.
+    """
+
+    def __init__(self, client, max_resident: int = 1, pin: bool = True,
+                 idle_keep_alive: Union[int, str] = None):
+        self.client = client
+        self.max_resident = max(1, max_resident)
+        self.pin = pin
+        self.idle_keep_alive = idle_keep_alive
+        self._lock = threading.Lock()
+        self._planned: List[List[str]] = []  # Models of each debate not started yet, in run order
+        self._remaining = Counter()  # Planned or running debates per model
+        self._active = Counter()  # Running debates per model
+        self._loaded = OrderedDict()  # Models loaded by us or by a debate, least recently used first
+        self._stats = {"warmups": 0, "prewarms": 0, "unloads": 0, "models": {}}
+        self.on_load = None  # Optional callback for each load made here, e.g. progress events
+        client.residency = self
+
+    def keep_alive_for(self, model: str) -> Union[int, str, None]:
+        """keep_alive for a generation of model: pinned while a debate uses it"""
+        with self._lock:
+            return PINNED if self.pin and self._active[model] else self.idle_keep_alive
+
+    def plan(self, debates: Iterable[List[str]]):
+        """Add debates, each as the list of models it uses, to the end of the plan"""
+        with self._lock:
+            for models in debates:
+                self._planned.append(list(models))
+                self._remaining.update(set(models))
+
+    def before_debate(self, models: List[str], warm: bool = True):
+        """Mark a planned debate as running, pinning its models and, with warm, loading them first"""
+        with self._lock:
+            if models in self._planned:
+                self._planned.remove(models)
+            else:
+                self._remaining.update(set(models))
+            self._active.update(set(models))
+            # Warming more models than fit would only evict the first ones the debate uses
+            first_used = list(dict.fromkeys(models))[:self.max_resident]
+            cold = [model for model in first_used if model not in self._loaded]
+        if warm:
+            for model in cold:
+                self._load(model, "warmup")
+
+    def observe(self, model: str):
+        """Note a completed generation of model: it is loaded now, possibly evicting another model"""
+        with self._lock:
+            self._mark_loaded(model)
+        
+    def after_debate(self, models: List[str]):
+        """Mark a debate as finished; unload models nothing needs and pre-warm the next ones"""
+        finished = []
+        with self._lock:
+            for model in set(models):
+                self._active[model] -= 1
+                self._remaining[model] -= 1
+                if self._remaining[model] <= 0 and self._active[model] <= 0:
+                    finished.append(model)
+                    self._loaded.pop(model, None)
+        for model in finished:
+            self._unload(model)
+        self.prewarm()
+
+    def prewarm(self):
+        """Load the next planned models while fewer than max_resident models are loaded or in use"""
+        with self._lock:
+            in_use = set(self._loaded) | {model for model, count in self._active.items() if count > 0}
+            free = self.max_resident - len(in_use)
+            upcoming = [model for models in self._planned for model in models if model not in in_use]
+            upcoming = list(dict.fromkeys(upcoming))[:max(0, free)]
+        for model in upcoming:
+            self._load(model, "prewarm")
+
+    def finish(self):
+        """Unload every model still loaded, e.g. after a run that stopped early"""
+        with self._lock:
+            loaded = list(self._loaded)
+            self._loaded.clear()
+            self._planned.clear()
+            self._remaining.clear()
+        for model in loaded:
+            self._unload(model)
+
+    def _load(self, model: str, reason: str):
+        try:
+            seconds = self.client.load_model(model)
+        except requests.exceptions.RequestException as e:
+            # The debate will load the model itself and pay the load in its own time
+            logging.warning(f"Could not warm up {model}: {e}")
+            return
+        with self._lock:
+            self._mark_loaded(model)
+            self._stats[f"{reason}s"] += 1
+            model_stats = self._model_stats(model)
+            model_stats["loads"] += 1
+            model_stats["load_seconds"] += seconds
+        logging.info(f"Loaded {model} in {seconds:.1f}s")
+        if self.on_load is not None:
+            self.on_load(model, seconds, reason)
+
+    def _mark_loaded(self, model: str):
+        """Record model as the most recently used loaded model; called with the lock held"""
+        self._loaded[model] = True
+        self._loaded.move_to_end(model)
+        # Ollama evicts models beyond its capacity; forget the least recently used
+        while len(self._loaded) > self.max_resident:
+            self._loaded.popitem(last=False)
+        
+    def _unload(self, model: str):
+        self.client.unload_model(model)
+        with self._lock:
+            self._stats["unloads"] += 1
+            self._model_stats(model)["unloads"] += 1
+        logging.info(f"Unloaded {model}")
+
+    def _model_stats(self, model: str) -> Dict:
+        return self._stats["models"].setdefault(model, {"loads": 0, "load_seconds": 0.0, "unloads": 0})
+
+    def stats(self) -> Dict:
+        """Warm-ups, pre-warms and unloads, with load counts and seconds per model"""
+        with self._lock:
+            stats = {key: value for key, value in self._stats.items() if key != "models"}
+            stats["models"] = {model: dict(model_stats) for model, model_stats in self._stats["models"].items()}
+            stats["loaded"] = list(self._loaded)
+            return stats
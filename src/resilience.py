@@ -0,0 +1,128 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+class GenerationError(Exception):
+    """A generation that failed for good, after any retries.
+
+    retryable tells whether trying the same request again may succeed.
+    """
+    retryable = True
+
+    def __init__(self, model: str, message: str, attempts: int = 1):
+        super().__init__(message)
+        self.model = model
+        self.attempts = attempts
+
+    @property
+    def kind(self) -> str:
+        return type(self).__name__
+
+class GenerationTimeout(GenerationError):
+    """Ollama did not answer within the request timeout"""
+
+class EndpointUnavailable(GenerationError):
+    """No Ollama endpoint could be reached"""
+
+class ServerError(GenerationError):
+    """Ollama answered with an HTTP error or an unreadable response"""
+
+    def __init__(self, model: str, message: str, status: int = None, attempts: int = 1):
+        super().__init__(model, message, attempts)
+        self.status = status
+        # Client errors (bad request, unknown model) fail the same way every time
+        self.retryable = status is None or status >= 500 or status == 429
+
+class CircuitOpen(GenerationError):
+    """The model's circuit breaker is open after repeated failures"""
+    retryable = False
+
+@dataclass
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff.
+
+    Attempt n (from 0) waits a random time up to min(max_delay, base_delay * 2**n)
+    before retrying, which spreads concurrent debates' retries apart.
+    """
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+# No retries: a failed generation raises at once
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+class CircuitBreaker:
+    """Per-model circuit breaker.
+
+    After failure_threshold consecutive failures of a model its circuit opens
+    and calls fail fast with CircuitOpen for reset_seconds. Then one trial
+    call is let through (half open): success closes the circuit, failure
+    opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict] = {}
+
+    def _state(self, model: str) -> Dict:
+        return self._models.setdefault(model, {"failures": 0, "opened_at": None, "trial": False,
+                                                "opens": 0, "rejected": 0})
+
+    def allow(self, model: str) -> bool:
+        """Whether a call to model may go ahead now"""
+        with self._lock:
+            state = self._state(model)
+            if state["opened_at"] is None:
+                return True
+            if time.time() - state["opened_at"] >= self.reset_seconds and not state["trial"]:
+                state["trial"] = True
+                return True
+            state["rejected"] += 1
+            return False
+
+    def record_success(self, model: str):
+        with self._lock:
+            state = self._state(model)
+            state["failures"] = 0
+            state["opened_at"] = None
+            state["trial"] = False
+
+    def record_failure(self, model: str) -> bool:
+        """Count a failed call; returns True when this failure opened the circuit"""
+        with self._lock:
+            state = self._state(model)
+            state["failures"] += 1
+            reopen = state["trial"]
+            state["trial"] = False
+            if reopen or (state["opened_at"] is None and state["failures"] >= self.failure_threshold):
+                state["opened_at"] = time.time()
+                state["opens"] += 1
+                return True
+            return False
+
+    def state(self, model: str) -> str:
+        with self._lock:
+            state = self._models.get(model)
+            if state is None or state["opened_at"] is None:
+                return "closed"
+            return "half_open" if state["trial"] else "open"
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-model circuit state, times opened and calls rejected while open"""
+        with self._lock:
+            models = list(self._models)
+        return {model: {"state": self.state(model), "opens": self._models[model]["opens"],
+                        "rejected": self._models[model]["rejected"]} for model in models}
+
+def retry_delay_for(error: Optional[GenerationError], policy: RetryPolicy, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying after error, or None when it should not be retried"""
+    if error is None or not error.retryable or attempt + 1 >= policy.max_attempts:
+        return None
+    return policy.delay(attempt)
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+class ResponseCache:
+    """Content-addressed on-disk cache of LLM generations.
+
+    Entries are keyed by a hash of (model, system prompt, user prompt, options)
+    and stored one JSON file per entry. Least recently used entries are
+    evicted once max_entries or max_bytes is exceeded.
+    """
+
+    def __init__(self, cache_dir: str = None, max_entries: int = None, max_bytes: int = None):
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(__file__), '..', 'results', 'response_cache')
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Rebuild the LRU index from disk, oldest access first
+        self._index = OrderedDict()
+        entries = []
+        for filename in os.listdir(cache_dir):
+            if filename.endswith(".json"):
+                stat = os.stat(os.path.join(cache_dir, filename))
+                entries.append((stat.st_mtime, filename[:-5], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+        self._total_bytes = sum(self._index.values())
+
+    @staticmethod
+    def make_key(model: str, prompt: str, system_prompt: str = None, options: Dict = None) -> str:
+        """Hash of everything that determines a generation"""
+        material = json.dumps({
+            "model": model,
+            "system": system_prompt or "",
+            "prompt": prompt,
+            "options": options or {}
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss"""
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    response = json.load(f)["response"]
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning(f"Dropping unreadable cache entry {key}: {e}")
+                self._remove(key)
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._index.move_to_end(key)
+            os.utime(self._path(key))  # Persist recency for the next run's LRU index
+            return response
+
+    def put(self, key: str, response: str, model: str = None):
+        """Store a response and evict least recently used entries if over budget"""
+        data = json.dumps({"model": model, "response": response}, ensure_ascii=False)
+        with self._lock:
+            # Write to a temp file first so readers never see a partial entry
+            tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+
+            if key in self._index:
+                self._total_bytes -= self._index[key]
+            self._index[key] = os.path.getsize(self._path(key))
+            self._index.move_to_end(key)
+            self._total_bytes += self._index[key]
+            self._evict()
+
+    def _evict(self):
+        while self._index and (
+            (self.max_entries is not None and len(self._index) > self.max_entries) or
+            (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._index))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        self._total_bytes -= self._index.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Delete every cached entry"""
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._index),
+            "bytes": self._total_bytes
+        }
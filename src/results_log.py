@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Any
+
+def atomic_write_json(data: Dict[str, Any], filepath: str, indent: int = 2):
+    """Write JSON via a temp file and rename, so readers never see a partial file"""
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+class DebateLog:
+    """Append-only JSONL log of an experiment run.
+
+    The first record is a header with the run metadata and scenarios; every
+    finished debate is appended as its own record, and later metadata
+    updates (e.g. end-of-run stats) are appended as metadata records. Each
+    record is written with a single append and optionally fsynced, so a crash
+    can at worst truncate the last line, which read_records() skips.
+    compact() rebuilds the legacy results JSON shape.
+    """
+
+    def __init__(self, filepath: str, fsync: bool = True):
+        self.filepath = filepath
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+        if os.path.exists(filepath):
+            self._truncate_torn_tail()
+
+    def _truncate_torn_tail(self):
+        """Drop a partial last line left by a crash, so new appends start on a fresh line"""
+        with open(self.filepath, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+                logging.warning(f"Truncated incomplete trailing record in {self.filepath}")
+
+    def _append(self, record: Dict[str, Any]):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            fd = os.open(self.filepath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                if self.fsync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def write_header(self, metadata: Dict[str, Any], scenarios: List[Dict]):
+        self._append({"type": "header", "metadata": metadata, "scenarios_tested": scenarios})
+
+    def append_debate(self, phase: str, participant: str, result: Dict[str, Any]):
+        self._append({"type": "debate", "phase": phase, "participant": participant, "result": result})
+
+    def append_metadata(self, updates: Dict[str, Any]):
+        self._append({"type": "metadata", "metadata": updates})
+
+    @staticmethod
+    def read_records(filepath: str) -> List[Dict[str, Any]]:
+        records = []
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Only a crash mid-append can leave a torn line; it is never acknowledged
+                    logging.warning(f"Skipping unreadable record at {filepath}:{line_number}")
+        return records
+
+    @classmethod
+    def compact(cls, filepath: str, output_file: str = None) -> Dict[str, Any]:
+        """Fold the log into the legacy results dict, optionally writing it atomically to output_file.
+
+        Participants follow the order in the header metadata, each listed
+        even if none of its debates finished, and debates are sorted by
+        scenario_index; a re-run debate replaces the earlier record.
+        """
+        records = cls.read_records(filepath)
+        if not records or records[0].get("type") != "header":
+            raise ValueError(f"{filepath} is not a debate log (missing header record)")
+
+        header = records[0]
+        metadata = dict(header["metadata"])
+        phase_results = {"baseline": {}, "ensemble": {}}
+        for record in records[1:]:
+            if record["type"] == "debate":
+                result = record["result"]
+                by_index = phase_results[record["phase"]].setdefault(record["participant"], {})
+                by_index[result.get("scenario_index", len(by_index))] = result
+            elif record["type"] == "metadata":
+                metadata.update(record["metadata"])
+
+        def ordered(phase: str, names: List[str]) -> Dict[str, List[Dict]]:
+            found = phase_results[phase]
+            order = list(names) + [n for n in found if n not in names]
+            return {name: [found[name][i] for i in sorted(found.get(name, {}))] for name in order}
+
+        results = {
+            "metadata": metadata,
+            "baseline_results": ordered("baseline", metadata.get("baseline_models", [])),
+            "ensemble_results": ordered("ensemble", metadata.get("ensemble_configs", [])),
+            "scenarios_tested": header["scenarios_tested"]
+        }
+
+        if output_file:
+            atomic_write_json(results, output_file)
+        return results
+
+def load_results(filepath: str) -> Dict[str, Any]:
+    """Load results from a legacy JSON file or a JSONL debate log"""
+    if filepath.endswith(".jsonl"):
+        return DebateLog.compact(filepath)
+    with open(filepath, 'r') as f:
+        return json.load(f)
@@ -0,0 +1,229 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from ollama_client import summarize_intervals
+
+# Ollama reports a few milliseconds of load_duration even for resident models
+MODEL_LOAD_THRESHOLD_SECONDS = 0.1
+
+class ProgressEvents:
+    """Append-only JSONL stream of experiment progress events.
+
+    One event per line: {"ts": ..., "event": ..., **fields}. Events are
+    run_started, phase_started, debate_started, turn_finished, model_load,
+    debate_finished, debate_failed, phase_finished and run_finished.
+    model_load events come from generations that paid a cold load and from
+    the residency manager's warm-ups; their source field tells them apart.
+    Unlike the debate log this is best effort telemetry and is not fsynced.
+    """
+
+    def __init__(self, filepath: str, model_load_threshold: float = MODEL_LOAD_THRESHOLD_SECONDS):
+        self.filepath = filepath
+        self.model_load_threshold = model_load_threshold
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+
+    @staticmethod
+    def path_for_log(log_filepath: str) -> str:
+        """Events file next to a debate log, e.g. run_incremental.jsonl -> run_events.jsonl"""
+        base = log_filepath[:-len(".jsonl")] if log_filepath.endswith(".jsonl") else log_filepath
+        if base.endswith("_incremental"):
+            base = base[:-len("_incremental")]
+        return f"{base}_events.jsonl"
+
+    def emit(self, event: str, **fields):
+        record = {"ts": time.time(), "event": event}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        try:
+            with self._lock:
+                with open(self.filepath, 'a', encoding='utf-8') as f:
+                    f.write(line)
+        except OSError as e:
+            logging.warning(f"Could not write progress event {event}: {e}")
+
+    def model_loaded(self, model: str, seconds: float, source: str):
+        """Record an explicit model load, e.g. a residency warm-up made before a debate starts"""
+        if seconds >= self.model_load_threshold:
+            self.emit("model_load", model=model, seconds=seconds, source=source)
+
+    def turn_finished(self, model: str, role: str, content: str, stats: Dict):
+        """Record one generated turn, plus a model_load event if the call paid a cold load"""
+        stats = stats or {}
+        load_seconds = stats.get("load_duration", 0) / 1e9
+        # A coalesced turn shares another caller's call, whose load is reported there
+        if load_seconds >= self.model_load_threshold and not stats.get("coalesced"):
+            self.emit("model_load", model=model, seconds=load_seconds, source="generation")
+        self.emit("turn_finished", model=model, role=role,
+                  latency=stats.get("wall_time"),
+                  ttft=stats.get("ttft"),
+                  tokens_per_second=stats.get("tokens_per_second"),
+                  prompt_tokens=stats.get("prompt_tokens"),
+                  cached=stats.get("cached", False),
+                  coalesced=stats.get("coalesced", False),
+                  error=stats.get("error"))
+
+def read_events(filepath: str, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    """Events appended after byte offset, and the offset to continue from.
+
+    A partially written last line is left for the next call.
+    """
+    events = []
+    with open(filepath, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    complete = data[:data.rfind(b"\n") + 1]
+    for line in complete.splitlines():
+        if not line.strip():
+            continue
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            logging.warning(f"Skipping unreadable progress event in {filepath}")
+    return events, offset + len(complete)
+
+class ProgressTracker:
+    """Folds progress events into live throughput and measured ETAs per phase, participant and model"""
+
+    def __init__(self):
+        self.run = {}
+        self.planned: Dict[str, int] = {}
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.participants: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.models: Dict[str, Dict[str, Any]] = {}
+        self.started_at = None
+        self.finished_at = None
+        self.last_event_at = None
+
+    def update(self, event: Dict[str, Any]):
+        kind = event["event"]
+        ts = event["ts"]
+        self.last_event_at = ts
+        if kind == "run_started":
+            # A resumed run appends a new run_started; keep the original start time
+            self.started_at = self.started_at or ts
+            self.finished_at = None
+            self.run = {k: v for k, v in event.items() if k not in ("ts", "event", "planned")}
+            self.planned.update(event.get("planned", {}))
+        elif kind == "phase_started":
+            phase = self.phases.setdefault(event["phase"], {"total": 0, "done": 0, "failed": 0, "seconds": []})
+            phase["started_at"] = ts
+            phase["finished_at"] = None
+            # jobs are the debates still pending, so on resume earlier failures are retried
+            for name, count in event["jobs"].items():
+                participant = self._participant(event["phase"], name)
+                participant["total"] = participant["done"] + count
+                participant["failed"] = 0
+            phase["failed"] = 0
+            phase["done_at_start"] = phase["done"]
+            phase["total"] = sum(p["total"] for (phase_name, _), p in self.participants.items()
+                                 if phase_name == event["phase"])
+        elif kind in ("debate_finished", "debate_failed"):
+            phase = self.phases.setdefault(event["phase"], {"total": 0, "done": 0, "failed": 0, "seconds": []})
+            participant = self._participant(event["phase"], event["participant"])
+            key = "done" if kind == "debate_finished" else "failed"
+            phase[key] += 1
+            participant[key] += 1
+            if kind == "debate_finished":
+                phase["seconds"].append(event["seconds"])
+                participant["seconds"].append(event["seconds"])
+        elif kind == "phase_finished":
+            self.phases.get(event["phase"], {})["finished_at"] = ts
+        elif kind == "turn_finished":
+            model = self._model(event["model"])
+            model["turns"] += 1
+            model["errors"] += 1 if event.get("error") else 0
+            if event.get("latency") is not None and not event.get("cached"):
+                model["latencies"].append(event["latency"])
+            if event.get("tokens_per_second") and not event.get("coalesced"):
+                model["tokens_per_second"].append(event["tokens_per_second"])
+        elif kind == "model_load":
+            model = self._model(event["model"])
+            model["loads"] += 1
+            model["load_seconds"] += event["seconds"]
+        elif kind == "run_finished":
+            self.finished_at = ts
+
+    def _participant(self, phase: str, name: str) -> Dict[str, Any]:
+        return self.participants.setdefault((phase, name), {"total": 0, "done": 0, "failed": 0, "seconds": []})
+
+    def _model(self, name: str) -> Dict[str, Any]:
+        return self.models.setdefault(name, {"turns": 0, "errors": 0, "loads": 0, "load_seconds": 0.0,
+                                             "latencies": [], "tokens_per_second": []})
+
+    def summary(self, now: float = None) -> Dict[str, Any]:
+        """Throughput (debates/min) and ETA (seconds) per phase, participant and model"""
+        if now is None:
+            now = self.finished_at or time.time()
+        concurrency = max(1, self.run.get("max_concurrency", 1))
+
+        phases = {}
+        for name, phase in self.phases.items():
+            end = phase.get("finished_at") or now
+            elapsed = max(end - phase.get("started_at", end), 1e-9)
+            done_here = phase["done"] + phase["failed"] - phase.get("done_at_start", 0)
+            rate = done_here / elapsed * 60
+            remaining = max(phase["total"] - phase["done"] - phase["failed"], 0)
+            phases[name] = {
+                "total": phase["total"],
+                "done": phase["done"],
+                "failed": phase["failed"],
+                "debates_per_minute": rate,
+                "mean_debate_seconds": sum(phase["seconds"]) / len(phase["seconds"]) if phase["seconds"] else None,
+                "eta_seconds": 0.0 if phase.get("finished_at") else (remaining / rate * 60 if rate else None)
+            }
+
+        # Phases planned but not started yet are estimated at the throughput measured so far
+        measured = [p["debates_per_minute"] for p in phases.values() if p["debates_per_minute"]]
+        for name, total in self.planned.items():
+            if name not in phases:
+                rate = sum(measured) / len(measured) if measured else 0
+                phases[name] = {"total": total, "done": 0, "failed": 0, "debates_per_minute": 0.0,
+                                "mean_debate_seconds": None,
+                                "eta_seconds": total / rate * 60 if rate else None}
+
+        participants = {}
+        for (phase_name, name), participant in self.participants.items():
+            seconds = participant["seconds"] or self.phases.get(phase_name, {}).get("seconds", [])
+            mean_seconds = sum(seconds) / len(seconds) if seconds else None
+            remaining = max(participant["total"] - participant["done"] - participant["failed"], 0)
+            participants[f"{phase_name}/{name}"] = {
+                "total": participant["total"],
+                "done": participant["done"],
+                "failed": participant["failed"],
+                "mean_debate_seconds": mean_seconds,
+                "eta_seconds": remaining * mean_seconds / concurrency if mean_seconds is not None else None
+            }
+
+        elapsed = (now - self.started_at) if self.started_at else 0.0
+        models = {}
+        for name, model in self.models.items():
+            models[name] = {
+                "turns": model["turns"],
+                "errors": model["errors"],
+                "loads": model["loads"],
+                "load_seconds": model["load_seconds"],
+                "turns_per_minute": model["turns"] / elapsed * 60 if elapsed else None,
+                "latency": summarize_intervals(model["latencies"]),
+                "tokens_per_second": (sum(model["tokens_per_second"]) / len(model["tokens_per_second"])
+                                      if model["tokens_per_second"] else None)
+            }
+
+        etas = [p["eta_seconds"] for p in phases.values()]
+        total = sum(p["total"] for p in phases.values())
+        done = sum(p["done"] + p["failed"] for p in phases.values())
+        return {
+            "run": dict(self.run, finished=self.finished_at is not None),
+            "elapsed_seconds": elapsed,
+            "total": total,
+            "done": done,
+            "debates_per_minute": done / elapsed * 60 if elapsed else 0.0,
+            "eta_seconds": None if any(eta is None for eta in etas) else sum(etas),
+            "phases": phases,
+            "participants": participants,
+            "models": models
+        }
@@ -0,0 +1,156 @@
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Per-turn line formats of the rendered views; {role} is the role value, e.g. "proponent"
+TURN_FORMATS = {
+    "content": "{content}",
+    "role": "{role}: {content}",
+    "labeled": "{role} (Round {round}): {content}",
+    "numbered": "Argument {index}: {content}"
+}
+
+# Word pieces of up to 8 characters and single punctuation marks approximate BPE tokens
+_TOKEN_PATTERN = re.compile(r"\w{1,8}|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    """Local token count estimate, cheap enough to run on every prompt.
+    
+    Counts short word pieces and punctuation marks, which tracks Llama-style
+    tokenizers on English prose far better than a flat characters/4 rule.
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+class Transcript:
+    """Stores a debate's turns once and renders views of them on demand.
+
+    Turns are the DebateArguments of a debate in speaking order. Views select
+    turns by role and/or the last k turns, format each with one of
+    TURN_FORMATS, optionally clip each turn to an excerpt and drop the oldest
+    turns to fit a token budget. Rendered views are memoized until the next
+    append, so the evaluator's rubric prompts and the debaters' turns share
+    one rendering instead of rebuilding the transcript string each time.
+    """
+
+    def __init__(self, arguments: Iterable = ()):
+        self.arguments: List = []
+        self._views: Dict[Tuple, str] = {}
+        self._debate_parts: List[str] = []
+        self._debate_context: Optional[str] = ""
+        for argument in arguments:
+            self.append(argument)
+
+    def __len__(self) -> int:
+        return len(self.arguments)
+
+    def __iter__(self):
+        return iter(self.arguments)
+
+    def append(self, argument):
+        """Add the next turn and invalidate the memoized views"""
+        previous = self._last_debater()
+        self.arguments.append(argument)
+        self._views.clear()
+        if argument.role.value != "judge":
+            self._debate_parts.append(self._debate_line(previous, argument))
+            self._debate_context = None
+
+    @staticmethod
+    def _debate_line(previous, argument) -> str:
+        # The first speaker of each round opens a new paragraph of the debate context
+        separator = "\n" if previous is None or previous.round_number != argument.round_number else ""
+        return f"{separator}{argument.role.value.title()} (Round {argument.round_number}): {argument.content}\n"
+
+    @classmethod
+    def format_debate(cls, turns: List) -> str:
+        """Debater turns in the debate-context format of debate_context()"""
+        parts = []
+        previous = None
+        for argument in turns:
+            parts.append(cls._debate_line(previous, argument))
+            previous = argument
+        return "".join(parts)
+
+    def _last_debater(self):
+        for argument in reversed(self.arguments):
+            if argument.role.value != "judge":
+                return argument
+        return None
+
+    def debaters(self) -> List:
+        """Proponent and opponent turns, in speaking order"""
+        return [arg for arg in self.arguments if arg.role.value != "judge"]
+
+    def turns(self, roles: Iterable = None, last_k: int = None, by_role: bool = False) -> List:
+        """Turns of the given roles (all by default), limited to the last k of them.
+
+        The last k are counted in speaking order; by_role then groups them
+        role by role, in the order roles are given.
+        """
+        if roles is None:
+            selected = self.arguments
+        else:
+            roles = list(roles)
+            selected = [arg for arg in self.arguments if arg.role in roles]
+        if last_k is not None:
+            selected = selected[-last_k:] if last_k > 0 else []
+        if by_role and roles is not None:
+            selected = self._group_by_role(selected, roles)
+        return selected
+
+    @staticmethod
+    def _group_by_role(turns: List, roles: List) -> List:
+        return [arg for role in roles for arg in turns if arg.role == role]
+
+    def debate_context(self) -> str:
+        """Debater-facing context: every debater turn, one paragraph per round.
+
+        Each turn only extends the previous context, so reused KV contexts stay valid.
+        """
+        if self._debate_context is None:
+            self._debate_context = "".join(self._debate_parts)
+        return self._debate_context
+
+    def render(self, style: str = "labeled", roles: Iterable = None, last_k: int = None,
+               by_role: bool = False, separator: str = "\n\n", excerpt: int = None,
+               max_tokens: int = None) -> str:
+        """Memoized view of the transcript.
+
+        style picks a TURN_FORMATS entry; excerpt clips each turn's content to
+        that many characters followed by "..."; max_tokens keeps only the most
+        recent turns whose rendering fits the estimated token budget. Both
+        last_k and max_tokens drop the oldest turns in speaking order, before
+        by_role groups what is left.
+        """
+        key = (style, tuple(roles) if roles is not None else None, last_k, by_role, separator, excerpt, max_tokens)
+        return self.memoize(key, lambda: self._render(*key))
+
+    def memoize(self, key: Tuple, build: Callable[[], str]) -> str:
+        """View cached under key until the next append, built by build() on first use"""
+        view = self._views.get(key)
+        if view is None:
+            view = build()
+            self._views[key] = view
+        return view
+
+    def _render(self, style: str, roles: Optional[Tuple], last_k: Optional[int], by_role: bool,
+                separator: str, excerpt: Optional[int], max_tokens: Optional[int]) -> str:
+        line_format = TURN_FORMATS[style]
+
+        def format_turn(index: int, arg) -> str:
+            content = arg.content if excerpt is None else f"{arg.content[:excerpt]}..."
+            return line_format.format(role=arg.role.value, round=arg.round_number, index=index + 1, content=content)
+
+        turns = self.turns(roles, last_k)
+        if max_tokens is not None:
+            # Walk back from the newest turn; the separator is counted with each kept line
+            budget = max_tokens
+            kept = 0
+            for index in reversed(range(len(turns))):
+                budget -= estimate_tokens(format_turn(index, turns[index]) + separator)
+                if budget < 0:
+                    break
+                kept += 1
+            turns = turns[len(turns) - kept:]
+        if by_role and roles is not None:
+            turns = self._group_by_role(turns, list(roles))
+        return separator.join(format_turn(index, arg) for index, arg in enumerate(turns))
@@ -0,0 +1,18 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from adaptive_timeout import AdaptiveTimeouts
+
+def test_timeouts_do_not_lengthen_the_timeout():
+    timeouts = AdaptiveTimeouts(factor=3.0, min_samples=10, min_timeout=1.0)
+    for _ in range(10):
+        timeouts.record("phi3:3.8b", {"wall_time": 2.0})
+    warm = timeouts.timeout_for("phi3:3.8b", cold=False)
+    assert warm == 6.0
+
+    for _ in range(20):
+        timeouts.record_timeout("phi3:3.8b", warm)
+    assert timeouts.timeout_for("phi3:3.8b", cold=False) == warm
+    assert timeouts.stats()["models"]["phi3:3.8b"]["timeouts"] == 20
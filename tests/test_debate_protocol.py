@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+from debate_protocol import AsyncDebateProtocol, DebateProtocol, DebateRole, DebateSession, stop_when_decided
+
+class RecordingClient:
+    """Stand-in for OllamaClient that returns a distinct KV context per call and records every request"""
+
+    def __init__(self):
+        self.options = {"num_predict": 50, "num_ctx": 100000}
+        self.calls = []
+
+    def generate_with_stats(self, model, prompt, system_prompt=None, context=None, return_context=False,
+                            priority=None):
+        call_id = len(self.calls)
+        role = next(role for role in DebateRole if f"Your role is {role.name}" in system_prompt)
+        self.calls.append({"role": role, "prompt": prompt, "context": context, "returned": [call_id]})
+        stats = {"prompt_eval_count": 10, "eval_count": 5}
+        if return_context:
+            stats["context"] = [call_id]
+        return f"Argument {call_id}. Winner: PROPONENT", stats
+
+class RulingClient:
+    """Stand-in for the judge's interim rulings, always with the same confidence"""
+
+    def __init__(self, confidence, seconds=0.0):
+        self.confidence = confidence
+        self.seconds = seconds
+        self.models = []
+
+    def generate(self, model, prompt, system_prompt=None, priority=None):
+        self.models.append(model)
+        time.sleep(self.seconds)
+        return f"Winner: OPPONENT\nConfidence: {self.confidence}"
+
+def test_reused_context_stays_with_its_role():
+    client = RecordingClient()
+    protocol = DebateProtocol(client, reuse_context=True)
+    protocol.run_single_model_debate("phi3:3.8b", "Test topic", rounds=3)
+
+    contexts_by_role = {role: [call["returned"] for call in client.calls if call["role"] == role]
+                        for role in DebateRole}
+    for call in client.calls:
+        if call["context"] is None:
+            continue
+        # A reused context was returned to an earlier call of the same role
+        assert call["context"] in contexts_by_role[call["role"]]
+    opponent_calls = [call for call in client.calls if call["role"] == DebateRole.OPPONENT]
+    assert all(call["context"] not in contexts_by_role[DebateRole.PROPONENT] for call in opponent_calls)
+    assert any(call["context"] is not None for call in opponent_calls[1:])
+
+    judge_calls = [call for call in client.calls if call["role"] == DebateRole.JUDGE]
+    assert len(judge_calls) == 1
+    assert judge_calls[0]["context"] is None
+    assert "(your previous response)" not in judge_calls[0]["prompt"]
+
+def test_stop_when_decided_skips_to_judge_on_a_confident_ruling():
+    roles = {DebateRole.PROPONENT: "a:7b", DebateRole.OPPONENT: "b:7b", DebateRole.JUDGE: "judge:3b"}
+    rulings = RulingClient(confidence=9)
+    session = DebateSession("Test topic", roles, rounds=3, early_stop=stop_when_decided(rulings, min_confidence=8))
+    result = DebateProtocol(RecordingClient()).run_session(session)
+
+    assert session.stopped_early
+    assert rulings.models == ["judge:3b"]
+    assert [(arg.role, arg.round_number) for arg in result.arguments] == [
+        (DebateRole.PROPONENT, 1), (DebateRole.OPPONENT, 1), (DebateRole.JUDGE, 2)]
+
+def test_stop_when_decided_keeps_debating_while_unsure():
+    roles = {DebateRole.PROPONENT: "a:7b", DebateRole.OPPONENT: "b:7b", DebateRole.JUDGE: "judge:3b"}
+    rulings = RulingClient(confidence=5)
+    session = DebateSession("Test topic", roles, rounds=3, early_stop=stop_when_decided(rulings, min_confidence=8))
+    result = DebateProtocol(RecordingClient()).run_session(session)
+
+    assert not session.stopped_early
+    assert len(rulings.models) == 2  # Checked after rounds 1 and 2
+    assert len(result.arguments) == 7
+
+def test_stop_when_decided_counts_interim_rulings_in_total_time():
+    roles = {DebateRole.PROPONENT: "a:7b", DebateRole.OPPONENT: "b:7b", DebateRole.JUDGE: "judge:3b"}
+    rulings = RulingClient(confidence=5, seconds=0.05)
+    session = DebateSession("Test topic", roles, rounds=3, early_stop=stop_when_decided(rulings))
+    result = DebateProtocol(RecordingClient()).run_session(session)
+
+    assert result.total_time >= 2 * 0.05
+
+def test_async_protocol_rejects_blocking_early_stop():
+    session = DebateSession.for_model("phi3:3.8b", "Test topic", rounds=2,
+                                      early_stop=stop_when_decided(RulingClient(confidence=9)))
+    with pytest.raises(ValueError):
+        asyncio.run(AsyncDebateProtocol(RecordingClient()).run_session(session))
@@ -0,0 +1,52 @@
+import os
+import socket
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from endpoint_pool import EndpointPool
+from mock_ollama_server import MockOllamaServer, ModelProfile
+from ollama_client import OllamaClient
+from resilience import GenerationTimeout, RetryPolicy
+
+def unused_url() -> str:
+    """URL of a local port nothing listens on"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+def test_timeout_deprioritizes_the_model_but_not_the_host():
+    profiles = {"slow:7b": ModelProfile(load_seconds=0.0, ttft_seconds=1.0, tokens_per_second=1000.0),
+                "fast:7b": ModelProfile(load_seconds=0.0, ttft_seconds=0.0, tokens_per_second=10000.0)}
+    with MockOllamaServer(profiles=profiles, max_resident_models=2, time_scale=1.0) as server:
+        pool = EndpointPool([server.url], health_interval=0)
+        client = OllamaClient(pool, timeout=0.2, retry=RetryPolicy(max_attempts=1))
+        with pytest.raises(GenerationTimeout):
+            client.generate_with_stats("slow:7b", "Hello")
+
+        endpoint = pool.endpoints[0]
+        assert endpoint.in_flight == 0
+        assert endpoint.down_until == 0.0
+        assert endpoint.describe()["stalled"] == ["slow:7b"]
+        # Other models are still served by the host
+        text, stats = client.generate_with_stats("fast:7b", "Hello")
+        assert stats["endpoint"] == server.url
+        client.close()
+
+def test_stream_is_routed_counted_and_fails_over():
+    with MockOllamaServer(time_scale=0) as server:
+        pool = EndpointPool([unused_url(), server.url], health_interval=0)
+        client = OllamaClient(pool, retry=RetryPolicy(max_attempts=1))
+        generation = client.generate_stream("phi3:3.8b", "Hello")
+
+        down, up = pool.endpoints
+        assert pool.failovers == 1
+        assert down.down_until > 0
+        assert up.in_flight == 1
+        assert "".join(generation)
+        assert up.in_flight == 0
+        assert generation.stats["endpoint"] == server.url
+        assert "phi3:3.8b" in up.latency
+        client.close()
@@ -0,0 +1,12 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ensemble_orchestrator import EnsembleOrchestrator
+
+def test_store_debate_result_keeps_scenario_order_in_place():
+    participant_results = []
+    for index in (1, 3, 0, 4, 2):
+        EnsembleOrchestrator._store_debate_result(participant_results, {"scenario_index": index})
+    assert [result["scenario_index"] for result in participant_results] == [0, 1, 2, 3, 4]
@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from residency import ResidencyManager
+from telemetry import ProgressEvents, ProgressTracker, read_events
+
+class LoadingClient:
+    """Stand-in for OllamaClient whose model loads take a fixed time"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.residency = None
+
+    def load_model(self, model):
+        return self.seconds
+
+    def unload_model(self, model):
+        pass
+
+def test_warmup_loads_reach_progress_events(tmp_path):
+    events = ProgressEvents(str(tmp_path / "run_events.jsonl"))
+    residency = ResidencyManager(LoadingClient(seconds=2.5), max_resident=1)
+    residency.on_load = events.model_loaded
+    residency.plan([["phi3:3.8b"]])
+    residency.before_debate(["phi3:3.8b"])
+
+    records, _ = read_events(events.filepath)
+    assert [(r["event"], r["model"], r["seconds"], r["source"]) for r in records] == [
+        ("model_load", "phi3:3.8b", 2.5, "warmup")]
+    tracker = ProgressTracker()
+    for record in records:
+        tracker.update(record)
+    assert tracker.models["phi3:3.8b"]["load_seconds"] == 2.5
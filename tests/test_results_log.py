@@ -0,0 +1,16 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from results_log import DebateLog, load_results
+
+def test_compact_lists_participants_without_finished_debates(tmp_path):
+    log = DebateLog(str(tmp_path / "run_incremental.jsonl"), fsync=False)
+    log.write_header({"baseline_models": ["a:7b", "b:7b"], "ensemble_configs": ["mixed"]}, [{"topic": "T"}])
+    log.append_debate("baseline", "b:7b", {"topic": "T", "scenario_index": 0})
+
+    results = load_results(log.filepath)
+    assert results["baseline_results"] == {"a:7b": [], "b:7b": [{"topic": "T", "scenario_index": 0}]}
+    assert list(results["baseline_results"]) == ["a:7b", "b:7b"]
+    assert results["ensemble_results"] == {"mixed": []}
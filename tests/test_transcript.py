@@ -0,0 +1,31 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from debate_protocol import DebateArgument, DebateRole
+from transcript import Transcript, estimate_tokens
+
+DEBATERS = (DebateRole.PROPONENT, DebateRole.OPPONENT)
+
+def debate(rounds):
+    arguments = []
+    for round_number in range(1, rounds + 1):
+        for role in DEBATERS:
+            arguments.append(DebateArgument(role, "m:7b", f"{role.value} round {round_number}",
+                                            time.time(), round_number))
+    return Transcript(arguments)
+
+def test_by_role_budget_drops_the_oldest_turns():
+    transcript = debate(rounds=3)
+    line_tokens = estimate_tokens("proponent round 1" + "\n\n")
+    rendered = transcript.render("content", roles=DEBATERS, by_role=True, max_tokens=4 * line_tokens)
+    # Rounds 2 and 3 survive, still grouped proponent first
+    assert rendered.split("\n\n") == ["proponent round 2", "proponent round 3",
+                                      "opponent round 2", "opponent round 3"]
+
+def test_by_role_last_k_counts_in_speaking_order():
+    transcript = debate(rounds=2)
+    turns = transcript.turns(DEBATERS, last_k=2, by_role=True)
+    assert [(arg.role, arg.round_number) for arg in turns] == [(DebateRole.PROPONENT, 2), (DebateRole.OPPONENT, 2)]